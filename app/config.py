@@ -0,0 +1,143 @@
+import os
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+# values from a local .env file never override the real environment
+load_dotenv()
+
+
+def _env_str(name: str, default: Optional[str]) -> Optional[str]:
+    value = os.getenv(name)
+    return default if value is None or value == "" else value
+
+
+def _env_int(name: str, default: Optional[int]) -> Optional[int]:
+    value = _env_str(name, None)
+    return default if value is None else int(value)
+
+
+def _env_float(name: str, default: float) -> float:
+    value = _env_str(name, None)
+    return default if value is None else float(value)
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = _env_str(name, None)
+    return default if value is None else value.lower() in ("1", "true", "yes", "on")
+
+
+# -------------------------------------------------
+# SETTINGS
+# every field can be overridden by the upper-cased env variable
+# -------------------------------------------------
+@dataclass(frozen=True)
+class Settings:
+    # --- MongoDB connection ---
+    mongo_url: str = "mongodb://localhost:27017"
+    mongo_db_name: str = "ecommerce_db"
+    mongo_app_name: str = "ecommerce-api"
+    mongo_max_pool_size: int = 100
+    mongo_min_pool_size: int = 0
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_connect_timeout_ms: int = 10000
+    mongo_server_selection_timeout_ms: int = 10000
+    mongo_socket_timeout_ms: Optional[int] = None
+    mongo_wait_queue_timeout_ms: Optional[int] = None
+    # comma separated, in order of preference, e.g. "zstd,snappy,zlib"
+    mongo_compressors: Optional[str] = None
+    mongo_zlib_compression_level: Optional[int] = None
+
+    # --- read routing ---
+    # primary | primaryPreferred | secondary | secondaryPreferred | nearest
+    catalog_read_preference: str = "primary"
+    export_read_preference: str = "primary"
+    # -1 disables the staleness bound for secondary reads
+    read_max_staleness_seconds: int = -1
+
+    # --- admission control ---
+    admission_enabled: bool = True
+    admission_max_wait_seconds: float = 5.0
+    # per route class: "concurrency,queue,rate,burst" where rate is
+    # requests/second per client (0 = no rate limit)
+    admission_export: str = "2,4,0.2,2"
+    admission_bulk: str = "4,8,2,5"
+    admission_orders_list: str = "16,64,20,40"
+    admission_catalog: str = "256,1024,0,0"
+    # take the client address from this header (e.g. x-forwarded-for)
+    # instead of the socket peer; only behind a trusted proxy
+    admission_client_header: Optional[str] = None
+
+    # --- cross-worker cache invalidation ---
+    # auto: change streams when the server has them (replica set or
+    # mongos), polling `updatedAt` otherwise; or change_stream / poll / off
+    cache_sync_mode: str = "auto"
+    # the resume token is saved under this id (default: the host name)
+    cache_sync_id: Optional[str] = None
+    cache_sync_checkpoint_seconds: float = 5.0
+    cache_sync_poll_seconds: float = 2.0
+    # every poll looks back this far, for clock skew between app nodes
+    cache_sync_poll_overlap_seconds: float = 5.0
+
+    # --- response compression ---
+    # bodies sent in one piece below this many bytes are not compressed
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    # brotli is used only when the `brotli` package is installed
+    compression_brotli_quality: int = 4
+
+    # --- read cache ---
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: float = 60.0
+
+    # --- coalesced product lookups ---
+    product_loader_window_ms: float = 2.0
+    product_loader_max_batch: int = 100
+
+    # --- password hashing ---
+    bcrypt_rounds: int = 12
+    hash_workers: int = 4
+    hash_max_pending: int = 64
+
+    # --- bulk / export tuning ---
+    export_batch_size: int = 1000
+    variant_insert_chunk_size: int = 500
+    variant_max_concurrent_inserts: int = 4
+    variant_update_chunk_size: int = 1000
+
+    # --- sharded variant stock ---
+    variant_stock_shards: int = 8
+    # 0 disables caching of the summed stock
+    stock_total_cache_ttl_seconds: float = 1.0
+
+    # --- group-commit order inserts (off by default) ---
+    order_group_commit: bool = False
+    order_batch_max_size: int = 100
+    order_batch_linger_ms: float = 2.0
+    order_batch_max_queue: int = 10000
+    order_batch_max_in_flight: int = 4
+
+    # --- streaming product import ---
+    import_batch_size: int = 1000
+    # batches being written at once; the upload is not read further
+    # while this many are in flight
+    import_max_in_flight: int = 2
+    import_max_line_length: int = 1_048_576
+    # a "running" import not updated for this long may be taken over
+    import_stale_seconds: int = 300
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        readers = {int: _env_int, float: _env_float, bool: _env_bool, str: _env_str}
+        values = {}
+        for name, field in cls.__dataclass_fields__.items():
+            kind = field.type
+            # Optional[X] -> X
+            kind = getattr(kind, "__args__", (kind,))[0]
+            reader = readers.get(kind, _env_str)
+            values[name] = reader(name.upper(), field.default)
+        return cls(**values)
+
+
+settings = Settings.from_env()
@@ -1,16 +1,170 @@
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import (
+    Nearest,
+    Primary,
+    PrimaryPreferred,
+    Secondary,
+    SecondaryPreferred
+)
+
+from app.config import settings
+from app.utils.metrics import mongo_listener
+
+# -----------------------
+# Client lifecycle
+# The client is created by connect() from the FastAPI lifespan, i.e.
+# inside each uvicorn worker after it has forked, and closed on
+# shutdown. Scripts that skip the lifespan get one lazily.
+# -----------------------
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def client_options() -> dict:
+    options = {
+        "appname": settings.mongo_app_name,
+        "maxPoolSize": settings.mongo_max_pool_size,
+        "minPoolSize": settings.mongo_min_pool_size,
+        "connectTimeoutMS": settings.mongo_connect_timeout_ms,
+        "serverSelectionTimeoutMS": settings.mongo_server_selection_timeout_ms,
+        # per-request command counts and timings for /metrics
+        "event_listeners": [mongo_listener]
+    }
+    if settings.mongo_max_idle_time_ms is not None:
+        options["maxIdleTimeMS"] = settings.mongo_max_idle_time_ms
+    if settings.mongo_socket_timeout_ms is not None:
+        options["socketTimeoutMS"] = settings.mongo_socket_timeout_ms
+    if settings.mongo_wait_queue_timeout_ms is not None:
+        options["waitQueueTimeoutMS"] = settings.mongo_wait_queue_timeout_ms
+    if settings.mongo_compressors:
+        options["compressors"] = settings.mongo_compressors
+    if settings.mongo_zlib_compression_level is not None:
+        options["zlibCompressionLevel"] = settings.mongo_zlib_compression_level
+    return options
+
+
+def connect() -> AsyncIOMotorClient:
+    global _client
+    if _client is None:
+        # fail at startup, not on the first routed read
+        read_preference(settings.catalog_read_preference)
+        read_preference(settings.export_read_preference)
+        _client = AsyncIOMotorClient(settings.mongo_url, **client_options())
+    return _client
+
+
+def close() -> None:
+    global _client, _transactions_supported
+    if _client is not None:
+        _client.close()
+        _client = None
+    _transactions_supported = None
+
+
+def get_client() -> AsyncIOMotorClient:
+    return connect()
+
+
+def get_database():
+    return get_client()[settings.mongo_db_name]
+
+
+# -----------------------
+# Read routing
+# -----------------------
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+
+def read_preference(mode: str):
+    if mode not in READ_PREFERENCES:
+        raise ValueError(f"Unknown read preference: {mode}")
+    if mode == "primary":
+        return Primary()
+    return READ_PREFERENCES[mode](max_staleness=settings.read_max_staleness_seconds)
+
+
+class CollectionProxy:
+    """Stands in for a Motor collection until the client exists, so routes
+    can keep importing collections at module level."""
 
-MONGO_URL = "mongodb://localhost:27017"
+    def __init__(self, name: str, read_mode: Optional[str] = None):
+        self.name = name
+        self.read_mode = read_mode
+        self._client = None
+        self._collection = None
 
-client = AsyncIOMotorClient(MONGO_URL)
+    @property
+    def collection(self):
+        client = get_client()
+        if self._collection is None or self._client is not client:
+            collection = client[settings.mongo_db_name][self.name]
+            if self.read_mode and self.read_mode != "primary":
+                collection = collection.with_options(
+                    read_preference=read_preference(self.read_mode)
+                )
+            self._client = client
+            self._collection = collection
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self.collection, attr)
 
-db = client.ecommerce_db
 
 # -----------------------
 # Collections
 # -----------------------
-user_collection = db.users
-product_collection = db.products
-category_collection = db.categories
-order_collection = db.orders
-variant_collection = db.product_variants
+user_collection = CollectionProxy("users")
+product_collection = CollectionProxy("products")
+category_collection = CollectionProxy("categories")
+order_collection = CollectionProxy("orders")
+variant_collection = CollectionProxy("product_variants")
+variant_stock_shard_collection = CollectionProxy("variant_stock_shards")
+
+# rollups maintained from orders (see app/utils/sales_rollups.py)
+sales_daily_collection = CollectionProxy("sales_daily")
+sales_product_collection = CollectionProxy("sales_by_product")
+
+# resume tokens of the cache invalidation subscriber (see app/utils/cache_sync.py)
+cache_sync_state_collection = CollectionProxy("cache_sync_state")
+
+# streaming product imports (see app/utils/product_import.py)
+product_import_collection = CollectionProxy("product_imports")
+product_import_reject_collection = CollectionProxy("product_import_rejects")
+
+# catalog listings and exports/reports may be served by secondaries
+# (CATALOG_READ_PREFERENCE / EXPORT_READ_PREFERENCE). Writes, reads
+# behind writes (checkout pricing, stock) and reads that fill the cache
+# always use the primary.
+product_reader = CollectionProxy("products", settings.catalog_read_preference)
+order_export_reader = CollectionProxy("orders", settings.export_read_preference)
+sales_daily_reader = CollectionProxy("sales_daily", settings.export_read_preference)
+sales_product_reader = CollectionProxy("sales_by_product", settings.export_read_preference)
+
+
+# -----------------------
+# Capabilities
+# -----------------------
+_transactions_supported = None
+
+
+async def supports_transactions() -> bool:
+    """Multi-document transactions need a replica set or mongos."""
+    global _transactions_supported
+    if _transactions_supported is None:
+        hello = await get_client().admin.command("hello")
+        _transactions_supported = (
+            "setName" in hello or hello.get("msg") == "isdbgrid"
+        )
+    return _transactions_supported
+
+
+async def supports_change_streams() -> bool:
+    """Change streams have the same requirement."""
+    return await supports_transactions()
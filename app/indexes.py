@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import sys
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.database import close, get_database
+from app.utils.search import TEXT_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+# -------------------------------------------------
+# INDEX REGISTRY
+# collection name -> indexes it must have
+# -------------------------------------------------
+INDEXES = {
+    "products": [
+        IndexModel(
+            [("category", ASCENDING), ("is_active", ASCENDING), ("price", ASCENDING)],
+            name="category_active_price"
+        ),
+        IndexModel([("price", ASCENDING), ("_id", ASCENDING)], name="price_id"),
+        IndexModel(
+            [(field, TEXT) for field in TEXT_WEIGHTS],
+            weights=TEXT_WEIGHTS,
+            name="product_text"
+        ),
+        IndexModel(
+            [("name_search", ASCENDING), ("is_active", ASCENDING)],
+            name="name_search_active"
+        ),
+        # makes re-sent import rows no-ops, which is what resuming relies on
+        IndexModel(
+            [("import_id", ASCENDING), ("import_line", ASCENDING)],
+            name="import_line_unique",
+            unique=True,
+            partialFilterExpression={"import_id": {"$exists": True}}
+        ),
+        IndexModel([("updatedAt", ASCENDING)], name="updatedAt"),
+    ],
+    "product_variants": [
+        IndexModel([("productId", ASCENDING)], name="productId"),
+        # cache invalidation by polling (no change streams)
+        IndexModel([("updatedAt", ASCENDING)], name="updatedAt"),
+    ],
+    "categories": [
+        IndexModel([("updatedAt", ASCENDING)], name="updatedAt"),
+    ],
+    "variant_stock_shards": [
+        IndexModel(
+            [("variant_id", ASCENDING), ("shard", ASCENDING)],
+            name="variant_shard_unique",
+            unique=True
+        ),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "orders": [
+        # order history: user equality, then the (order_date, _id) keyset
+        IndexModel(
+            [("user_id", ASCENDING), ("order_date", DESCENDING), ("_id", DESCENDING)],
+            name="user_order_date_id"
+        ),
+        IndexModel(
+            [("order_date", DESCENDING), ("_id", DESCENDING)],
+            name="order_date_id"
+        ),
+    ],
+    "product_import_rejects": [
+        IndexModel(
+            [("import_id", ASCENDING), ("line", ASCENDING)],
+            name="import_line_unique",
+            unique=True
+        ),
+    ],
+    "sales_by_product": [
+        IndexModel([("revenue", DESCENDING)], name="revenue"),
+        IndexModel([("units", DESCENDING)], name="units"),
+        IndexModel([("orders", DESCENDING)], name="orders"),
+    ],
+}
+
+# indexes replaced by an entry above; dropped so writes stop paying for them
+RETIRED_INDEXES = {
+    "orders": ["user_order_date", "order_date"],
+}
+
+
+async def ensure_indexes(database=None) -> None:
+    """Create every registered index and drop retired ones. Existing
+    indexes are a no-op."""
+    database = database if database is not None else get_database()
+    for collection_name, indexes in INDEXES.items():
+        try:
+            await database[collection_name].create_indexes(indexes)
+        except OperationFailure as e:
+            # e.g. duplicate emails blocking the unique index; keep serving
+            logger.error("Index creation failed on %s: %s", collection_name, e)
+
+    for collection_name, names in RETIRED_INDEXES.items():
+        existing = await database[collection_name].index_information()
+        for name in names:
+            if name not in existing:
+                continue
+            try:
+                await database[collection_name].drop_index(name)
+                logger.info("Dropped retired index %s.%s", collection_name, name)
+            except OperationFailure as e:
+                logger.error("Dropping index %s.%s failed: %s", collection_name, name, e)
+
+
+# -------------------------------------------------
+# INDEX COVERAGE SELF-CHECK
+# the canonical query behind each route, explained
+# -------------------------------------------------
+CANONICAL_QUERIES = [
+    ("get_all_products", "products", {}, [("_id", ASCENDING)]),
+    (
+        "filter_products",
+        "products",
+        {"category": "probe", "is_active": True, "price": {"$gte": 0, "$lte": 100}},
+        [("_id", ASCENDING)]
+    ),
+    (
+        "filter_products (price sort)",
+        "products",
+        {"price": {"$gte": 0, "$lte": 100}},
+        [("price", ASCENDING), ("_id", ASCENDING)]
+    ),
+    ("text_search_products", "products", {"$text": {"$search": "probe"}}, None),
+    (
+        "autocomplete_products",
+        "products",
+        {"name_search": {"$regex": "^pro"}, "is_active": {"$ne": False}},
+        [("name_search", ASCENDING)]
+    ),
+    ("get_variants_by_product", "product_variants", {"productId": ObjectId()}, None),
+    (
+        "cache_sync (polling)",
+        "products",
+        {"updatedAt": {"$gte": datetime(1970, 1, 1)}},
+        None
+    ),
+    ("signup", "users", {"email": "probe@example.com"}, None),
+    (
+        "get_all_orders",
+        "orders",
+        {},
+        [("order_date", DESCENDING), ("_id", DESCENDING)]
+    ),
+    (
+        "get_user_orders",
+        "orders",
+        {"user_id": "probe", "order_date": {"$gte": datetime(1970, 1, 1)}},
+        [("order_date", DESCENDING), ("_id", DESCENDING)]
+    ),
+    (
+        "export_orders_csv (date range)",
+        "orders",
+        {"order_date": {"$gte": datetime(1970, 1, 1)}},
+        [("order_date", ASCENDING), ("_id", ASCENDING)]
+    ),
+]
+
+
+def plan_stages(plan) -> list:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(plan_stages(value))
+    return stages
+
+
+async def check_index_coverage(database=None) -> list:
+    database = database if database is not None else get_database()
+    report = []
+    for name, collection_name, query, sort in CANONICAL_QUERIES:
+        cursor = database[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = plan_stages(explain.get("queryPlanner", {}).get("winningPlan", {}))
+        report.append({
+            "route": name,
+            "collection": collection_name,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            # the sort is not served by the index: every match is buffered
+            "blocking_sort": "SORT" in stages
+        })
+    return report
+
+
+def needs_index(entry: dict) -> bool:
+    return entry["collscan"] or entry["blocking_sort"]
+
+
+# -------------------------------------------------
+# CLI:  python -m app.indexes
+# -------------------------------------------------
+async def _main() -> int:
+    try:
+        await ensure_indexes()
+        report = await check_index_coverage()
+    finally:
+        close()
+    for entry in report:
+        if entry["collscan"]:
+            flag = "COLLSCAN ❌"
+        elif entry["blocking_sort"]:
+            flag = "SORT ❌"
+        else:
+            flag = "ok ✅"
+        print(f"{entry['collection']:<18} {entry['route']:<32} {flag}  {' > '.join(entry['stages'])}")
+    return 1 if any(needs_index(entry) for entry in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main()))
@@ -1,21 +1,64 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config import settings
+from app.database import close, connect
+from app.indexes import ensure_indexes
+from app.utils.admission import admission, admit
+from app.utils.auth import password_hasher
+from app.utils.cache import get_cache
+from app.utils.cache_sync import cache_subscriber
+from app.utils.compression import CompressionMiddleware
+from app.utils.inventory import order_batcher
+from app.utils.metrics import CONTENT_TYPE, Gauge, MetricsMiddleware, registry
+from app.utils.search import backfill_search_keys
+from app.utils.serialization import FastJSONResponse
 from app.routes import (
     user_routes,
     product_routes,
     category_routes,
     order_routes,
-    variant_routes
+    variant_routes,
+    analytics_routes,
+    diagnostics_routes
 )
 
+
+# -----------------------
+# LIFESPAN (startup / shutdown)
+# -----------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # a class naming a missing route would leave that route unprotected
+    admission.check_routes(app.routes)
+    connect()
+    await ensure_indexes()
+    await backfill_search_keys()
+    if settings.order_group_commit:
+        order_batcher.start()
+    # drops cache entries other workers' writes made stale
+    cache_subscriber.start()
+    yield
+    await cache_subscriber.stop()
+    # queued orders are written before the client goes away
+    await order_batcher.stop()
+    password_hasher.shutdown()
+    close()
+
+
 app = FastAPI(
     title="E-Commerce API",
     description="E-Commerce Backend using FastAPI & MongoDB",
     version="1.0.0",
     docs_url="/docs",              # ✅ ADDED (Swagger)
     redoc_url="/redoc",            # ✅ ADDED
-    openapi_url="/openapi.json"    # ✅ ADDED
+    openapi_url="/openapi.json",   # ✅ ADDED
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+    # admission control / load shedding (see app/utils/admission.py)
+    dependencies=[Depends(admit)]
 )
 
 # -----------------------
@@ -29,6 +72,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# -----------------------
+# COMPRESSION (gzip / brotli, streamed bodies included)
+# -----------------------
+app.add_middleware(CompressionMiddleware)
+
+# -----------------------
+# METRICS (outermost, so it times everything below it)
+# -----------------------
+app.add_middleware(MetricsMiddleware)
+
+cache_stats = registry.register(Gauge(
+    "cache_stats", "Read cache counters and size", ("stat",)
+))
+hasher_pending = registry.register(Gauge(
+    "password_hash_pending", "Password hash/verify jobs queued or running"
+))
+
+
+def collect_app_gauges():
+    for stat, value in get_cache().stats().items():
+        if isinstance(value, (int, float)):
+            cache_stats.set(value, stat)
+    hasher_pending.set(password_hasher.pending)
+
+
+registry.on_collect(collect_app_gauges)
+
 # -----------------------
 # ROUTERS
 # -----------------------
@@ -37,6 +107,16 @@ app.include_router(category_routes.router, prefix="/categories", tags=["Categori
 app.include_router(product_routes.router, prefix="/products", tags=["Products"])
 app.include_router(order_routes.router, prefix="/orders", tags=["Orders"])
 app.include_router(variant_routes.router, prefix="/variants", tags=["Variants"])
+app.include_router(analytics_routes.router, prefix="/analytics", tags=["Analytics"])
+app.include_router(diagnostics_routes.router, prefix="/diagnostics", tags=["Diagnostics"])
+
+# -----------------------
+# PROMETHEUS SCRAPE
+# -----------------------
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
 
 # -----------------------
 # ROOT CHECK API
@@ -55,7 +55,10 @@ class BulkVariantCreate(BaseModel):
 # -----------------------
 class BulkVariantUpdateItem(BaseModel):
     variant_id: str
-    data: VariantUpdate
+    data: Optional[VariantUpdate] = None
+    stock_delta: Optional[int] = Field(
+        None, description="Relative stock change applied with $inc"
+    )
 
 
 class BulkVariantUpdate(BaseModel):
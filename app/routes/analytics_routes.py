@@ -0,0 +1,94 @@
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.database import sales_daily_reader, sales_product_reader
+from app.utils.sales_rollups import DAY_FORMAT, rebuild_rollups
+
+router = APIRouter()
+
+
+def day_range_query(date_from: Optional[date], date_to: Optional[date]) -> dict:
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    query = {}
+    if date_from or date_to:
+        query["_id"] = {}
+        if date_from:
+            query["_id"]["$gte"] = date_from.strftime(DAY_FORMAT)
+        if date_to:
+            query["_id"]["$lte"] = date_to.strftime(DAY_FORMAT)
+    return query
+
+
+# -------------------------------------------------
+# DAILY SALES (one row per day)
+# -------------------------------------------------
+@router.get("/sales/daily")
+async def daily_sales(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to")
+):
+    days = []
+    async for day in sales_daily_reader.find(
+        day_range_query(date_from, date_to), {"updatedAt": 0}
+    ).sort("_id", 1):
+        days.append({
+            "date": day["_id"],
+            "revenue": day.get("revenue", 0),
+            "units": day.get("units", 0),
+            "orders": day.get("orders", 0)
+        })
+    return days
+
+
+# -------------------------------------------------
+# SALES SUMMARY (totals over a date range)
+# -------------------------------------------------
+@router.get("/sales/summary")
+async def sales_summary(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to")
+):
+    summary = {"revenue": 0.0, "units": 0, "orders": 0, "days": 0}
+    async for day in sales_daily_reader.find(
+        day_range_query(date_from, date_to), {"updatedAt": 0}
+    ):
+        summary["revenue"] += day.get("revenue", 0)
+        summary["units"] += day.get("units", 0)
+        summary["orders"] += day.get("orders", 0)
+        summary["days"] += 1
+    return summary
+
+
+# -------------------------------------------------
+# TOP PRODUCTS
+# -------------------------------------------------
+@router.get("/sales/products")
+async def top_products(
+    sort_by: Literal["revenue", "units", "orders"] = Query("revenue"),
+    limit: int = Query(10, ge=1, le=100)
+):
+    products = []
+    async for product in sales_product_reader.find(
+        {}, {"updatedAt": 0}
+    ).sort(sort_by, -1).limit(limit):
+        products.append({
+            "product_id": product["_id"],
+            "product_name": product.get("product_name"),
+            "revenue": product.get("revenue", 0),
+            "units": product.get("units", 0),
+            "orders": product.get("orders", 0)
+        })
+    return products
+
+
+# -------------------------------------------------
+# REBUILD (replay all orders into the rollups)
+# -------------------------------------------------
+@router.post("/rollups/rebuild")
+async def rebuild_sales_rollups():
+    await rebuild_rollups()
+    return {"message": "Sales rollups rebuilt successfully ✅"}
@@ -1,8 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from bson import ObjectId
 from typing import List
 
 from app.database import category_collection
+from app.utils.cache import (
+    CATEGORIES_KEY,
+    MISSING,
+    fill_if_current,
+    get_cache,
+    invalidate_categories,
+    invalidation_generation
+)
+from app.utils.etag import (
+    etag_matches,
+    list_etag,
+    not_modified,
+    stamp_new,
+    stamp_update,
+    strip_stamps
+)
+from app.utils.serialization import FastJSONResponse
 from app.schemas.category_schema import (
     CategoryCreate,
     BulkCategoryCreate,
@@ -16,7 +33,8 @@ router = APIRouter(prefix="/categories", tags=["Categories"])
 # -------------------
 @router.post("/")
 async def create_category(category: CategoryCreate):
-    await category_collection.insert_one(category.dict())
+    await category_collection.insert_one(stamp_new(category.dict()))
+    await invalidate_categories()
     return {"message": "Category created successfully"}
 
 # -------------------
@@ -24,22 +42,39 @@ async def create_category(category: CategoryCreate):
 # -------------------
 @router.post("/bulk")
 async def create_bulk_categories(data: BulkCategoryCreate):
-    docs = [{"name": name} for name in data.categories]
+    docs = [stamp_new({"name": name}) for name in data.categories]
     result = await category_collection.insert_many(docs)
+    await invalidate_categories()
     return {
         "message": "Bulk categories added",
         "count": len(result.inserted_ids)
     }
 
 # -------------------
-# READ (All)
+# READ (All, cached, conditional GET)
+# filled from the primary, like the product cache; other workers'
+# writes reach the cache through app/utils/cache_sync.py
 # -------------------
 @router.get("/", response_model=List[CategoryModel])
-async def get_all_categories():
-    categories = []
-    async for cat in category_collection.find():
-        categories.append(cat)
-    return categories
+async def get_all_categories(request: Request):
+    cache = get_cache()
+    entry = await cache.get(CATEGORIES_KEY)
+    if entry is MISSING:
+        generation = invalidation_generation()
+        categories = []
+        async for cat in category_collection.find({}, {"name": 1, "version": 1}):
+            categories.append(cat)
+
+        etag = list_etag("categories", categories)
+        for cat in categories:
+            strip_stamps(cat)
+        entry = {"etag": etag, "body": categories}
+        await fill_if_current(CATEGORIES_KEY, entry, generation)
+
+    if etag_matches(request, entry["etag"]):
+        return not_modified(entry["etag"])
+
+    return FastJSONResponse(entry["body"], headers={"ETag": entry["etag"]})
 
 # -------------------
 # READ (By ID)
@@ -64,11 +99,12 @@ async def get_category_by_id(category_id: str):
 async def update_category(category_id: str, category: CategoryCreate):
     result = await category_collection.update_one(
         {"_id": ObjectId(category_id)},
-        {"$set": category.dict()}
+        stamp_update({"$set": category.dict()})
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
 
+    await invalidate_categories()
     return {"message": "Category updated successfully"}
 
 # -------------------
@@ -82,4 +118,5 @@ async def delete_category(category_id: str):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Category not found")
 
+    await invalidate_categories()
     return {"message": "Category deleted successfully"}
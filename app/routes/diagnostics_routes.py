@@ -0,0 +1,35 @@
+from fastapi import APIRouter
+
+from app.indexes import check_index_coverage, needs_index
+from app.utils.cache import get_cache
+from app.utils.cache_sync import cache_subscriber
+
+router = APIRouter()
+
+
+# -------------------------------------------------
+# INDEX COVERAGE (explain() every canonical query)
+# -------------------------------------------------
+@router.get("/indexes")
+async def index_coverage():
+    report = await check_index_coverage()
+    return {
+        "ok": not any(needs_index(entry) for entry in report),
+        "queries": report
+    }
+
+
+# -------------------------------------------------
+# CACHE STATS (hits / misses / size)
+# -------------------------------------------------
+@router.get("/cache")
+async def cache_stats():
+    return get_cache().stats()
+
+
+# -------------------------------------------------
+# CACHE INVALIDATION SUBSCRIBER (mode / events / errors)
+# -------------------------------------------------
+@router.get("/cache-sync")
+async def cache_sync_status():
+    return cache_subscriber.status()
@@ -1,13 +1,25 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query
+from collections import defaultdict
+from typing import Literal, Optional
 from bson import ObjectId
+from datetime import datetime
+from pymongo import ASCENDING, DESCENDING, ReturnDocument
 
 from fastapi.responses import StreamingResponse
 import csv
+import zlib
 from io import StringIO
 
-from app.database import order_collection
+from app.config import settings
+from app.database import order_collection, order_export_reader, product_collection
 from app.models.order_model import OrderModel
+from app.schemas.order_schema import OrderPage
+from app.utils.cache import invalidate_products
+from app.utils.batcher import BatcherBusy
+from app.utils.inventory import InsufficientStock, ProductGone, reserve_and_insert
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from app.utils.sales_rollups import record_order_changes
+from app.utils.serialization import FastJSONResponse
 
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
@@ -15,23 +27,130 @@ router = APIRouter(prefix="/orders", tags=["Orders"])
 # -------------------
 # CREATE (Single)
 # -------------------
+# Prices, names and totals are recomputed from the catalog; client
+# supplied values are ignored. Stock for every line is reserved in the
+# same write as the order insert (see app/utils/inventory.py).
 @router.post("/place-order")
 async def place_order(order: OrderModel):
-    await order_collection.insert_one(order.dict(by_alias=True))
+    if not order.items:
+        raise HTTPException(status_code=400, detail="Order has no items")
+
+    quantities = defaultdict(int)
+    for item in order.items:
+        if item.quantity <= 0:
+            raise HTTPException(status_code=400, detail="Quantity must be positive")
+        if not ObjectId.is_valid(item.product_id):
+            raise HTTPException(status_code=400, detail=f"Invalid product id {item.product_id}")
+        quantities[str(ObjectId(item.product_id))] += item.quantity
+
+    # every referenced product in one round trip
+    products = {}
+    async for product in product_collection.find(
+        {"_id": {"$in": [ObjectId(pid) for pid in quantities]}},
+        {"name": 1, "price": 1, "is_active": 1}
+    ):
+        products[str(product["_id"])] = product
+
+    for product_id in quantities:
+        product = products.get(product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail=f"Product not found for ID {product_id}")
+        if not product.get("is_active", True):
+            raise HTTPException(status_code=400, detail=f"Product {product_id} is not available")
+
+    items = []
+    for item in order.items:
+        product = products[str(ObjectId(item.product_id))]
+        items.append({
+            "product_id": item.product_id,
+            "product_name": product["name"],
+            "price": product["price"],
+            "quantity": item.quantity,
+            "total_price": round(product["price"] * item.quantity, 2)
+        })
+
+    doc = order.dict(by_alias=True)
+    doc["items"] = items
+    doc["total_amount"] = round(sum(item["total_price"] for item in items), 2)
+
+    try:
+        await reserve_and_insert(doc, quantities)
+    except InsufficientStock as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ProductGone as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BatcherBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many orders in flight, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+
+    await invalidate_products(*quantities)
+    # group-committed orders are added to the rollups per batch
+    if not settings.order_group_commit:
+        await record_order_changes([(doc, 1)])
     return {
         "message": "Order placed successfully",
-        "order_id": order.order_id
+        "order_id": order.order_id,
+        "total_amount": doc["total_amount"]
     }
 
 # -------------------
-# READ (All)
+# READ (All, paginated)
 # -------------------
-@router.get("/", response_model=List[OrderModel])
-async def get_all_orders():
-    orders = []
-    async for order in order_collection.find():
-        orders.append(order)
-    return orders
+# exactly the OrderModel fields (+ _id for the cursor, dropped before
+# responding), so the fast path needs no re-validation
+ORDER_PROJECTION = {field: 1 for field in OrderModel.__fields__}
+
+
+def order_filters(
+    user_id: Optional[str] = None,
+    status: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> dict:
+    query = {}
+    if user_id:
+        query["user_id"] = user_id
+    if status:
+        query["status"] = status
+    if date_from or date_to:
+        query["order_date"] = {}
+        if date_from:
+            query["order_date"]["$gte"] = date_from
+        if date_to:
+            query["order_date"]["$lte"] = date_to
+    return query
+
+
+async def order_page(query: dict, limit: int, cursor: Optional[str]) -> dict:
+    # newest first; (order_date, _id) is walked on the order_date_id
+    # index, or user_order_date_id when the query is for one user
+    docs, next_cursor = await keyset_page(
+        order_collection,
+        query,
+        projection=ORDER_PROJECTION,
+        sort_field="order_date",
+        direction=DESCENDING,
+        limit=limit,
+        cursor=cursor
+    )
+    for order in docs:
+        del order["_id"]
+    return {"items": docs, "next_cursor": next_cursor}
+
+
+@router.get("/", response_model=OrderPage)
+async def get_all_orders(
+    status: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    query = order_filters(status=status, date_from=date_from, date_to=date_to)
+    return FastJSONResponse(await order_page(query, limit, cursor))
 
 # -------------------
 # READ (By Mongo ID)
@@ -54,13 +173,17 @@ async def get_order_by_id(order_id: str):
 # -------------------
 @router.put("/{order_id}")
 async def update_order(order_id: str, order: OrderModel):
-    result = await order_collection.update_one(
+    doc = order.dict(exclude={"id"}, by_alias=True)
+    previous = await order_collection.find_one_and_update(
         {"_id": ObjectId(order_id)},
-        {"$set": order.dict(exclude={"id"}, by_alias=True)}
+        {"$set": doc},
+        return_document=ReturnDocument.BEFORE
     )
-    if result.matched_count == 0:
+    if not previous:
         raise HTTPException(status_code=404, detail="Order not found")
 
+    await record_order_changes([(previous, -1), (doc, 1)])
+
     return {"message": "Order updated successfully"}
 
 # -------------------
@@ -68,38 +191,97 @@ async def update_order(order_id: str, order: OrderModel):
 # -------------------
 @router.delete("/{order_id}")
 async def delete_order(order_id: str):
-    result = await order_collection.delete_one(
+    previous = await order_collection.find_one_and_delete(
         {"_id": ObjectId(order_id)}
     )
-    if result.deleted_count == 0:
+    if not previous:
         raise HTTPException(status_code=404, detail="Order not found")
 
+    await record_order_changes([(previous, -1)])
+
     return {"message": "Order deleted successfully"}
 
 # =================================================
 # EXPORT ORDERS TO CSV  (🔥 Boss-impress feature)
 # =================================================
-@router.get("/export/csv")
-async def export_orders_csv():
-    orders = []
-    async for order in order_collection.find({}, {"_id": 0}):
-        orders.append(order)
+EXPORT_BATCH_SIZE = settings.export_batch_size
+EXPORT_SORT = [("order_date", ASCENDING), ("_id", ASCENDING)]
 
-    if not orders:
-        raise HTTPException(status_code=404, detail="No orders found")
+ORDER_CSV_FIELDS = [
+    "order_id",
+    "user_id",
+    "order_date",
+    "status",
+    "payment_method",
+    "total_amount",
+    "product_id",
+    "product_name",
+    "price",
+    "quantity",
+    "total_price"
+]
+ITEM_CSV_FIELDS = ORDER_CSV_FIELDS[6:]
+
+
+def order_csv_rows(order: dict):
+    # one row per line item, order columns repeated on every row
+    base = [order.get(field) for field in ORDER_CSV_FIELDS[:6]]
+    items = order.get("items") or [{}]
+    for item in items:
+        yield base + [item.get(field) for field in ITEM_CSV_FIELDS]
+
+
+async def order_csv_chunks(query: dict, compress: bool):
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    gzipper = zlib.compressobj(wbits=31) if compress else None
+
+    def drain() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return gzipper.compress(data) if gzipper else data
+
+    writer.writerow(ORDER_CSV_FIELDS)
 
-    output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=orders[0].keys())
-    writer.writeheader()
-    writer.writerows(orders)
+    # oldest first; order_date_id walked backwards serves both the date
+    # range and the sort, no in-memory SORT stage
+    cursor = order_export_reader.find(
+        query, {"_id": 0}, batch_size=EXPORT_BATCH_SIZE
+    ).sort(EXPORT_SORT)
 
-    output.seek(0)
+    rows = 0
+    async for order in cursor:
+        writer.writerows(order_csv_rows(order))
+        rows += 1
+        if rows % EXPORT_BATCH_SIZE == 0:
+            chunk = drain()
+            if chunk:
+                yield chunk
 
+    chunk = drain()
+    if gzipper:
+        chunk += gzipper.flush()
+    if chunk:
+        yield chunk
+
+
+@router.get("/export/csv")
+async def export_orders_csv(
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    compress: Optional[Literal["gzip"]] = Query(None)
+):
+    query = order_filters(date_from=date_from, date_to=date_to)
+
+    if not await order_export_reader.find_one(query, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="No orders found")
+
+    filename = "orders.csv.gz" if compress else "orders.csv"
     return StreamingResponse(
-        output,
-        media_type="text/csv",
+        order_csv_chunks(query, compress == "gzip"),
+        media_type="application/gzip" if compress else "text/csv",
         headers={
-            "Content-Disposition": "attachment; filename=orders.csv"
+            "Content-Disposition": f"attachment; filename={filename}"
         }
     )
-
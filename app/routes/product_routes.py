@@ -1,14 +1,71 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+import re
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Literal, Optional
 from bson import ObjectId
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from app.database import product_collection
+from app.config import settings
+from app.database import product_collection, product_reader, variant_collection
 from app.schemas.product_schema import (
     ProductCreate,
     BulkProductCreate,
-    ProductResponse
+    ProductResponse,
+    ProductBatch,
+    ProductPage,
+    ProductSearchPage,
+    ProductTextSearchPage,
+    ProductSuggestion,
+    ProductDetailResponse,
+    ProductDetailBatch,
+    ProductImportStatus
+)
+from app.utils.cache import (
+    MISSING,
+    autocomplete_key,
+    fill_if_current,
+    get_cache,
+    invalidation_generation,
+    product_key,
+    invalidate_products,
+    invalidate_all_products
+)
+from app.utils.etag import (
+    document_etag,
+    etag_matches,
+    list_etag,
+    not_modified,
+    stamp_new,
+    stamp_update
+)
+from app.utils.loader import BatchLoader
+from app.utils.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    SORT_DIRECTIONS,
+    decode_cursor,
+    decode_offset_cursor,
+    encode_cursor,
+    encode_offset_cursor,
+    keyset_filter,
+    keyset_page
+)
+from app.utils.product_import import (
+    ImportAborted,
+    ImportInProgress,
+    import_status,
+    reject_rows,
+    run_import
 )
+from app.utils.search import (
+    AUTOCOMPLETE_LIMIT,
+    AUTOCOMPLETE_TTL_SECONDS,
+    TEXT_SEARCH_MAX_DEPTH,
+    search_key
+)
+from app.utils.serialization import FastJSONResponse, dumps
+from app.utils.stock_shards import overlay_stock, stock_totals
 
 router = APIRouter()
 
@@ -17,15 +74,21 @@ router = APIRouter()
 # CREATE
 # =====================================================
 
+def product_document(product: ProductCreate) -> dict:
+    doc = product.dict()
+    doc["name_search"] = search_key(product.name)
+    return stamp_new(doc)
+
+
 @router.post("/")
 async def add_product(product: ProductCreate):
-    await product_collection.insert_one(product.dict())
+    await product_collection.insert_one(product_document(product))
     return {"message": "Product added successfully"}
 
 
 @router.post("/bulk")
 async def add_bulk_products(data: BulkProductCreate):
-    docs = [product.dict() for product in data.products]
+    docs = [product_document(product) for product in data.products]
     result = await product_collection.insert_many(docs)
     return {
         "message": "Products added successfully",
@@ -33,40 +96,82 @@ async def add_bulk_products(data: BulkProductCreate):
     }
 
 
-# =====================================================
-# READ
-# =====================================================
+# 🔹 STREAMING IMPORT (NDJSON or CSV upload, validated and written in batches)
+@router.post("/import", response_model=ProductImportStatus)
+async def import_products(
+    request: Request,
+    format: Optional[Literal["ndjson", "csv"]] = Query(
+        None, description="Defaults to csv for a text/csv body, else ndjson"
+    ),
+    import_id: Optional[str] = Query(
+        None,
+        min_length=1,
+        max_length=100,
+        pattern=r"^[A-Za-z0-9_.-]+$",
+        description="Client key; re-sending the upload with the same key resumes it"
+    )
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "csv" if "csv" in content_type else "ndjson"
+    import_id = import_id or str(ObjectId())
 
-# 🔹 READ ALL
-@router.get("/", response_model=List[ProductResponse])
-async def get_all_products():
-    products = []
-    cursor = product_collection.find()
-
-    async for product in cursor:
-        products.append({
-            "id": str(product["_id"]),
-            "name": product["name"],
-            "price": product["price"],
-            "category": product.get("category"),
-            "tags": product.get("tags", []),
-            "stock": product.get("stock"),
-            "is_active": product.get("is_active", True)
-        })
+    try:
+        status = await run_import(import_id, request.stream(), format, product_document)
+    except ImportInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ImportAborted as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return products
+    return FastJSONResponse(status)
 
 
-# 🔹 READ BY ID
-@router.get("/{product_id}", response_model=ProductResponse)
-async def get_product_by_id(product_id: str):
-    product = await product_collection.find_one(
-        {"_id": ObjectId(product_id)}
+@router.get("/import/{import_id}", response_model=ProductImportStatus)
+async def get_import_status(import_id: str):
+    status = await import_status(import_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return FastJSONResponse(status)
+
+
+async def reject_lines(import_id: str):
+    async for reject in reject_rows(import_id):
+        yield dumps(reject) + b"\n"
+
+
+@router.get("/import/{import_id}/rejects")
+async def download_import_rejects(import_id: str):
+    if not await import_status(import_id):
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    return StreamingResponse(
+        reject_lines(import_id),
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f"attachment; filename=import_{import_id}_rejects.ndjson"
+        }
     )
 
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
 
+# =====================================================
+# READ
+# =====================================================
+
+# 🔹 HELPERS
+# only the fields ProductResponse needs are read from Mongo
+# (plus version, for ETags; format_product leaves it out)
+PRODUCT_PROJECTION = {
+    "name": 1,
+    "price": 1,
+    "category": 1,
+    "tags": 1,
+    "stock": 1,
+    "is_active": 1,
+    "version": 1
+}
+
+
+def format_product(product: dict) -> dict:
     return {
         "id": str(product["_id"]),
         "name": product["name"],
@@ -78,14 +183,12 @@ async def get_product_by_id(product_id: str):
     }
 
 
-# 🔹 BULK READ (FILTER)
-@router.get("/filter", response_model=List[ProductResponse])
-async def filter_products(
-    category: Optional[str] = Query(None),
-    min_price: Optional[float] = Query(None),
-    max_price: Optional[float] = Query(None),
-    is_active: Optional[bool] = Query(None)
-):
+def build_product_query(
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    is_active: Optional[bool] = None
+) -> dict:
     query = {}
 
     if category:
@@ -101,56 +204,441 @@ async def filter_products(
         if max_price is not None:
             query["price"]["$lte"] = max_price
 
-    products = []
-    cursor = product_collection.find(query)
+    return query
 
-    async for product in cursor:
-        products.append({
-            "id": str(product["_id"]),
-            "name": product["name"],
-            "price": product["price"],
-            "category": product.get("category"),
-            "tags": product.get("tags", []),
-            "stock": product.get("stock"),
-            "is_active": product.get("is_active", True)
-        })
 
-    return products
+async def product_page(
+    request: Request,
+    query: dict,
+    limit: int,
+    cursor: Optional[str],
+    sort_by: str,
+    order: str
+):
+    docs, next_cursor = await keyset_page(
+        product_reader,
+        query,
+        projection=PRODUCT_PROJECTION,
+        sort_field=sort_by,
+        direction=SORT_DIRECTIONS[order],
+        limit=limit,
+        cursor=cursor
+    )
+
+    # the page body is fully determined by its documents' versions and
+    # the next cursor, so a revalidation skips building the body at all
+    etag = list_etag("products", docs, next_cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return FastJSONResponse(
+        {
+            "items": [format_product(product) for product in docs],
+            "next_cursor": next_cursor
+        },
+        headers={"ETag": etag}
+    )
 
 
-# =====================================================
-# UPDATE
-# =====================================================
+# 🔹 READ ALL (PAGINATED)
+@router.get("/", response_model=ProductPage)
+async def get_all_products(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort_by: Literal["_id", "price"] = Query("_id"),
+    order: Literal["asc", "desc"] = Query("asc")
+):
+    return await product_page(request, {}, limit, cursor, sort_by, order)
 
-class ProductUpdate(BaseModel):
-    name: Optional[str]
-    price: Optional[float]
-    category: Optional[str]
-    tags: Optional[List[str]]
-    stock: Optional[int]
-    is_active: Optional[bool]
 
+# 🔹 BULK READ (FILTER, PAGINATED)
+@router.get("/filter", response_model=ProductPage)
+async def filter_products(
+    request: Request,
+    category: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None),
+    max_price: Optional[float] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort_by: Literal["_id", "price"] = Query("_id"),
+    order: Literal["asc", "desc"] = Query("asc")
+):
+    query = build_product_query(category, min_price, max_price, is_active)
+    return await product_page(request, query, limit, cursor, sort_by, order)
+
+
+# 🔹 FACETED SEARCH (one $facet aggregation per page load)
+def price_facet(price_buckets: Optional[List[float]], buckets: int) -> dict:
+    if price_buckets:
+        return {"$bucket": {
+            "groupBy": "$price",
+            "boundaries": price_buckets,
+            "default": "other",
+            "output": {"count": {"$sum": 1}}
+        }}
+    return {"$bucketAuto": {"groupBy": "$price", "buckets": buckets}}
+
+
+def format_price_buckets(raw: list, price_buckets: Optional[List[float]]) -> list:
+    result = []
+    for bucket in raw:
+        if not price_buckets:
+            result.append({
+                "min": bucket["_id"]["min"],
+                "max": bucket["_id"]["max"],
+                "count": bucket["count"]
+            })
+        elif bucket["_id"] == "other":
+            result.append({"min": None, "max": None, "count": bucket["count"]})
+        else:
+            upper = price_buckets[price_buckets.index(bucket["_id"]) + 1]
+            result.append({"min": bucket["_id"], "max": upper, "count": bucket["count"]})
+    return result
+
+
+@router.get("/search", response_model=ProductSearchPage)
+async def search_products(
+    category: Optional[str] = Query(None),
+    min_price: Optional[float] = Query(None),
+    max_price: Optional[float] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort_by: Literal["_id", "price"] = Query("_id"),
+    order: Literal["asc", "desc"] = Query("asc"),
+    price_buckets: Optional[List[float]] = Query(
+        None, description="Explicit bucket boundaries, ascending"
+    ),
+    buckets: int = Query(5, ge=1, le=50, description="Bucket count when boundaries are not given")
+):
+    if price_buckets is not None:
+        if len(price_buckets) < 2 or price_buckets != sorted(set(price_buckets)):
+            raise HTTPException(
+                status_code=400,
+                detail="price_buckets needs at least two ascending boundaries"
+            )
+
+    query = build_product_query(category, min_price, max_price, is_active)
+    direction = SORT_DIRECTIONS[order]
+
+    results = []
+    if cursor:
+        position = decode_cursor(cursor, sort_by, direction)
+        results.append({"$match": keyset_filter(sort_by, direction, position)})
+    sort = {"_id": direction} if sort_by == "_id" else {sort_by: direction, "_id": direction}
+    results += [
+        {"$sort": sort},
+        {"$limit": limit + 1},
+        {"$project": PRODUCT_PROJECTION}
+    ]
+
+    pipeline = [
+        {"$match": query},
+        {"$facet": {
+            "results": results,
+            "total": [{"$count": "count"}],
+            "categories": [{"$sortByCount": "$category"}],
+            "is_active": [{"$sortByCount": {"$ifNull": ["$is_active", True]}}],
+            "price": [price_facet(price_buckets, buckets)]
+        }}
+    ]
+
+    facets = (await product_reader.aggregate(pipeline).to_list(length=1))[0]
+
+    docs = facets["results"]
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(sort_by, direction, last.get(sort_by), last["_id"])
+
+    return FastJSONResponse({
+        "items": [format_product(product) for product in docs],
+        "next_cursor": next_cursor,
+        "total": facets["total"][0]["count"] if facets["total"] else 0,
+        "facets": {
+            "categories": [
+                {"value": f["_id"], "count": f["count"]} for f in facets["categories"]
+            ],
+            "is_active": [
+                {"value": f["_id"], "count": f["count"]} for f in facets["is_active"]
+            ],
+            "price": format_price_buckets(facets["price"], price_buckets)
+        }
+    })
+
+
+# 🔹 FULL-TEXT SEARCH (ranked by relevance)
+@router.get("/text-search", response_model=ProductTextSearchPage)
+async def text_search_products(
+    q: str = Query(..., min_length=1),
+    category: Optional[str] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    if offset >= TEXT_SEARCH_MAX_DEPTH:
+        raise HTTPException(status_code=400, detail="Search results are too deep, refine the query")
+
+    query = build_product_query(category=category, is_active=is_active)
+    query["$text"] = {"$search": q}
+
+    score = {"$meta": "textScore"}
+    docs = await (
+        product_reader.find(query, {**PRODUCT_PROJECTION, "score": score})
+        .sort([("score", score), ("_id", 1)])
+        .skip(offset)
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
 
-# 🔹 UPDATE BY ID
-@router.put("/{product_id}")
-async def update_product(product_id: str, data: ProductUpdate):
-    update_data = {k: v for k, v in data.dict().items() if v is not None}
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        if offset + limit < TEXT_SEARCH_MAX_DEPTH:
+            next_cursor = encode_offset_cursor(offset + limit)
+
+    return FastJSONResponse({
+        "items": [
+            {**format_product(product), "score": product["score"]}
+            for product in docs
+        ],
+        "next_cursor": next_cursor
+    })
+
+
+# 🔹 AUTOCOMPLETE (prefix match on name, cached briefly)
+@router.get("/autocomplete", response_model=List[ProductSuggestion])
+async def autocomplete_products(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(AUTOCOMPLETE_LIMIT, ge=1, le=50)
+):
+    prefix = search_key(q)
+    if not prefix:
+        return []
+
+    cache = get_cache()
+    key = autocomplete_key(limit, prefix)
+    cached = await cache.get(key)
+    if cached is not MISSING:
+        return FastJSONResponse(cached)
+
+    # anchored regex on the lower-cased name: an index range scan
+    suggestions = []
+    async for product in product_reader.find(
+        {
+            "name_search": {"$regex": "^" + re.escape(prefix)},
+            "is_active": {"$ne": False}
+        },
+        {"name": 1}
+    ).sort("name_search", 1).limit(limit):
+        suggestions.append({"id": str(product["_id"]), "name": product["name"]})
+
+    await cache.set(key, suggestions, ttl=AUTOCOMPLETE_TTL_SECONDS)
+    return FastJSONResponse(suggestions)
+
+
+# 🔹 PRODUCT DETAIL (product + variants in one aggregation)
+MAX_DETAIL_BATCH = 100
+
+VARIANT_PROJECTION = {
+    "productId": 1,
+    "color": 1,
+    "size": 1,
+    "sku": 1,
+    "price": 1,
+    "stock": 1,
+    "isAvailable": 1,
+    "createdAt": 1,
+    "stock_shards": 1
+}
+
+
+def format_variant(variant: dict) -> dict:
+    return {
+        "id": str(variant["_id"]),
+        "productId": str(variant["productId"]),
+        "color": variant.get("color"),
+        "size": variant.get("size"),
+        "sku": variant.get("sku"),
+        "price": variant.get("price"),
+        "stock": variant.get("stock"),
+        "isAvailable": variant.get("isAvailable", True),
+        "createdAt": variant.get("createdAt")
+    }
 
-    if not update_data:
-        raise HTTPException(status_code=400, detail="No data to update")
 
-    result = await product_collection.update_one(
-        {"_id": ObjectId(product_id)},
-        {"$set": update_data}
-    )
+async def product_details(product_ids: List[ObjectId]) -> dict:
+    pipeline = [
+        {"$match": {"_id": {"$in": product_ids}}},
+        {"$project": PRODUCT_PROJECTION},
+        {"$lookup": {
+            "from": variant_collection.name,
+            "localField": "_id",
+            "foreignField": "productId",
+            "pipeline": [{"$project": VARIANT_PROJECTION}],
+            "as": "variants"
+        }}
+    ]
+
+    products = await product_reader.aggregate(pipeline).to_list(length=None)
+    # sharded variants report the sum of their stock counters
+    totals = await stock_totals(v for product in products for v in product["variants"])
+
+    details = {}
+    for product in products:
+        detail = format_product(product)
+        detail["variants"] = [
+            format_variant(v) for v in overlay_stock(product["variants"], totals)
+        ]
+        details[detail["id"]] = detail
+    return details
+
+
+@router.get("/details", response_model=ProductDetailBatch)
+async def get_product_details_batch(ids: List[str] = Query(..., min_length=1)):
+    if len(ids) > MAX_DETAIL_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_DETAIL_BATCH} ids per request"
+        )
 
-    if result.matched_count == 0:
+    invalid = [product_id for product_id in ids if not ObjectId.is_valid(product_id)]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid product ids: {invalid}")
+
+    # keep the caller's order, drop duplicates
+    requested = list(dict.fromkeys(str(ObjectId(product_id)) for product_id in ids))
+    details = await product_details([ObjectId(product_id) for product_id in requested])
+
+    return FastJSONResponse({
+        "items": [details[pid] for pid in requested if pid in details],
+        "missing": [pid for pid in requested if pid not in details]
+    })
+
+
+@router.get("/{product_id}/detail", response_model=ProductDetailResponse)
+async def get_product_detail(product_id: str):
+    if not ObjectId.is_valid(product_id):
+        raise HTTPException(status_code=400, detail="Invalid product id")
+
+    details = await product_details([ObjectId(product_id)])
+    if not details:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return {"message": "Product updated successfully"}
+    return FastJSONResponse(next(iter(details.values())))
+
+
+# 🔹 COALESCED LOOKUPS
+# concurrent single-id reads (from any request) within a short window
+# become one $in query; duplicate ids share one in-flight result.
+# Entries (cached as-is) carry the ETag next to the formatted body.
+async def load_products(product_ids: List[str]) -> dict:
+    products = {}
+    async for product in product_collection.find(
+        {"_id": {"$in": [ObjectId(pid) for pid in product_ids]}},
+        PRODUCT_PROJECTION
+    ):
+        products[str(product["_id"])] = {
+            "etag": document_etag("product", product),
+            "body": format_product(product)
+        }
+    return products
+
+
+product_loader = BatchLoader(
+    load_products,
+    window=settings.product_loader_window_ms / 1000,
+    max_batch=settings.product_loader_max_batch,
+    generation=invalidation_generation
+)
+
+
+def normalize_product_id(product_id: str) -> str:
+    if not ObjectId.is_valid(product_id):
+        raise HTTPException(status_code=400, detail=f"Invalid product id {product_id}")
+    return str(ObjectId(product_id))
+
+
+# 🔹 BATCH READ BY IDS (cache first, one $in for the misses)
+@router.get("/batch", response_model=ProductBatch)
+async def get_products_batch(ids: List[str] = Query(..., min_length=1)):
+    if len(ids) > MAX_DETAIL_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_DETAIL_BATCH} ids per request"
+        )
+
+    requested = list(dict.fromkeys(normalize_product_id(pid) for pid in ids))
+
+    cache = get_cache()
+    found = {}
+    misses = []
+    for product_id in requested:
+        cached = await cache.get(product_key(product_id))
+        if cached is MISSING:
+            misses.append(product_id)
+        else:
+            found[product_id] = cached
+
+    if misses:
+        generation = invalidation_generation()
+        loaded = await load_products(misses)
+        for product_id, entry in loaded.items():
+            await fill_if_current(product_key(product_id), entry, generation)
+        found.update(loaded)
+
+    return FastJSONResponse({
+        "items": [found[pid]["body"] for pid in requested if pid in found],
+        "missing": [pid for pid in requested if pid not in found]
+    })
+
+
+# 🔹 READ BY ID (read-through cache, coalesced misses, conditional GET)
+# stays on the primary: a lagging secondary could re-fill the cache with
+# the pre-write document right after a write invalidated it. A write
+# invalidating while the read is in flight skips the fill.
+@router.get("/{product_id}", response_model=ProductResponse)
+async def get_product_by_id(product_id: str, request: Request):
+    product_id = normalize_product_id(product_id)
+
+    cache = get_cache()
+    key = product_key(product_id)
+
+    entry = await cache.get(key)
+    if entry is MISSING:
+        generation = invalidation_generation()
+        entry = await product_loader.load(product_id)
+
+        if not entry:
+            raise HTTPException(status_code=404, detail="Product not found")
 
+        await fill_if_current(key, entry, generation)
 
-# 🔹 BULK UPDATE
+    if etag_matches(request, entry["etag"]):
+        return not_modified(entry["etag"])
+
+    return FastJSONResponse(entry["body"], headers={"ETag": entry["etag"]})
+
+
+# =====================================================
+# UPDATE
+# =====================================================
+
+class ProductUpdate(BaseModel):
+    name: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[float] = None
+    category: Optional[str] = None
+    tags: Optional[List[str]] = None
+    stock: Optional[int] = None
+    is_active: Optional[bool] = None
+
+
+# 🔹 BULK UPDATE (registered before /{product_id} so it is not shadowed)
 @router.put("/bulk-update")
 async def bulk_update_products(
     category: str,
@@ -170,33 +658,47 @@ async def bulk_update_products(
 
     result = await product_collection.update_many(
         {"category": category},
-        {"$set": update_data}
+        stamp_update({"$set": update_data})
     )
 
+    # a category-wide update can touch any cached product
+    await invalidate_all_products()
+
     return {
         "matched": result.matched_count,
         "updated": result.modified_count
     }
 
 
-# =====================================================
-# DELETE
-# =====================================================
+# 🔹 UPDATE BY ID
+@router.put("/{product_id}")
+async def update_product(product_id: str, data: ProductUpdate):
+    update_data = {k: v for k, v in data.dict().items() if v is not None}
 
-# 🔹 DELETE BY ID
-@router.delete("/{product_id}")
-async def delete_product(product_id: str):
-    result = await product_collection.delete_one(
-        {"_id": ObjectId(product_id)}
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No data to update")
+
+    if "name" in update_data:
+        update_data["name_search"] = search_key(update_data["name"])
+
+    result = await product_collection.update_one(
+        {"_id": ObjectId(product_id)},
+        stamp_update({"$set": update_data})
     )
 
-    if result.deleted_count == 0:
+    if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    return {"message": "Product deleted successfully"}
+    await invalidate_products(product_id)
+
+    return {"message": "Product updated successfully"}
 
 
-# 🔹 BULK DELETE
+# =====================================================
+# DELETE
+# =====================================================
+
+# 🔹 BULK DELETE (registered before /{product_id} so it is not shadowed)
 @router.delete("/bulk-delete")
 async def bulk_delete_products(
     category: Optional[str] = None,
@@ -218,4 +720,21 @@ async def bulk_delete_products(
 
     result = await product_collection.delete_many(query)
 
+    await invalidate_all_products()
+
     return {"deleted_count": result.deleted_count}
+
+
+# 🔹 DELETE BY ID
+@router.delete("/{product_id}")
+async def delete_product(product_id: str):
+    result = await product_collection.delete_one(
+        {"_id": ObjectId(product_id)}
+    )
+
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    await invalidate_products(product_id)
+
+    return {"message": "Product deleted successfully"}
@@ -1,10 +1,28 @@
-from fastapi import APIRouter, HTTPException
+import logging
+
+from fastapi import APIRouter, HTTPException, Query
+from datetime import datetime
+from typing import Optional
+from pymongo.errors import DuplicateKeyError
+
 from app.database import user_collection
-from app.schemas.user_schema import UserCreate
-from passlib.context import CryptContext
+from app.routes.order_routes import order_filters, order_page
+from app.schemas.order_schema import OrderPage
+from app.schemas.user_schema import UserCreate, UserLogin
+from app.utils.auth import HasherBusy, password_hasher
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+
+def hasher_busy_error() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Too many authentication requests, retry shortly",
+        headers={"Retry-After": "1"}
+    )
 
 
 @router.post("/signup")
@@ -15,7 +33,7 @@ async def signup(user: UserCreate):
         if existing_user:
             raise HTTPException(status_code=400, detail="Email already registered")
 
-        hashed_password = pwd_context.hash(user.password)
+        hashed_password = await password_hasher.hash(user.password)
 
         new_user = {
             "name": user.name,
@@ -27,6 +45,74 @@ async def signup(user: UserCreate):
 
         return {"message": "User created successfully"}
 
-    except Exception as e:
-        print("SIGNUP ERROR 👉", e)  # IMPORTANT
-        raise HTTPException(status_code=500, detail="Internal Server Error")
\ No newline at end of file
+    except HTTPException:
+        raise
+
+    except HasherBusy:
+        raise hasher_busy_error()
+
+    except DuplicateKeyError:
+        # lost a race with a concurrent signup for the same email
+        raise HTTPException(status_code=400, detail="Email already registered")
+
+    except Exception:
+        logger.exception("Signup failed")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@router.post("/login")
+async def login(credentials: UserLogin):
+    try:
+        user = await user_collection.find_one(
+            {"email": credentials.email},
+            {"name": 1, "email": 1, "password": 1}
+        )
+        if not user:
+            await password_hasher.dummy_verify(credentials.password)
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+
+        valid, new_hash = await password_hasher.verify(
+            credentials.password, user["password"]
+        )
+        if not valid:
+            raise HTTPException(status_code=401, detail="Invalid email or password")
+
+        # stored hash used an old cost factor; upgrade it transparently
+        if new_hash:
+            await user_collection.update_one(
+                {"_id": user["_id"]},
+                {"$set": {"password": new_hash}}
+            )
+
+        return {
+            "message": "Login successful",
+            "user": {
+                "id": str(user["_id"]),
+                "name": user["name"],
+                "email": user["email"]
+            }
+        }
+
+    except HTTPException:
+        raise
+
+    except HasherBusy:
+        raise hasher_busy_error()
+
+    except Exception:
+        logger.exception("Login failed")
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+# 🔹 ORDER HISTORY (newest first, keyset paginated)
+@router.get("/{user_id}/orders", response_model=OrderPage)
+async def get_user_orders(
+    user_id: str,
+    status: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None)
+):
+    query = order_filters(user_id, status, date_from, date_to)
+    return FastJSONResponse(await order_page(query, limit, cursor))
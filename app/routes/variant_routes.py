@@ -1,8 +1,42 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Request
 from bson import ObjectId
 from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 
+from app.config import settings
 from app.database import variant_collection, product_collection
+from app.utils.cache import (
+    MISSING,
+    fill_if_current,
+    get_cache,
+    invalidation_generation,
+    variants_key,
+    invalidate_variants,
+    invalidate_all_variants
+)
+from app.utils.etag import (
+    etag_matches,
+    list_etag,
+    make_etag,
+    not_modified,
+    stamp_new,
+    stamp_update,
+    strip_stamps
+)
+from app.utils.stock_shards import (
+    MAX_STOCK_SHARDS,
+    adjust_stock,
+    delete_shards,
+    overlay_stock,
+    rebalance_all,
+    reset_shards,
+    set_shard_count,
+    stock_totals
+)
+from app.utils.serialization import FastJSONResponse
 from app.models.variant_model import (
     VariantCreate,
     VariantUpdate,
@@ -42,59 +76,315 @@ async def create_variant(variant: VariantCreate):
     data = variant.dict()
     data["productId"] = product_id
     data["createdAt"] = datetime.utcnow()
+    stamp_new(data)
 
     result = await variant_collection.insert_one(data)
 
+    await invalidate_variants(product_id)
+
     data["_id"] = str(result.inserted_id)
     data["productId"] = str(data["productId"])
 
-    return data
+    return strip_stamps(data)
 
 
 # -------------------------------------------------
 # BULK CREATE VARIANTS
 # -------------------------------------------------
-@router.post("/bulk-create")
-async def bulk_create_variants(payload: BulkVariantCreate):
-    insert_data = []
+VARIANT_INSERT_CHUNK_SIZE = settings.variant_insert_chunk_size
+MAX_CONCURRENT_INSERTS = settings.variant_max_concurrent_inserts
 
-    for variant in payload.variants:
-        product_id = validate_object_id(variant.productId)
 
-        product = await product_collection.find_one({"_id": product_id})
-        if not product:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Product not found for ID {variant.productId}"
-            )
+@router.post("/bulk-create")
+async def bulk_create_variants(payload: BulkVariantCreate):
+    failed = []
+    candidates = []
+
+    for index, variant in enumerate(payload.variants):
+        if not ObjectId.is_valid(variant.productId):
+            failed.append({
+                "index": index,
+                "productId": variant.productId,
+                "error": f"Invalid ObjectId format: {variant.productId}"
+            })
+            continue
+        candidates.append((index, variant, ObjectId(variant.productId)))
+
+    # resolve every referenced product in one round trip
+    product_ids = list({product_id for _, _, product_id in candidates})
+    existing = set()
+    if product_ids:
+        async for product in product_collection.find(
+            {"_id": {"$in": product_ids}}, {"_id": 1}
+        ):
+            existing.add(product["_id"])
+
+    rows = []
+    created_at = datetime.utcnow()
+    for index, variant, product_id in candidates:
+        if product_id not in existing:
+            failed.append({
+                "index": index,
+                "productId": variant.productId,
+                "error": f"Product not found for ID {variant.productId}"
+            })
+            continue
 
         data = variant.dict()
         data["productId"] = product_id
-        data["createdAt"] = datetime.utcnow()
-        insert_data.append(data)
-
-    result = await variant_collection.insert_many(insert_data)
+        data["createdAt"] = created_at
+        rows.append((index, stamp_new(data)))
+
+    # unordered chunks, a bounded number in flight at once
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_INSERTS)
+
+    async def insert_chunk(chunk):
+        async with semaphore:
+            try:
+                await variant_collection.insert_many(
+                    [data for _, data in chunk], ordered=False
+                )
+                return []
+            except BulkWriteError as e:
+                errors = e.details.get("writeErrors", [])
+                return [(chunk[err["index"]], err["errmsg"]) for err in errors]
+            except PyMongoError as e:
+                return [(row, str(e)) for row in chunk]
+
+    chunks = [
+        rows[i:i + VARIANT_INSERT_CHUNK_SIZE]
+        for i in range(0, len(rows), VARIANT_INSERT_CHUNK_SIZE)
+    ]
+    results = await asyncio.gather(*(insert_chunk(chunk) for chunk in chunks))
+
+    failed_rows = set()
+    for chunk_errors in results:
+        for (index, data), error in chunk_errors:
+            failed_rows.add(index)
+            failed.append({
+                "index": index,
+                "productId": str(data["productId"]),
+                "error": error
+            })
+
+    await invalidate_variants(*{
+        data["productId"] for index, data in rows if index not in failed_rows
+    })
+
+    failed.sort(key=lambda row: row["index"])
 
     return {
-        "message": "Variants created successfully ✅",
-        "inserted_ids": [str(_id) for _id in result.inserted_ids]
+        "message": (
+            "Variants created successfully ✅" if not failed
+            else "Variants created with errors ⚠️"
+        ),
+        "inserted_ids": [
+            str(data["_id"]) for index, data in rows if index not in failed_rows
+        ],
+        "failed": failed
     }
 
 
 # -------------------------------------------------
-# GET VARIANTS BY PRODUCT
+# GET VARIANTS BY PRODUCT (read-through cache, conditional GET)
+# primary reads only, see get_product_by_id
 # -------------------------------------------------
 @router.get("/{product_id}")
-async def get_variants_by_product(product_id: str):
+async def get_variants_by_product(product_id: str, request: Request):
     product_obj_id = validate_object_id(product_id)
 
-    variants = []
-    async for v in variant_collection.find({"productId": product_obj_id}):
-        v["_id"] = str(v["_id"])
-        v["productId"] = str(v["productId"])
-        variants.append(v)
+    cache = get_cache()
+    key = variants_key(product_obj_id)
+
+    entry = await cache.get(key)
+    if entry is MISSING:
+        generation = invalidation_generation()
+        variants = await variant_collection.find(
+            {"productId": product_obj_id}
+        ).to_list(length=None)
+
+        etag = list_etag("variants", variants, str(product_obj_id))
+        for v in variants:
+            strip_stamps(v)
+            v["_id"] = str(v["_id"])
+            v["productId"] = str(v["productId"])
+
+        entry = {"etag": etag, "body": variants}
+        await fill_if_current(key, entry, generation)
+
+    # sharded stock changes without touching the variant document, so
+    # its live total is part of the representation (and of the ETag)
+    etag, body = entry["etag"], entry["body"]
+    totals = await stock_totals(body)
+    if totals:
+        etag = make_etag(etag, tuple(sorted(totals.items())))
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    if totals:
+        body = overlay_stock(body, totals)
+    return FastJSONResponse(body, headers={"ETag": etag})
+
+
+# -------------------------------------------------
+# BULK UPDATE VARIANTS
+# (registered before /{variant_id} so it is not shadowed)
+# -------------------------------------------------
+VARIANT_UPDATE_CHUNK_SIZE = settings.variant_update_chunk_size
+MAX_VARIANT_UPDATE_CHUNK_SIZE = 10000
+
+
+@router.put("/bulk-update")
+async def bulk_update_variants(
+    payload: BulkVariantUpdate,
+    chunk_size: int = Query(
+        VARIANT_UPDATE_CHUNK_SIZE, ge=1, le=MAX_VARIANT_UPDATE_CHUNK_SIZE
+    )
+):
+    errors = []
+    operations = []
+    # stock deltas on sharded variants go through their counters
+    adjustments = []
+    reset = []
+
+    delta_ids = [
+        ObjectId(item.variant_id) for item in payload.updates
+        if item.stock_delta is not None and ObjectId.is_valid(item.variant_id)
+    ]
+    sharded = {}
+    if delta_ids:
+        async for v in variant_collection.find(
+            {"_id": {"$in": delta_ids}, "stock_shards": {"$gt": 1}}, {"stock_shards": 1}
+        ):
+            sharded[str(v["_id"])] = v["stock_shards"]
+
+    for index, item in enumerate(payload.updates):
+        if not ObjectId.is_valid(item.variant_id):
+            errors.append({
+                "index": index,
+                "variant_id": item.variant_id,
+                "error": f"Invalid ObjectId format: {item.variant_id}"
+            })
+            continue
+
+        update_data = {}
+        if item.data:
+            update_data = {
+                k: v for k, v in item.data.dict().items() if v is not None
+            }
+
+        if item.stock_delta is not None and "stock" in update_data:
+            errors.append({
+                "index": index,
+                "variant_id": item.variant_id,
+                "error": "Send either data.stock or stock_delta, not both"
+            })
+            continue
+
+        update = {}
+        sharded_delta = False
+        if update_data:
+            update["$set"] = update_data
+        if item.stock_delta:
+            if str(ObjectId(item.variant_id)) in sharded:
+                adjustments.append((index, item.variant_id, item.stock_delta))
+                sharded_delta = True
+            else:
+                update["$inc"] = {"stock": item.stock_delta}
+        if "stock" in update_data:
+            reset.append(ObjectId(item.variant_id))
+
+        if not update and not sharded_delta:
+            errors.append({
+                "index": index,
+                "variant_id": item.variant_id,
+                "error": "No data provided to update"
+            })
+            continue
+
+        if update:
+            operations.append(
+                (index, item.variant_id, UpdateOne({"_id": ObjectId(item.variant_id)}, stamp_update(update)))
+            )
 
-    return variants
+    matched = 0
+    modified = 0
+    write_errors = 0
+    # sharded deltas with no other field; they never reach bulk_write
+    adjusted = 0
+
+    for start in range(0, len(operations), chunk_size):
+        chunk = operations[start:start + chunk_size]
+        try:
+            result = await variant_collection.bulk_write(
+                [op for _, _, op in chunk], ordered=False
+            )
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            details = e.details
+            for err in details.get("writeErrors", []):
+                index, variant_id, _ = chunk[err["index"]]
+                write_errors += 1
+                errors.append({
+                    "index": index,
+                    "variant_id": variant_id,
+                    "error": err["errmsg"]
+                })
+
+        matched += details.get("nMatched", 0)
+        modified += details.get("nModified", 0)
+
+    # an absolute stock clears a sharded variant's other counters
+    if reset:
+        async for v in variant_collection.find(
+            {"_id": {"$in": reset}, "stock_shards": {"$gt": 1}}, {"_id": 1}
+        ):
+            await reset_shards(v["_id"])
+
+    if adjustments:
+        applied = await asyncio.gather(*(
+            adjust_stock(ObjectId(variant_id), sharded[str(ObjectId(variant_id))], delta)
+            for _, variant_id, delta in adjustments
+        ))
+        with_set = {index for index, _, _ in operations}
+        for (index, variant_id, _), ok in zip(adjustments, applied):
+            if not ok:
+                errors.append({
+                    "index": index,
+                    "variant_id": variant_id,
+                    "error": "Insufficient stock"
+                })
+            elif index not in with_set:
+                adjusted += 1
+
+    # only pay for a lookup when some bulk_write updates matched nothing
+    if matched + write_errors < len(operations):
+        ids = list({ObjectId(variant_id) for _, variant_id, _ in operations})
+        found = set()
+        async for v in variant_collection.find({"_id": {"$in": ids}}, {"_id": 1}):
+            found.add(v["_id"])
+
+        # compared as ObjectIds: the request may spell the id in upper case
+        for index, variant_id, _ in operations:
+            if ObjectId(variant_id) not in found:
+                errors.append({
+                    "index": index,
+                    "variant_id": variant_id,
+                    "error": "Variant not found"
+                })
+
+    # updates are addressed by variant id; drop every cached variant list
+    await invalidate_all_variants()
+
+    errors.sort(key=lambda err: err["index"])
+
+    return {
+        "message": "Bulk update completed ✅",
+        "matched_count": matched + adjusted,
+        "modified_count": modified + adjusted,
+        "errors": errors
+    }
 
 
 # -------------------------------------------------
@@ -108,44 +398,41 @@ async def update_variant(variant_id: str, data: VariantUpdate):
     if not update_data:
         raise HTTPException(status_code=400, detail="No data provided to update")
 
-    result = await variant_collection.update_one(
+    variant = await variant_collection.find_one_and_update(
         {"_id": variant_obj_id},
-        {"$set": update_data}
+        stamp_update({"$set": update_data}),
+        projection={"productId": 1, "stock_shards": 1}
     )
 
-    if result.matched_count == 0:
+    if not variant:
         raise HTTPException(status_code=404, detail="Variant not found")
 
+    if "stock" in update_data and variant.get("stock_shards"):
+        await reset_shards(variant_obj_id)
+
+    await invalidate_variants(variant["productId"])
+
     return {"message": "Variant updated successfully ✅"}
 
 
 # -------------------------------------------------
-# BULK UPDATE VARIANTS
+# BULK DELETE VARIANTS
+# (registered before /{variant_id} so it is not shadowed)
 # -------------------------------------------------
-@router.put("/bulk-update")
-async def bulk_update_variants(payload: BulkVariantUpdate):
-    updated = 0
-
-    for item in payload.updates:
-        variant_obj_id = validate_object_id(item.variant_id)
-
-        update_data = {
-            k: v for k, v in item.data.dict().items() if v is not None
-        }
-        if not update_data:
-            continue
+@router.delete("/bulk-delete")
+async def bulk_delete_variants(payload: BulkVariantDelete):
+    object_ids = [validate_object_id(v_id) for v_id in payload.variant_ids]
 
-        result = await variant_collection.update_one(
-            {"_id": variant_obj_id},
-            {"$set": update_data}
-        )
+    result = await variant_collection.delete_many(
+        {"_id": {"$in": object_ids}}
+    )
 
-        if result.matched_count:
-            updated += 1
+    await delete_shards(object_ids)
+    await invalidate_all_variants()
 
     return {
-        "message": "Bulk update completed ✅",
-        "updated_count": updated
+        "message": "Bulk delete completed ❌",
+        "deleted_count": result.deleted_count
     }
 
 
@@ -156,26 +443,68 @@ async def bulk_update_variants(payload: BulkVariantUpdate):
 async def delete_variant(variant_id: str):
     variant_obj_id = validate_object_id(variant_id)
 
-    result = await variant_collection.delete_one({"_id": variant_obj_id})
+    variant = await variant_collection.find_one_and_delete(
+        {"_id": variant_obj_id},
+        projection={"productId": 1, "stock_shards": 1}
+    )
 
-    if result.deleted_count == 0:
+    if not variant:
         raise HTTPException(status_code=404, detail="Variant not found")
 
+    if variant.get("stock_shards"):
+        await delete_shards([variant_obj_id])
+
+    await invalidate_variants(variant["productId"])
+
     return {"message": "Variant deleted successfully ❌"}
 
 
 # -------------------------------------------------
-# BULK DELETE VARIANTS
+# SHARDED STOCK (hot variants)
+# see app/utils/stock_shards.py
 # -------------------------------------------------
-@router.delete("/bulk-delete")
-async def bulk_delete_variants(payload: BulkVariantDelete):
-    object_ids = [validate_object_id(v_id) for v_id in payload.variant_ids]
-
-    result = await variant_collection.delete_many(
-        {"_id": {"$in": object_ids}}
+async def stock_shard_response(variant_id: ObjectId, message: str) -> dict:
+    variant = await variant_collection.find_one(
+        {"_id": variant_id}, {"stock": 1, "stock_shards": 1}
     )
-
+    totals = await stock_totals([variant])
     return {
-        "message": "Bulk delete completed ❌",
-        "deleted_count": result.deleted_count
+        "message": message,
+        "stock_shards": variant.get("stock_shards", 1),
+        "stock": totals.get(str(variant_id), variant.get("stock"))
     }
+
+
+@router.post("/stock/rebalance")
+async def rebalance_variant_stock():
+    result = await rebalance_all()
+    return {"message": "Stock shards rebalanced ✅", **result}
+
+
+@router.post("/{variant_id}/stock-shards")
+async def enable_stock_shards(
+    variant_id: str,
+    count: int = Query(settings.variant_stock_shards, ge=2, le=MAX_STOCK_SHARDS)
+):
+    variant_obj_id = validate_object_id(variant_id)
+
+    variant = await set_shard_count(variant_obj_id, count)
+    if not variant:
+        raise HTTPException(status_code=404, detail="Variant not found")
+
+    await invalidate_variants(variant["productId"])
+
+    return await stock_shard_response(variant_obj_id, "Stock sharding enabled ✅")
+
+
+@router.delete("/{variant_id}/stock-shards")
+async def disable_stock_shards(variant_id: str):
+    variant_obj_id = validate_object_id(variant_id)
+
+    variant = await set_shard_count(variant_obj_id, 1)
+    if not variant:
+        raise HTTPException(status_code=404, detail="Variant not found")
+
+    await invalidate_variants(variant["productId"])
+
+    return await stock_shard_response(variant_obj_id, "Stock sharding disabled ❌")
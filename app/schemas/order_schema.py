@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field
 from typing import List, Optional
 from bson import ObjectId
 
+from app.models.order_model import OrderModel
+
 # -------------------
 # ORDER ITEM
 # -------------------
@@ -38,3 +40,10 @@ class OrderResponse(BaseModel):
     class Config:
         populate_by_name = True
         json_encoders = {ObjectId: str}
+
+# -------------------
+# PAGINATED LIST
+# -------------------
+class OrderPage(BaseModel):
+    items: List[OrderModel]
+    next_cursor: Optional[str] = None
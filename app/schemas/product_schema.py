@@ -1,5 +1,8 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Union
+from datetime import datetime
+
+from app.models.variant_model import VariantResponse
 
 
 # -------------------
@@ -7,6 +10,7 @@ from typing import List, Optional
 # -------------------
 class ProductCreate(BaseModel):
     name: str
+    description: Optional[str] = None
     price: float
     category: str
     tags: List[str]
@@ -32,3 +36,91 @@ class ProductResponse(BaseModel):
     stock: int
     is_active: Optional[bool] = True
 
+
+# -------------------
+# GET (Paginated List)
+# -------------------
+class ProductPage(BaseModel):
+    items: List[ProductResponse]
+    next_cursor: Optional[str] = None
+
+
+# -------------------
+# GET (Batch By IDs)
+# -------------------
+class ProductBatch(BaseModel):
+    items: List[ProductResponse]
+    missing: List[str] = []
+
+
+# -------------------
+# GET (Faceted Search)
+# -------------------
+class FacetCount(BaseModel):
+    value: Union[str, bool, None]
+    count: int
+
+
+class PriceBucket(BaseModel):
+    min: Optional[float] = None
+    max: Optional[float] = None
+    count: int
+
+
+class ProductFacets(BaseModel):
+    categories: List[FacetCount] = []
+    is_active: List[FacetCount] = []
+    price: List[PriceBucket] = []
+
+
+class ProductSearchPage(ProductPage):
+    total: int
+    facets: ProductFacets
+
+
+# -------------------
+# GET (Text Search)
+# -------------------
+class ProductSearchHit(ProductResponse):
+    score: float
+
+
+class ProductTextSearchPage(BaseModel):
+    items: List[ProductSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class ProductSuggestion(BaseModel):
+    id: str
+    name: str
+
+
+# -------------------
+# GET (Product + Variants)
+# -------------------
+class ProductDetailResponse(ProductResponse):
+    variants: List[VariantResponse] = []
+
+
+class ProductDetailBatch(BaseModel):
+    items: List[ProductDetailResponse]
+    missing: List[str] = []
+
+
+# -------------------
+# POST (Streaming Import)
+# -------------------
+class ProductImportStatus(BaseModel):
+    import_id: str
+    status: str
+    format: Optional[str] = None
+    processed: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    rejected: int = 0
+    resume_after: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
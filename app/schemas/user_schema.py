@@ -8,3 +8,7 @@ class UserCreate(BaseModel):
 class UserResponse(BaseModel):
     name: str
     email: EmailStr
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
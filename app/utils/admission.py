@@ -0,0 +1,246 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+
+from app.config import settings
+from app.utils.metrics import Counter, Gauge, iter_routes, registry
+
+admission_rejected = registry.register(Counter(
+    "admission_rejected_total", "Requests shed by admission control", ("class", "reason")
+))
+admission_active = registry.register(Gauge(
+    "admission_active", "Requests holding an admission slot", ("class",)
+))
+admission_queued = registry.register(Gauge(
+    "admission_queued", "Requests waiting for an admission slot", ("class",)
+))
+
+
+class Overloaded(Exception):
+    """No slot freed up: the wait queue is full or the wait timed out."""
+
+
+# -------------------------------------------------
+# 🔹 CONCURRENCY LIMIT WITH A BOUNDED WAIT QUEUE
+# -------------------------------------------------
+class ConcurrencyLimiter:
+    def __init__(self, name: str, limit: int, max_queue: int):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: deque = deque()
+
+    async def acquire(self, timeout: float) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            admission_active.set(self.active, self.name)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            raise Overloaded("queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        admission_queued.set(len(self._waiters), self.name)
+        try:
+            # release() hands its slot straight to the first waiter
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # the slot may have been handed over just as the wait expired
+            if not (future.done() and not future.cancelled()):
+                raise Overloaded("timed out waiting for a slot")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+            admission_queued.set(len(self._waiters), self.name)
+
+    def release(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+        admission_active.set(self.active, self.name)
+
+
+# -------------------------------------------------
+# 🔹 PER-CLIENT TOKEN BUCKETS
+# -------------------------------------------------
+class TokenBuckets:
+    def __init__(self, rate: float, burst: float, max_clients: int = 10000):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_clients = max_clients
+        # client -> (tokens, last refill); least recently seen first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, client: str) -> float:
+        """0 if a token was taken, else seconds until one is available."""
+        now = time.monotonic()
+        tokens, last = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+# -------------------------------------------------
+# 🔹 ROUTE CLASSES
+# routes are referenced by name (the endpoint function) so the classes
+# survive prefix changes; limits come from settings
+# -------------------------------------------------
+@dataclass
+class AdmissionClass:
+    name: str
+    routes: List[str]
+    # "concurrency,queue,rate,burst"; rate 0 disables the rate limit
+    spec: str
+    limiter: Optional[ConcurrencyLimiter] = field(default=None, init=False)
+    buckets: Optional[TokenBuckets] = field(default=None, init=False)
+
+    def __post_init__(self):
+        concurrency, queue, rate, burst = (float(part) for part in self.spec.split(","))
+        self.limiter = ConcurrencyLimiter(self.name, int(concurrency), int(queue))
+        self.buckets = TokenBuckets(rate, burst) if rate > 0 else None
+
+
+def default_classes() -> List[AdmissionClass]:
+    return [
+        AdmissionClass("export", [
+            "export_orders_csv",
+            "download_import_rejects",
+        ], settings.admission_export),
+        AdmissionClass("bulk", [
+            "add_bulk_products",
+            "import_products",
+            "bulk_update_products",
+            "bulk_delete_products",
+            "create_bulk_categories",
+            "bulk_create_variants",
+            "bulk_update_variants",
+            "bulk_delete_variants",
+            "rebalance_variant_stock",
+            "rebuild_sales_rollups",
+        ], settings.admission_bulk),
+        AdmissionClass("orders_list", [
+            "get_all_orders",
+            "get_user_orders",
+        ], settings.admission_orders_list),
+        AdmissionClass("catalog", [
+            "get_all_products",
+            "filter_products",
+            "search_products",
+            "text_search_products",
+            "autocomplete_products",
+            "get_products_batch",
+            "get_product_by_id",
+            "get_product_details_batch",
+            "get_product_detail",
+            "get_variants_by_product",
+            "get_all_categories",
+        ], settings.admission_catalog),
+    ]
+
+
+# -------------------------------------------------
+# 🔹 ROUTE NAMES
+# -------------------------------------------------
+def route_names(routes) -> Set[str]:
+    """Names of every route, however routers are included."""
+    return {route.name for _, route in iter_routes(routes) if getattr(route, "name", None)}
+
+
+# -------------------------------------------------
+# 🔹 ADMISSION (app-wide dependency)
+# A dependency runs after routing, so the request is classified by the
+# route it matched (scope["route"]), however routers are nested. Its
+# exit code runs once the response is sent, so a streamed export holds
+# its slot for as long as it is streaming.
+# -------------------------------------------------
+class AdmissionControl:
+    def __init__(self, classes: Optional[List[AdmissionClass]] = None):
+        self.classes = classes if classes is not None else default_classes()
+        self.by_name: Dict[str, AdmissionClass] = {
+            name: admission_class
+            for admission_class in self.classes
+            for name in admission_class.routes
+        }
+
+    def check_routes(self, routes) -> None:
+        """Fail startup when a class names a route that doesn't exist:
+        a typo would otherwise leave that route unprotected."""
+        missing = set(self.by_name) - route_names(routes)
+        if missing:
+            raise RuntimeError(f"Admission classes name unknown routes: {sorted(missing)}")
+
+    def classify(self, route) -> Optional[AdmissionClass]:
+        return self.by_name.get(getattr(route, "name", None))
+
+
+admission = AdmissionControl()
+
+
+def client_id(request: Request) -> str:
+    if settings.admission_client_header:
+        value = request.headers.get(settings.admission_client_header)
+        if value:
+            # X-Forwarded-For style: the first hop is the client
+            return value.split(",")[0].strip()
+    return request.client.host if request.client else "-"
+
+
+def retry_after(seconds: float) -> dict:
+    return {"Retry-After": str(max(1, math.ceil(seconds)))}
+
+
+async def admit(request: Request):
+    admission_class = None
+    if settings.admission_enabled:
+        admission_class = admission.classify(request.scope.get("route"))
+    if admission_class is None:
+        yield
+        return
+
+    if admission_class.buckets is not None:
+        wait = admission_class.buckets.take(client_id(request))
+        if wait:
+            admission_rejected.inc(admission_class.name, "rate_limited")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, slow down",
+                headers=retry_after(wait)
+            )
+
+    try:
+        await admission_class.limiter.acquire(settings.admission_max_wait_seconds)
+    except Overloaded as e:
+        admission_rejected.inc(admission_class.name, "overloaded")
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server busy ({e}), retry shortly",
+            headers=retry_after(1)
+        )
+
+    try:
+        yield
+    finally:
+        admission_class.limiter.release()
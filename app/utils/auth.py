@@ -0,0 +1,99 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import bcrypt
+
+from app.config import settings
+
+BCRYPT_ROUNDS = settings.bcrypt_rounds
+HASH_WORKERS = settings.hash_workers
+HASH_MAX_PENDING = settings.hash_max_pending
+
+# bcrypt only reads this many bytes of a password; longer ones are cut
+# here, as passlib did, so hashes made through it keep verifying
+BCRYPT_MAX_BYTES = 72
+
+
+class HasherBusy(Exception):
+    """Raised when too many hash/verify calls are already queued."""
+
+
+# -------------------------------------------------
+# 🔹 PASSWORD HASHER
+# bcrypt is pure CPU work; running it inline would stall the event loop
+# for every other request on the worker. The bcrypt extension releases
+# the GIL, so a small thread pool gives real parallelism.
+# -------------------------------------------------
+class PasswordHasher:
+    def __init__(
+        self,
+        rounds: int = BCRYPT_ROUNDS,
+        workers: int = HASH_WORKERS,
+        max_pending: int = HASH_MAX_PENDING
+    ):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dummy_hash: Optional[str] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        # queued + running jobs; beyond the limit callers fail fast
+        if self.pending >= self.max_pending:
+            raise HasherBusy()
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    def _hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode()[:BCRYPT_MAX_BYTES], salt).decode()
+
+    def _verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        try:
+            valid = bcrypt.checkpw(password.encode()[:BCRYPT_MAX_BYTES], hashed.encode())
+        except ValueError:
+            # not a bcrypt hash
+            return False, None
+        if valid and int(hashed.split("$")[2]) < self.rounds:
+            return True, self._hash(password)
+        return valid, None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._hash, password)
+
+    async def verify(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Return (valid, new_hash); new_hash is set when the stored hash
+        used an outdated cost factor and should be replaced."""
+        return await self._run(self._verify_and_update, password, hashed)
+
+    async def dummy_verify(self, password: str) -> None:
+        """Costs what a verify does, for logins with an unknown email, so
+        response times don't tell which emails are registered."""
+        if self._dummy_hash is None:
+            # hashing costs the same as verifying
+            self._dummy_hash = await self.hash(password)
+        else:
+            await self.verify(password, self._dummy_hash)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
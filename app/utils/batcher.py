@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError, DuplicateKeyError, WriteError
+
+from app.utils.metrics import COUNT_BUCKETS, Counter, Gauge, Histogram, current_request, registry
+
+logger = logging.getLogger(__name__)
+
+
+class BatcherBusy(Exception):
+    """Raised when the insert queue is full."""
+
+
+batch_queue_depth = registry.register(Gauge(
+    "insert_batch_queue_depth", "Documents waiting for a group-commit insert", ("batcher",)
+))
+batch_size = registry.register(Histogram(
+    "insert_batch_size", "Documents per group-commit insert_many", ("batcher",),
+    buckets=COUNT_BUCKETS
+))
+batch_wait = registry.register(Histogram(
+    "insert_batch_wait_seconds", "Time from enqueue to the insert's result", ("batcher",)
+))
+batch_documents = registry.register(Counter(
+    "insert_batch_documents_total", "Documents written by group-commit inserts", ("batcher", "outcome")
+))
+
+
+# -------------------------------------------------
+# 🔹 GROUP-COMMIT INSERTS
+# -------------------------------------------------
+class InsertBatcher:
+    """Collect concurrent inserts into one unordered insert_many.
+
+    A batch is sent when `max_batch` documents are queued or `linger`
+    seconds after its first document, whichever comes first; up to
+    `max_in_flight` batches are written at once. Each caller's await
+    returns its own inserted _id or raises its own error (e.g. a
+    DuplicateKeyError), whatever happened to the rest of the batch.
+    `on_commit(docs)` runs once per batch with the documents written.
+    """
+
+    def __init__(
+        self,
+        collection,
+        name: str,
+        max_batch: int = 100,
+        linger: float = 0.002,
+        max_queue: int = 10000,
+        max_in_flight: int = 4,
+        on_commit: Optional[Callable[[List[dict]], Awaitable[None]]] = None
+    ):
+        self.collection = collection
+        self.name = name
+        self.max_batch = max_batch
+        self.linger = linger
+        self.max_in_flight = max_in_flight
+        self.on_commit = on_commit
+        self._queue: Optional[asyncio.Queue] = None
+        self._max_queue = max_queue
+        self._full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._writes: set = set()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self._max_queue)
+            self._full = asyncio.Event()
+            self._worker = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Write everything still queued, then stop the worker."""
+        if self._worker is None:
+            return
+        await self._queue.join()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def insert(self, doc: dict):
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((doc, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            raise BatcherBusy()
+        batch_queue_depth.set(self._queue.qsize(), self.name)
+        if self._queue.qsize() >= self.max_batch:
+            self._full.set()
+        return await future
+
+    async def _run(self) -> None:
+        # the worker is started from inside some request; don't charge
+        # every later batch's Mongo commands to that request
+        current_request.set(None)
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        while True:
+            batch = [await self._queue.get()]
+            if len(batch) + self._queue.qsize() < self.max_batch:
+                self._full.clear()
+                try:
+                    await asyncio.wait_for(self._full.wait(), self.linger)
+                except asyncio.TimeoutError:
+                    pass
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            batch_queue_depth.set(self._queue.qsize(), self.name)
+
+            await semaphore.acquire()
+            task = asyncio.ensure_future(self._write(batch))
+            self._writes.add(task)
+
+            def done(task, batch=batch):
+                self._writes.discard(task)
+                semaphore.release()
+                for _ in batch:
+                    self._queue.task_done()
+
+            task.add_done_callback(done)
+
+    async def _write(self, batch: List[Tuple[dict, asyncio.Future, float]]) -> None:
+        docs = [doc for doc, _, _ in batch]
+        errors = {}
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                error_class = DuplicateKeyError if err.get("code") == 11000 else WriteError
+                errors[err["index"]] = error_class(err.get("errmsg"), err.get("code"), err)
+        except Exception as e:
+            # nothing is known to be written
+            errors = {index: e for index in range(len(batch))}
+
+        batch_size.observe(len(batch), self.name)
+        now = time.perf_counter()
+        committed = []
+        for index, (doc, future, queued_at) in enumerate(batch):
+            batch_wait.observe(now - queued_at, self.name)
+            error = errors.get(index)
+            if error is None:
+                committed.append(doc)
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(doc["_id"])
+            else:
+                future.set_exception(error)
+
+        batch_documents.inc(self.name, "inserted", amount=len(committed))
+        if errors:
+            batch_documents.inc(self.name, "failed", amount=len(errors))
+
+        if committed and self.on_commit is not None:
+            try:
+                await self.on_commit(committed)
+            except Exception:
+                logger.exception("on_commit failed for %s batch", self.name)
@@ -0,0 +1,193 @@
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.config import settings
+
+CACHE_MAX_ENTRIES = settings.cache_max_entries
+CACHE_TTL_SECONDS = settings.cache_ttl_seconds
+
+# returned by get() on a miss, so None can still be cached
+MISSING = object()
+
+
+# -------------------------------------------------
+# 🔹 BACKEND INTERFACE
+# -------------------------------------------------
+class CacheBackend:
+    """What the routes need from a cache.
+
+    Methods are async so a shared backend (Redis, memcached, ...) can be
+    plugged in with set_cache_backend() without touching the routes.
+    """
+
+    async def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    async def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    async def delete_prefix(self, prefix: str) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+# -------------------------------------------------
+# 🔹 IN-PROCESS LRU + TTL
+# -------------------------------------------------
+class LRUCache(CacheBackend):
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": "lru",
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+_backend: CacheBackend = LRUCache()
+
+
+def get_cache() -> CacheBackend:
+    return _backend
+
+
+def set_cache_backend(backend: CacheBackend) -> None:
+    global _backend
+    _backend = backend
+
+
+# -------------------------------------------------
+# 🔹 KEYS + INVALIDATION
+# -------------------------------------------------
+PRODUCT_PREFIX = "product:"
+VARIANTS_PREFIX = "variants:"
+STOCK_PREFIX = "stock:"
+AUTOCOMPLETE_PREFIX = "autocomplete:"
+CATEGORIES_KEY = "categories:all"
+
+
+# ids are lower-cased so "ABC..." and "abc..." share one entry
+def product_key(product_id) -> str:
+    return f"{PRODUCT_PREFIX}{str(product_id).lower()}"
+
+
+def variants_key(product_id) -> str:
+    return f"{VARIANTS_PREFIX}{str(product_id).lower()}"
+
+
+# aggregate stock of a sharded variant (see app/utils/stock_shards.py)
+def stock_key(variant_id) -> str:
+    return f"{STOCK_PREFIX}{str(variant_id).lower()}"
+
+
+def autocomplete_key(limit: int, prefix: str) -> str:
+    return f"{AUTOCOMPLETE_PREFIX}{limit}:{prefix}"
+
+
+# -------------------------------------------------
+# 🔹 INVALIDATION GENERATION
+# A read-through that started before an invalidation must not put what
+# it read back afterwards. Every invalidation below bumps the
+# generation; a read-through only fills the cache when the generation it
+# read under is still current (see fill_if_current).
+# -------------------------------------------------
+_generation = 0
+
+
+def invalidation_generation() -> int:
+    return _generation
+
+
+def _bump_generation() -> None:
+    global _generation
+    _generation += 1
+
+
+async def fill_if_current(key: str, value: Any, generation: int, ttl: Optional[float] = None) -> None:
+    if generation == _generation:
+        await get_cache().set(key, value, ttl=ttl)
+
+
+async def invalidate_products(*product_ids) -> None:
+    _bump_generation()
+    await get_cache().delete(*(product_key(pid) for pid in product_ids))
+
+
+async def invalidate_all_products() -> None:
+    _bump_generation()
+    await get_cache().delete_prefix(PRODUCT_PREFIX)
+
+
+async def invalidate_variants(*product_ids) -> None:
+    _bump_generation()
+    await get_cache().delete(*(variants_key(pid) for pid in product_ids))
+
+
+async def invalidate_all_variants() -> None:
+    _bump_generation()
+    await get_cache().delete_prefix(VARIANTS_PREFIX)
+
+
+async def invalidate_autocomplete() -> None:
+    _bump_generation()
+    await get_cache().delete_prefix(AUTOCOMPLETE_PREFIX)
+
+
+async def invalidate_categories() -> None:
+    _bump_generation()
+    await get_cache().delete(CATEGORIES_KEY)
@@ -0,0 +1,485 @@
+"""Cross-worker cache invalidation.
+
+Every worker keeps its own read cache, and each route only invalidates
+what the worker that served the write holds. This subscriber follows
+the catalog collections and drops the keys another worker's (or node's)
+write made stale:
+
+* products             -> product_key, autocomplete (name / is_active)
+* product_variants     -> variants_key of the product, stock_key
+* variant_stock_shards -> stock_key of the variant
+* categories           -> the cached category list
+
+It follows one database-level change stream and checkpoints its resume
+token in `cache_sync_state`, so a restart picks up where it stopped
+(which matters once the cache backend outlives the worker). Servers
+without change streams (a standalone mongod) are polled on `updatedAt`
+instead; polling cannot see deletes, those age out with the cache TTL,
+and stock shards carry no `updatedAt`, so there the summed stock is
+only bounded by STOCK_TOTAL_CACHE_TTL_SECONDS.
+
+Try it against a local single-node replica set:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0
+    mongosh --eval "rs.initiate()"
+    MONGO_URL="mongodb://localhost:27017/?replicaSet=rs0" python -m app.utils.cache_sync
+
+then write through the API (or mongosh) and watch the invalidations it
+logs. CACHE_SYNC_MODE=poll exercises the fallback on the same server.
+"""
+import asyncio
+import logging
+import socket
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Optional
+
+from pymongo.errors import OperationFailure
+
+from app.config import settings
+from app.database import (
+    cache_sync_state_collection,
+    category_collection,
+    close,
+    get_database,
+    product_collection,
+    supports_change_streams,
+    variant_collection,
+    variant_stock_shard_collection
+)
+from app.utils.cache import (
+    STOCK_PREFIX,
+    get_cache,
+    invalidate_all_products,
+    invalidate_all_variants,
+    invalidate_autocomplete,
+    invalidate_categories,
+    invalidate_products,
+    invalidate_variants,
+    stock_key
+)
+from app.utils.metrics import Counter, current_request, registry
+
+logger = logging.getLogger(__name__)
+
+WATCHED = ("products", "product_variants", "variant_stock_shards", "categories")
+
+# product fields the autocomplete entries depend on
+AUTOCOMPLETE_FIELDS = {"name", "name_search", "is_active"}
+
+CHANGE_STREAM_PIPELINE = [
+    {"$match": {"$or": [
+        {"ns.coll": {"$in": list(WATCHED)}},
+        {"operationType": {"$in": ["dropDatabase", "invalidate"]}}
+    ]}},
+    {"$project": {
+        "operationType": 1,
+        "ns": 1,
+        "documentKey": 1,
+        "fullDocument.productId": 1,
+        "fullDocument.variant_id": 1,
+        "updateDescription.updatedFields": 1,
+        "updateDescription.removedFields": 1
+    }}
+]
+
+# events applied together (one variant lookup), and how long to keep
+# collecting them once the first one arrived
+EVENT_BATCH_SIZE = 100
+EVENT_BATCH_LINGER = 0.1
+MAX_AWAIT_MS = 500
+
+# more changed documents than this in one poll drops the whole collection's keys
+POLL_MAX_DOCS = 5000
+
+NOT_REPLICATED = 40573                 # $changeStream on a standalone
+HISTORY_LOST = (280, 286)              # resume token no longer in the oplog
+
+sync_events = registry.register(Counter(
+    "cache_sync_events_total", "Catalog changes seen by the cache subscriber", ("collection",)
+))
+sync_errors = registry.register(Counter(
+    "cache_sync_errors_total", "Cache subscriber failures (it restarts itself)", ("mode",)
+))
+
+
+class ChangeStreamsUnsupported(Exception):
+    """The server can't open a change stream; poll instead."""
+
+
+# -------------------------------------------------
+# 🔹 WHAT A BATCH OF CHANGES MAKES STALE
+# -------------------------------------------------
+@dataclass
+class Invalidation:
+    products: set = field(default_factory=set)
+    # variants whose summed stock is stale
+    variants: set = field(default_factory=set)
+    variant_products: set = field(default_factory=set)
+    # variants whose product is not in the event (updates)
+    unresolved: set = field(default_factory=set)
+    # stock shards whose variant is not in the event (updates)
+    unresolved_shards: set = field(default_factory=set)
+    all_products: bool = False
+    all_variants: bool = False
+    all_stock: bool = False
+    autocomplete: bool = False
+    categories: bool = False
+
+    def flush(self, collection: Optional[str] = None) -> None:
+        """Everything cached from `collection` (None: from all of them)."""
+        if collection in (None, "products"):
+            self.all_products = True
+            self.autocomplete = True
+        if collection in (None, "product_variants"):
+            self.all_variants = True
+        if collection in (None, "product_variants", "variant_stock_shards"):
+            self.all_stock = True
+        if collection in (None, "categories"):
+            self.categories = True
+
+    def add_event(self, event: dict) -> None:
+        operation = event.get("operationType")
+        collection = event.get("ns", {}).get("coll")
+
+        if operation in ("invalidate", "dropDatabase"):
+            self.flush()
+            return
+        if operation in ("drop", "rename"):
+            self.flush(collection)
+            return
+
+        doc_id = event.get("documentKey", {}).get("_id")
+        description = event.get("updateDescription") or {}
+        changed = {
+            name.split(".")[0]
+            for name in [
+                *(description.get("updatedFields") or {}),
+                *(description.get("removedFields") or [])
+            ]
+        }
+
+        if collection == "products":
+            self.products.add(doc_id)
+            if operation != "update" or changed & AUTOCOMPLETE_FIELDS:
+                self.autocomplete = True
+
+        elif collection == "product_variants":
+            self.variants.add(doc_id)
+            if "productId" in changed:
+                # moved to another product; the old one is not in the event
+                self.all_variants = True
+            product_id = (event.get("fullDocument") or {}).get("productId")
+            if product_id is not None:
+                self.variant_products.add(product_id)
+            elif operation == "delete":
+                self.all_variants = True
+            else:
+                self.unresolved.add(doc_id)
+
+        elif collection == "variant_stock_shards":
+            variant_id = (event.get("fullDocument") or {}).get("variant_id")
+            if variant_id is not None:
+                self.variants.add(variant_id)
+            elif operation == "delete":
+                self.all_stock = True
+            else:
+                self.unresolved_shards.add(doc_id)
+
+        elif collection == "categories":
+            self.categories = True
+
+    def add_document(self, collection: str, doc: dict) -> None:
+        # polling: the changed fields are unknown
+        if collection == "products":
+            self.products.add(doc["_id"])
+            self.autocomplete = True
+        elif collection == "product_variants":
+            self.variants.add(doc["_id"])
+            self.variant_products.add(doc.get("productId"))
+        elif collection == "categories":
+            self.categories = True
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.products or self.variants or self.all_products or self.all_variants
+            or self.all_stock or self.autocomplete or self.categories
+        )
+
+
+async def apply_invalidation(invalidation: Invalidation) -> None:
+    if invalidation.unresolved and not invalidation.all_variants:
+        found = 0
+        async for variant in variant_collection.find(
+            {"_id": {"$in": list(invalidation.unresolved)}}, {"productId": 1}
+        ):
+            invalidation.variant_products.add(variant["productId"])
+            found += 1
+        if found < len(invalidation.unresolved):
+            # deleted in the meantime; its product is unknown
+            invalidation.all_variants = True
+
+    if invalidation.unresolved_shards and not invalidation.all_stock:
+        found = 0
+        async for shard in variant_stock_shard_collection.find(
+            {"_id": {"$in": list(invalidation.unresolved_shards)}}, {"variant_id": 1}
+        ):
+            invalidation.variants.add(shard["variant_id"])
+            found += 1
+        if found < len(invalidation.unresolved_shards):
+            invalidation.all_stock = True
+
+    if invalidation.all_products:
+        await invalidate_all_products()
+    elif invalidation.products:
+        await invalidate_products(*invalidation.products)
+
+    if invalidation.all_variants:
+        await invalidate_all_variants()
+    else:
+        await invalidate_variants(*(pid for pid in invalidation.variant_products if pid is not None))
+
+    if invalidation.all_variants or invalidation.all_stock:
+        await get_cache().delete_prefix(STOCK_PREFIX)
+    else:
+        await get_cache().delete(*(stock_key(vid) for vid in invalidation.variants))
+
+    if invalidation.autocomplete:
+        await invalidate_autocomplete()
+    if invalidation.categories:
+        await invalidate_categories()
+
+    logger.debug(
+        "Invalidated products=%s variants of=%s all_products=%s all_variants=%s autocomplete=%s categories=%s",
+        len(invalidation.products), len(invalidation.variant_products),
+        invalidation.all_products, invalidation.all_variants,
+        invalidation.autocomplete, invalidation.categories
+    )
+
+
+# -------------------------------------------------
+# 🔹 SUBSCRIBER (one per worker, started from the lifespan)
+# -------------------------------------------------
+def sync_id() -> str:
+    # the workers on one host follow the same stream, so any of their
+    # recent tokens is a good place to resume from
+    return settings.cache_sync_id or socket.gethostname()
+
+
+class CacheSubscriber:
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.events = 0
+        self.errors = 0
+        self.last_change_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._token: Optional[dict] = None
+        self._token_loaded = False
+        self._saved_at = 0.0
+
+    def start(self) -> None:
+        if settings.cache_sync_mode != "off" and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.mode == "change_stream" and self._token is not None:
+            try:
+                await self._save_token()
+            except Exception:
+                logger.exception("Saving the cache sync resume token failed")
+
+    def status(self) -> dict:
+        return {
+            "mode": self.mode or settings.cache_sync_mode,
+            "running": self._task is not None and not self._task.done(),
+            "events": self.events,
+            "errors": self.errors,
+            "last_change_at": self.last_change_at,
+            "sync_id": sync_id()
+        }
+
+    async def _run(self) -> None:
+        # started from the lifespan; keep its Mongo commands out of any request
+        current_request.set(None)
+        mode = settings.cache_sync_mode
+        failures = 0
+        while True:
+            try:
+                if mode == "auto":
+                    mode = "change_stream" if await supports_change_streams() else "poll"
+                if mode == "change_stream":
+                    await self._follow()
+                else:
+                    await self._poll()
+                failures = 0
+            except asyncio.CancelledError:
+                raise
+            except ChangeStreamsUnsupported:
+                logger.warning("Change streams unavailable; polling updatedAt for cache invalidation")
+                mode = "poll"
+            except Exception:
+                failures += 1
+                self.errors += 1
+                sync_errors.inc(mode)
+                logger.exception("Cache subscriber failed (%s); restarting", mode)
+                await asyncio.sleep(min(30.0, 0.5 * 2 ** failures))
+
+    async def _flush_all(self) -> None:
+        # nothing seen before this point can be trusted
+        invalidation = Invalidation()
+        invalidation.flush()
+        await apply_invalidation(invalidation)
+
+    def _count(self, counts: dict) -> None:
+        for collection, count in counts.items():
+            sync_events.inc(collection or "-", amount=count)
+            self.events += count
+        self.last_change_at = datetime.utcnow()
+
+    # ---------- change streams ----------
+    async def _load_token(self) -> Optional[dict]:
+        doc = await cache_sync_state_collection.find_one({"_id": sync_id()})
+        return (doc or {}).get("resume_token")
+
+    async def _save_token(self) -> None:
+        await cache_sync_state_collection.update_one(
+            {"_id": sync_id()},
+            {"$set": {"resume_token": self._token, "updatedAt": datetime.utcnow()}},
+            upsert=True
+        )
+        self._saved_at = time.monotonic()
+
+    async def _follow(self) -> None:
+        if not self._token_loaded:
+            self._token = await self._load_token()
+            self._token_loaded = True
+
+        try:
+            async with get_database().watch(
+                CHANGE_STREAM_PIPELINE,
+                resume_after=self._token,
+                max_await_time_ms=MAX_AWAIT_MS
+            ) as stream:
+                # entering opened the stream, so a write committed while
+                # flushing still arrives as an event
+                if self._token is None:
+                    await self._flush_all()
+                self.mode = "change_stream"
+                loop = asyncio.get_running_loop()
+                while stream.alive:
+                    events = []
+                    event = await stream.try_next()
+                    first_at = loop.time()
+                    while event is not None:
+                        events.append(event)
+                        if len(events) >= EVENT_BATCH_SIZE or loop.time() - first_at > EVENT_BATCH_LINGER:
+                            break
+                        event = await stream.try_next()
+
+                    if events:
+                        invalidation = Invalidation()
+                        counts = {}
+                        for event in events:
+                            invalidation.add_event(event)
+                            collection = event.get("ns", {}).get("coll")
+                            counts[collection] = counts.get(collection, 0) + 1
+                        await apply_invalidation(invalidation)
+                        self._count(counts)
+
+                        if events[-1].get("operationType") == "invalidate":
+                            # the stream is closed; start a fresh one
+                            self._token = None
+                            await self._save_token()
+                            return
+
+                    self._token = stream.resume_token
+                    if time.monotonic() - self._saved_at >= settings.cache_sync_checkpoint_seconds:
+                        await self._save_token()
+
+        except OperationFailure as e:
+            if e.code == NOT_REPLICATED:
+                raise ChangeStreamsUnsupported() from e
+            if e.code in HISTORY_LOST:
+                logger.warning("Cache sync resume token expired; flushing catalog cache keys")
+                self._token = None
+                await self._save_token()
+                return
+            raise
+
+    # ---------- polling fallback ----------
+    async def _poll(self) -> None:
+        self.mode = "poll"
+        await self._flush_all()
+        polled = (
+            ("products", product_collection, {"version": 1}),
+            ("product_variants", variant_collection, {"productId": 1, "version": 1}),
+            ("categories", category_collection, {"version": 1}),
+        )
+        overlap = timedelta(seconds=settings.cache_sync_poll_overlap_seconds)
+        polled_at = datetime.utcnow()
+        previous = {}
+
+        while True:
+            await asyncio.sleep(settings.cache_sync_poll_seconds)
+            started = datetime.utcnow()
+            invalidation = Invalidation()
+            counts = {}
+            seen = {}
+            for name, collection, projection in polled:
+                # from the last successful poll, minus the skew allowance;
+                # documents already seen at the same version are skipped
+                docs = await collection.find(
+                    {"updatedAt": {"$gte": polled_at - overlap}}, projection
+                ).limit(POLL_MAX_DOCS + 1).to_list(None)
+                if len(docs) > POLL_MAX_DOCS:
+                    invalidation.flush(name)
+                    counts[name] = len(docs)
+                    continue
+                for doc in docs:
+                    key = (name, doc["_id"])
+                    seen[key] = doc.get("version")
+                    if key in previous and previous[key] == seen[key]:
+                        continue
+                    invalidation.add_document(name, doc)
+                    counts[name] = counts.get(name, 0) + 1
+
+            if invalidation:
+                await apply_invalidation(invalidation)
+                self._count(counts)
+            previous = seen
+            polled_at = started
+
+
+cache_subscriber = CacheSubscriber()
+
+
+# -------------------------------------------------
+# CLI:  python -m app.utils.cache_sync   (logs invalidations until Ctrl-C)
+# -------------------------------------------------
+async def _main() -> None:
+    logging.basicConfig(level=logging.DEBUG, format="%(asctime)s %(message)s")
+    logging.getLogger("pymongo").setLevel(logging.WARNING)
+    cache_subscriber.start()
+    try:
+        while True:
+            await asyncio.sleep(5)
+            logger.info("%s", cache_subscriber.status())
+    finally:
+        await cache_subscriber.stop()
+        close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,70 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable
+
+from fastapi import Request, Response
+
+# bump when the JSON shape of a cached/served representation changes, so
+# old ETags stop matching new bodies
+REPRESENTATION_VERSION = "2"
+
+
+# -------------------------------------------------
+# 🔹 VERSION STAMPS (every product/variant/category write)
+# -------------------------------------------------
+def stamp_new(doc: dict) -> dict:
+    doc["version"] = 1
+    doc["updatedAt"] = datetime.utcnow()
+    return doc
+
+
+def stamp_update(update: dict) -> dict:
+    update.setdefault("$set", {})["updatedAt"] = datetime.utcnow()
+    update.setdefault("$inc", {})["version"] = 1
+    return update
+
+
+# the stamps are internal; served documents leave them out
+def strip_stamps(doc: dict) -> dict:
+    doc.pop("version", None)
+    doc.pop("updatedAt", None)
+    return doc
+
+
+# -------------------------------------------------
+# 🔹 ETAGS
+# Built from ids and version counters, never from the serialized body,
+# so checking If-None-Match costs no serialization.
+# -------------------------------------------------
+def make_etag(*parts) -> str:
+    digest = hashlib.blake2b(
+        repr((REPRESENTATION_VERSION,) + parts).encode(), digest_size=16
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def document_etag(kind: str, doc: dict) -> str:
+    return make_etag(kind, str(doc["_id"]), doc.get("version", 0))
+
+
+def list_etag(kind: str, docs: Iterable[dict], *extra) -> str:
+    return make_etag(
+        kind, tuple((str(doc["_id"]), doc.get("version", 0)) for doc in docs), *extra
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    candidates = [tag.strip() for tag in header.split(",")]
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
@@ -0,0 +1,172 @@
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.database import (
+    get_client,
+    order_collection,
+    product_collection,
+    supports_transactions
+)
+from app.utils.batcher import BatcherBusy, InsertBatcher
+from app.utils.etag import stamp_update
+from app.utils.sales_rollups import record_order_changes
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_id: str):
+        super().__init__(f"Insufficient stock for product {product_id}")
+        self.product_id = product_id
+
+
+class ProductGone(Exception):
+    def __init__(self, product_id: str):
+        super().__init__(f"Product not found for ID {product_id}")
+        self.product_id = product_id
+
+
+# -------------------------------------------------
+# 🔹 RESERVATION
+# Every decrement goes out in one bulk_write of conditional updates (in
+# product id order, so concurrent checkouts touch shared products in the
+# same order); each only applies while enough stock is left. An applied
+# decrement also pushes the order's _id onto the product's
+# `reservations` (only the last RESERVATION_MARKERS are kept), so after
+# a partial reservation the lines that did apply can be released by
+# marker, without reading anything. Products are only read back to
+# report which line failed.
+# -------------------------------------------------
+RESERVATION_MARKERS = 50
+
+
+def reservation_ops(quantities: Dict[str, int], marker: ObjectId) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"_id": ObjectId(pid), "stock": {"$gte": quantities[pid]}},
+            stamp_update({
+                "$inc": {"stock": -quantities[pid]},
+                "$push": {"reservations": {"$each": [marker], "$slice": -RESERVATION_MARKERS}}
+            })
+        )
+        for pid in sorted(quantities)
+    ]
+
+
+def release_ops(quantities: Dict[str, int], marker: ObjectId) -> List[UpdateOne]:
+    # only the lines that applied carry the marker
+    return [
+        UpdateOne(
+            {"_id": ObjectId(pid), "reservations": marker},
+            stamp_update({"$inc": {"stock": quantities[pid]}, "$pull": {"reservations": marker}})
+        )
+        for pid in sorted(quantities)
+    ]
+
+
+async def reserve_stock(quantities: Dict[str, int], marker: ObjectId, session=None) -> bool:
+    """True when every line was decremented."""
+    result = await product_collection.bulk_write(
+        reservation_ops(quantities, marker), ordered=True, session=session
+    )
+    return result.matched_count == len(quantities)
+
+
+async def release_stock(quantities: Dict[str, int], marker: ObjectId) -> None:
+    await product_collection.bulk_write(release_ops(quantities, marker), ordered=False)
+
+
+async def shortage(quantities: Dict[str, int], marker: ObjectId, session=None) -> Exception:
+    """Why a reservation fell short: the first line (in reservation
+    order) that was not decremented."""
+    reserved = {}
+    async for product in product_collection.find(
+        {"_id": {"$in": [ObjectId(pid) for pid in quantities]}},
+        {"reservations": 1},
+        session=session
+    ):
+        reserved[str(product["_id"])] = marker in product.get("reservations", [])
+
+    for pid in sorted(quantities):
+        if pid not in reserved:
+            return ProductGone(pid)
+        if not reserved[pid]:
+            return InsufficientStock(pid)
+    # the marker was already pushed out by later reservations
+    return InsufficientStock(min(quantities))
+
+
+# -------------------------------------------------
+# 🔹 GROUP COMMIT (ORDER_GROUP_COMMIT)
+# orders from concurrent checkouts share one insert_many; the sales
+# rollups are updated once per batch instead of once per order
+# -------------------------------------------------
+async def record_committed_orders(orders: List[dict]) -> None:
+    await record_order_changes([(order, 1) for order in orders])
+
+
+order_batcher = InsertBatcher(
+    order_collection,
+    "orders",
+    max_batch=settings.order_batch_max_size,
+    linger=settings.order_batch_linger_ms / 1000,
+    max_queue=settings.order_batch_max_queue,
+    max_in_flight=settings.order_batch_max_in_flight,
+    on_commit=record_committed_orders
+)
+
+
+# -------------------------------------------------
+# 🔹 RESERVE STOCK + INSERT ORDER
+# -------------------------------------------------
+async def reserve_and_insert(order: dict, quantities: Dict[str, int]) -> None:
+    """Decrement stock for every product and insert the order, atomically
+    when the deployment supports transactions.
+
+    Raises InsufficientStock or ProductGone (or BatcherBusy in group
+    commit mode); nothing is left reserved when either is raised.
+    """
+    # the order's _id doubles as its reservation marker
+    order.setdefault("_id", ObjectId())
+    if settings.order_group_commit:
+        # a shared insert_many cannot join one order's transaction, so
+        # group commit always takes the compensating path
+        await _reserve_with_compensation(order, quantities, order_batcher.insert)
+    elif await supports_transactions():
+        await _reserve_in_transaction(order, quantities)
+    else:
+        await _reserve_with_compensation(order, quantities)
+
+
+async def _reserve_in_transaction(order: dict, quantities: Dict[str, int]) -> None:
+    async def callback(session):
+        if not await reserve_stock(quantities, order["_id"], session=session):
+            # raising aborts the transaction, decrements included
+            raise await shortage(quantities, order["_id"], session=session)
+
+        await order_collection.insert_one(order, session=session)
+
+    # with_transaction retries write conflicts between concurrent checkouts
+    async with await get_client().start_session() as session:
+        await session.with_transaction(callback)
+
+
+async def _reserve_with_compensation(
+    order: dict,
+    quantities: Dict[str, int],
+    insert: Optional[Callable[[dict], Awaitable]] = None
+) -> None:
+    insert = insert or order_collection.insert_one
+
+    if not await reserve_stock(quantities, order["_id"]):
+        error = await shortage(quantities, order["_id"])
+        await release_stock(quantities, order["_id"])
+        raise error
+
+    try:
+        await insert(order)
+    except (PyMongoError, BatcherBusy):
+        await release_stock(quantities, order["_id"])
+        raise
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # every waiter may have gone away; don't log "exception never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+# -------------------------------------------------
+# 🔹 BATCH LOADER (DataLoader-style coalescing)
+# -------------------------------------------------
+class BatchLoader:
+    """Coalesce concurrent single-key lookups into one batched call.
+
+    Keys requested within `window` seconds of each other (or until
+    `max_batch` keys are queued) are fetched with a single call to
+    `batch_fn(keys) -> {key: value}`. Concurrent requests for a key that
+    is queued or already being fetched share that result. Nothing is
+    kept once a batch resolves; caching is the caller's job.
+
+    With `generation` (the cache's invalidation generation), a fetch
+    already sent is only shared while the generation is the one it was
+    sent under: after an invalidation, callers get a fresh read.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+        window: float = 0.002,
+        max_batch: int = 100,
+        generation: Optional[Callable[[], int]] = None
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch = max_batch
+        self.generation = generation
+        self._queued: Dict[Hashable, asyncio.Future] = {}
+        # key -> (future, generation it was dispatched under)
+        self._in_flight: Dict[Hashable, Tuple[asyncio.Future, Optional[int]]] = {}
+        self._timer = None
+
+    def _current_generation(self) -> Optional[int]:
+        return self.generation() if self.generation else None
+
+    async def load(self, key: Hashable) -> Any:
+        future = self._queued.get(key)
+        if future is None and key in self._in_flight:
+            in_flight, generation = self._in_flight[key]
+            if generation == self._current_generation():
+                future = in_flight
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            future.add_done_callback(_consume_exception)
+            self._queued[key] = future
+
+            if len(self._queued) >= self.max_batch:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.window, self._dispatch)
+
+        # one cancelled caller must not cancel the result others share
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._queued = self._queued, {}
+        if batch:
+            generation = self._current_generation()
+            self._in_flight.update((key, (future, generation)) for key, future in batch.items())
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: Dict[Hashable, asyncio.Future]) -> None:
+        try:
+            results = await self.batch_fn(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for key, future in batch.items():
+                if not future.done():
+                    future.set_result(results.get(key))
+        finally:
+            for key, future in batch.items():
+                if self._in_flight.get(key, (None,))[0] is future:
+                    del self._in_flight[key]
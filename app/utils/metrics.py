@@ -0,0 +1,349 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# -------------------------------------------------
+# 🔹 METRIC TYPES (Prometheus text format, no dependency)
+# Updates come from the event loop and from the driver's executor
+# threads, so each metric guards its samples with a lock.
+# -------------------------------------------------
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250, 1000, 5000)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in items
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[tuple, float] = {}
+
+    def set(self, value: float, *label_values) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1) -> None:
+        self.inc(*label_values, amount=-amount)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+            for values, value in items
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [bucket counts..., sum, count]
+        self._values: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        with self._lock:
+            series = self._values.get(label_values)
+            if series is None:
+                series = self._values[label_values] = [0] * (len(self.buckets) + 2)
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = [(values, list(series)) for values, series in self._values.items()]
+        lines = self.header()
+        for values, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _format_value(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {_format_value(float(series[-2]))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def on_collect(self, callback: Callable[[], None]) -> None:
+        """Run callback before every scrape, e.g. to refresh gauges."""
+        self._collectors.append(callback)
+
+    def render(self) -> str:
+        for callback in self._collectors:
+            callback()
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# -------------------------------------------------
+# 🔹 HTTP + MONGO METRICS
+# -------------------------------------------------
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+))
+http_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+))
+http_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "HTTP requests currently being handled", ("method",)
+))
+request_mongo_commands = registry.register(Histogram(
+    "http_request_mongo_commands", "MongoDB commands issued per HTTP request",
+    ("route",), buckets=COUNT_BUCKETS
+))
+request_mongo_seconds = registry.register(Histogram(
+    "http_request_mongo_seconds", "Time spent in MongoDB commands per HTTP request", ("route",)
+))
+
+mongo_commands = registry.register(Counter(
+    "mongo_commands_total", "MongoDB commands by outcome",
+    ("command", "collection", "route", "outcome")
+))
+mongo_latency = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency", ("command", "collection")
+))
+mongo_documents = registry.register(Counter(
+    "mongo_documents_returned_total", "Documents returned or affected by MongoDB commands",
+    ("command", "collection", "route")
+))
+
+
+# -------------------------------------------------
+# 🔹 PER-REQUEST ATTRIBUTION
+# The driver runs commands in executor threads with the caller's
+# context copied, so the listener sees the request that issued them.
+# -------------------------------------------------
+UNMATCHED_ROUTE = "unmatched"
+NO_ROUTE = "-"
+
+
+def iter_routes(routes, prefix: str = "") -> Iterator[Tuple[str, object]]:
+    """(full path template, route) for every route, looking inside
+    included routers whether FastAPI flattened them into the app or kept
+    them nested (a nested route's own path is relative to its router)."""
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            context = getattr(route, "include_context", None)
+            yield from iter_routes(included.routes, prefix + getattr(context, "prefix", ""))
+            continue
+        path = prefix + getattr(route, "path", "")
+        yield path, route
+        # Mount
+        nested = getattr(route, "routes", None)
+        if nested:
+            yield from iter_routes(nested, path)
+
+
+# {id(app): {id(route): full path template}}, built on first use
+_route_templates: Dict[int, Dict[int, str]] = {}
+
+
+def route_template(app, route) -> str:
+    templates = _route_templates.get(id(app))
+    if templates is None or id(route) not in templates:
+        templates = {id(r): path for path, r in iter_routes(getattr(app, "routes", []))}
+        _route_templates[id(app)] = templates
+    return templates.get(id(route), route.path)
+
+
+class RequestStats:
+    __slots__ = ("scope", "commands", "mongo_seconds", "_lock")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.commands = 0
+        self.mongo_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def route(self) -> str:
+        # set by FastAPI once the request has been routed; the template
+        # keeps label cardinality bounded (no raw ids)
+        route = self.scope.get("route")
+        if route is None:
+            return UNMATCHED_ROUTE
+        return route_template(self.scope.get("app"), route)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self.commands += 1
+            self.mongo_seconds += seconds
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = RequestStats(scope)
+        token = current_request.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_progress.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            http_in_progress.dec(method)
+
+            route = stats.route
+            http_requests.inc(method, route, str(status))
+            http_latency.observe(elapsed, method, route, str(status))
+            request_mongo_commands.observe(stats.commands, route)
+            request_mongo_seconds.observe(stats.mongo_seconds, route)
+
+
+# commands whose first argument is not a collection name
+_NO_COLLECTION = {"hello", "ismaster", "isMaster", "ping", "endSessions", "commitTransaction", "abortTransaction"}
+
+
+def _documents(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if "value" in reply:  # findAndModify
+        return 1 if reply["value"] is not None else 0
+    n = reply.get("n")
+    return n if isinstance(n, int) else 0
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._collections: Dict[Tuple[int, int], Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        name = event.command_name
+        collection = "-"
+        if name == "getMore":
+            collection = event.command.get("collection", "-")
+        elif name not in _NO_COLLECTION:
+            value = event.command.get(name)
+            if isinstance(value, str):
+                collection = value
+        with self._lock:
+            self._collections[(event.request_id, event.operation_id)] = (name, collection)
+
+    def _finish(self, event, outcome: str, reply: Optional[dict]) -> None:
+        with self._lock:
+            name, collection = self._collections.pop(
+                (event.request_id, event.operation_id), (event.command_name, "-")
+            )
+        seconds = event.duration_micros / 1_000_000
+
+        stats = current_request.get()
+        route = stats.route if stats else NO_ROUTE
+        if stats:
+            stats.record(seconds)
+
+        mongo_commands.inc(name, collection, route, outcome)
+        mongo_latency.observe(seconds, name, collection)
+        if reply is not None:
+            documents = _documents(reply)
+            if documents:
+                mongo_documents.inc(name, collection, route, amount=documents)
+
+    def succeeded(self, event):
+        self._finish(event, "success", event.reply)
+
+    def failed(self, event):
+        self._finish(event, "failure", None)
+
+
+mongo_listener = MongoCommandListener()
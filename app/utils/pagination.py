@@ -0,0 +1,125 @@
+import base64
+from typing import Any, Optional, Tuple
+
+from bson import ObjectId, json_util
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SORT_DIRECTIONS = {"asc": ASCENDING, "desc": DESCENDING}
+
+
+# -------------------------------------------------
+# 🔹 CURSOR TOKENS
+# -------------------------------------------------
+# A cursor is the (sort value, _id) of the last document on a page,
+# bound to the sort it was issued for. It is base64 encoded so clients
+# treat it as opaque.
+def encode_cursor(sort_field: str, direction: int, value: Any, last_id: ObjectId) -> str:
+    payload = json_util.dumps(
+        {"s": sort_field, "d": direction, "v": value, "id": last_id}
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_field: str, direction: int) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded).decode())
+        valid = (
+            data["s"] == sort_field
+            and data["d"] == direction
+            and isinstance(data["id"], ObjectId)
+        )
+    except Exception:
+        valid = False
+
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return data
+
+
+# Relevance-ranked results have no stable key to seek on, so their
+# cursor carries an offset instead (bounded by the caller).
+def encode_offset_cursor(offset: int) -> str:
+    payload = json_util.dumps({"o": offset})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = json_util.loads(base64.urlsafe_b64decode(padded).decode())["o"]
+        valid = isinstance(offset, int) and offset >= 0
+    except Exception:
+        valid = False
+
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return offset
+
+
+def keyset_filter(sort_field: str, direction: int, position: dict) -> dict:
+    op = "$gt" if direction == ASCENDING else "$lt"
+
+    if sort_field == "_id":
+        return {"_id": {op: position["id"]}}
+
+    # ties on the sort key are broken by _id
+    return {
+        "$or": [
+            {sort_field: {op: position["v"]}},
+            {sort_field: position["v"], "_id": {op: position["id"]}},
+        ]
+    }
+
+
+# -------------------------------------------------
+# 🔹 FETCH ONE PAGE
+# -------------------------------------------------
+async def keyset_page(
+    collection,
+    query: dict,
+    *,
+    projection: Optional[dict] = None,
+    sort_field: str = "_id",
+    direction: int = ASCENDING,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+) -> Tuple[list, Optional[str]]:
+    """Return one page of documents plus the cursor of the next page.
+
+    Every page is an index range scan starting right after the previous
+    page, so deep pages cost the same as the first one.
+    """
+    if cursor:
+        position = decode_cursor(cursor, sort_field, direction)
+        after = keyset_filter(sort_field, direction, position)
+        query = {"$and": [query, after]} if query else after
+
+    if sort_field == "_id":
+        sort = [("_id", direction)]
+    else:
+        sort = [(sort_field, direction), ("_id", direction)]
+
+    # one extra document tells us whether another page exists
+    docs = await (
+        collection.find(query, projection)
+        .sort(sort)
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(
+            sort_field, direction, last.get(sort_field), last["_id"]
+        )
+
+    return docs, next_cursor
@@ -0,0 +1,371 @@
+import asyncio
+import codecs
+import csv
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.config import settings
+from app.database import (
+    product_collection,
+    product_import_collection,
+    product_import_reject_collection
+)
+from app.schemas.product_schema import ProductCreate
+
+IMPORT_FORMATS = ("ndjson", "csv")
+# CSV cells holding a list ("tags") are "|"-separated
+CSV_LIST_FIELDS = ("tags",)
+CSV_LIST_SEPARATOR = "|"
+# characters of a rejected row kept in the rejects report
+MAX_REJECT_RAW = 2000
+
+
+class ImportInProgress(Exception):
+    def __init__(self, import_id: str):
+        super().__init__(f"Import {import_id} is already running")
+        self.import_id = import_id
+
+
+class ImportAborted(Exception):
+    """The upload itself is unusable (not a bad row): stop the import."""
+
+
+# -------------------------------------------------
+# 🔹 PARSING
+# the body is read chunk by chunk; at most one line is buffered
+# -------------------------------------------------
+async def read_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    try:
+        async for chunk in chunks:
+            buffer += decoder.decode(chunk)
+            lines = buffer.split("\n")
+            buffer = lines.pop()
+            for line in lines:
+                yield line.rstrip("\r")
+            if len(buffer) > settings.import_max_line_length:
+                raise ImportAborted(
+                    f"Line longer than {settings.import_max_line_length} characters"
+                )
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise ImportAborted("Upload is not valid UTF-8")
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def ndjson_rows(lines: AsyncIterator[str]):
+    """Yield (line, raw, row or None, error or None)."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_no, line, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, line, None, "Expected a JSON object"
+            continue
+        yield line_no, line, row, None
+
+
+def csv_row(header: List[str], values: List[str]) -> dict:
+    row = {}
+    for name, value in zip(header, values):
+        value = value.strip()
+        if name in CSV_LIST_FIELDS:
+            row[name] = [v.strip() for v in value.split(CSV_LIST_SEPARATOR) if v.strip()]
+        elif value:
+            # empty cells are missing values; pydantic coerces the rest
+            row[name] = value
+    return row
+
+
+async def csv_rows(lines: AsyncIterator[str]):
+    """Like ndjson_rows; the first record is the header. A quoted cell may
+    span lines, the record keeps the number of the line it starts on."""
+    header = None
+    line_no = 0
+    record, start = None, 0
+    async for line in lines:
+        line_no += 1
+        if record is None:
+            if not line.strip():
+                continue
+            record, start = line, line_no
+        else:
+            record += "\n" + line
+        # an odd number of quotes means a quoted cell is still open
+        if record.count('"') % 2:
+            if len(record) > settings.import_max_line_length:
+                raise ImportAborted(f"Unterminated quoted cell starting on line {start}")
+            continue
+
+        values = next(csv.reader([record]))
+        raw, record = record, None
+        if header is None:
+            header = [name.strip() for name in values]
+            # fail once here rather than rejecting every row below
+            missing = [
+                name for name, field in ProductCreate.model_fields.items()
+                if field.is_required() and name not in header
+            ]
+            if missing:
+                raise ImportAborted(f"CSV header is missing columns: {missing}")
+            continue
+        if len(values) != len(header):
+            yield start, raw, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield start, raw, csv_row(header, values), None
+
+    if record is not None:
+        yield start, record, None, "Unterminated quoted cell"
+
+
+def validation_errors(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors()
+    )
+
+
+# -------------------------------------------------
+# 🔹 PROGRESS
+# one document per import id in `product_imports`
+# -------------------------------------------------
+def format_import(job: dict) -> dict:
+    return {
+        "import_id": job["_id"],
+        "status": job["status"],
+        "format": job.get("format"),
+        "processed": job.get("processed", 0),
+        "inserted": job.get("inserted", 0),
+        "duplicates": job.get("duplicates", 0),
+        "rejected": job.get("rejected", 0),
+        "resume_after": job.get("resume_after", 0),
+        "attempts": job.get("attempts", 0),
+        "error": job.get("error"),
+        "started_at": job.get("started_at"),
+        "updated_at": job.get("updated_at"),
+        "finished_at": job.get("finished_at")
+    }
+
+
+async def claim_import(import_id: str, fmt: str) -> dict:
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=settings.import_stale_seconds)
+    try:
+        return await product_import_collection.find_one_and_update(
+            {
+                "_id": import_id,
+                "$or": [{"status": {"$ne": "running"}}, {"updated_at": {"$lt": stale}}]
+            },
+            {
+                "$set": {"status": "running", "format": fmt, "updated_at": now, "error": None},
+                "$setOnInsert": {
+                    "started_at": now,
+                    "resume_after": 0,
+                    "processed": 0,
+                    "inserted": 0,
+                    "duplicates": 0,
+                    "rejected": 0
+                },
+                "$inc": {"attempts": 1}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # the id exists but did not match: another upload is running it
+        raise ImportInProgress(import_id)
+
+
+async def finish_import(import_id: str, status: str, error: Optional[str] = None) -> dict:
+    now = datetime.utcnow()
+    return await product_import_collection.find_one_and_update(
+        {"_id": import_id},
+        {"$set": {"status": status, "error": error, "updated_at": now, "finished_at": now}},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+class Watermark:
+    """Highest line below which every batch has been written. Batches
+    finish out of order; a resumed import skips lines up to here."""
+
+    def __init__(self, start: int):
+        self.value = start
+        self._next = 0
+        self._done = {}
+
+    def complete(self, seq: int, last_line: int) -> int:
+        self._done[seq] = last_line
+        while self._next in self._done:
+            self.value = self._done.pop(self._next)
+            self._next += 1
+        return self.value
+
+
+# -------------------------------------------------
+# 🔹 BATCH WRITE
+# -------------------------------------------------
+async def write_batch(
+    import_id: str,
+    valid: List[Tuple[int, dict]],
+    rejects: List[dict]
+) -> dict:
+    counts = {"inserted": 0, "duplicates": 0, "rejected": 0}
+
+    if valid:
+        docs = [doc for _, doc in valid]
+        try:
+            result = await product_collection.insert_many(docs, ordered=False)
+            counts["inserted"] = len(result.inserted_ids)
+        except BulkWriteError as e:
+            counts["inserted"] = e.details.get("nInserted", 0)
+            for err in e.details.get("writeErrors", []):
+                line = valid[err["index"]][0]
+                if err.get("code") == 11000 and "import_id" in (err.get("keyPattern") or {}):
+                    # written by an earlier attempt of this import
+                    counts["duplicates"] += 1
+                else:
+                    rejects.append({"import_id": import_id, "line": line, "raw": None, "error": err["errmsg"]})
+
+    if rejects:
+        try:
+            await product_import_reject_collection.insert_many(rejects, ordered=False)
+            counts["rejected"] = len(rejects)
+        except BulkWriteError as e:
+            # rows already rejected by an earlier attempt are not counted twice
+            counts["rejected"] = e.details.get("nInserted", 0)
+            if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                raise
+
+    return counts
+
+
+# -------------------------------------------------
+# 🔹 RUN
+# -------------------------------------------------
+async def run_import(
+    import_id: str,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    to_document: Callable[[ProductCreate], dict]
+) -> dict:
+    """Stream an NDJSON or CSV upload into `products`.
+
+    Rows are validated against ProductCreate and written in unordered
+    batches of `import_batch_size`, at most `import_max_in_flight` at a
+    time; while that many are pending the body is not read any further,
+    so a fast client is held back by TCP instead of by our memory.
+    Every product keeps `import_id` / `import_line`. Re-sending the same
+    upload with the same id skips lines already written and ignores
+    duplicates, so an interrupted import can simply be retried.
+    """
+    job = await claim_import(import_id, fmt)
+    resume_after = job.get("resume_after", 0)
+    watermark = Watermark(resume_after)
+
+    semaphore = asyncio.Semaphore(settings.import_max_in_flight)
+    tasks = set()
+    errors = []
+
+    async def write(seq: int, last_line: int, processed: int, valid, rejects):
+        counts = await write_batch(import_id, valid, rejects)
+        await product_import_collection.update_one(
+            {"_id": import_id},
+            {
+                "$inc": {"processed": processed, **counts},
+                "$max": {"resume_after": watermark.complete(seq, last_line)},
+                "$set": {"updated_at": datetime.utcnow()}
+            }
+        )
+
+    def done(task: asyncio.Task) -> None:
+        tasks.discard(task)
+        semaphore.release()
+        if not task.cancelled() and task.exception() is not None:
+            errors.append(task.exception())
+
+    async def flush(seq, last_line, processed, valid, rejects):
+        # backpressure: wait for a free slot before reading on
+        await semaphore.acquire()
+        if errors:
+            semaphore.release()
+            raise errors[0]
+        task = asyncio.ensure_future(write(seq, last_line, processed, valid, rejects))
+        tasks.add(task)
+        task.add_done_callback(done)
+
+    parse = csv_rows if fmt == "csv" else ndjson_rows
+    seq = 0
+    last_line = resume_after
+    processed = 0
+    valid, rejects = [], []
+
+    try:
+        async for line, raw, row, error in parse(read_lines(chunks)):
+            if line <= resume_after:
+                continue
+            last_line = line
+            processed += 1
+
+            if error is None:
+                try:
+                    doc = to_document(ProductCreate(**row))
+                except ValidationError as e:
+                    error = validation_errors(e)
+                else:
+                    doc["import_id"] = import_id
+                    doc["import_line"] = line
+                    valid.append((line, doc))
+            if error is not None:
+                rejects.append({
+                    "import_id": import_id,
+                    "line": line,
+                    "raw": raw[:MAX_REJECT_RAW],
+                    "error": error
+                })
+
+            if processed == settings.import_batch_size:
+                await flush(seq, last_line, processed, valid, rejects)
+                seq += 1
+                processed = 0
+                valid, rejects = [], []
+
+        if processed:
+            await flush(seq, last_line, processed, valid, rejects)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+        if errors:
+            raise errors[0]
+    except BaseException as e:
+        # let batches already sent land, so progress stays accurate
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        await finish_import(import_id, "failed", str(e) or type(e).__name__)
+        raise
+
+    return format_import(await finish_import(import_id, "completed"))
+
+
+async def import_status(import_id: str) -> Optional[dict]:
+    job = await product_import_collection.find_one({"_id": import_id})
+    return format_import(job) if job else None
+
+
+async def reject_rows(import_id: str):
+    async for reject in product_import_reject_collection.find(
+        {"import_id": import_id}, {"_id": 0, "import_id": 0}
+    ).sort("line", 1):
+        yield reject
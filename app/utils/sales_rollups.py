@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Iterable, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from app.database import (
+    order_collection,
+    sales_daily_collection,
+    sales_product_collection
+)
+
+logger = logging.getLogger(__name__)
+
+DAY_FORMAT = "%Y-%m-%d"
+
+
+# UTC days, like $dateToString in the rebuild; naive datetimes are
+# already UTC (that is how BSON dates come back)
+def day_key(order_date: datetime) -> str:
+    if order_date.tzinfo is not None:
+        order_date = order_date.astimezone(timezone.utc)
+    return order_date.strftime(DAY_FORMAT)
+
+
+# -------------------------------------------------
+# 🔹 INCREMENTAL MAINTENANCE
+# -------------------------------------------------
+async def apply_order_changes(changes: Iterable[Tuple[dict, int]]) -> None:
+    """Fold orders into the rollups: sign +1 adds an order, -1 removes it.
+
+    An update is sent as [(old, -1), (new, +1)]. All changes are merged
+    first, so any number of orders costs one bulk_write per rollup.
+    """
+    daily = defaultdict(lambda: {"revenue": 0.0, "units": 0, "orders": 0})
+    products = defaultdict(lambda: {"revenue": 0.0, "units": 0, "orders": 0})
+    product_names = {}
+
+    for order, sign in changes:
+        items = order.get("items") or []
+
+        day = daily[day_key(order["order_date"])]
+        day["revenue"] += sign * order.get("total_amount", 0)
+        day["units"] += sign * sum(item.get("quantity", 0) for item in items)
+        day["orders"] += sign
+
+        seen = set()
+        for item in items:
+            product_id = item["product_id"]
+            product = products[product_id]
+            product["revenue"] += sign * item.get("total_price", 0)
+            product["units"] += sign * item.get("quantity", 0)
+            if product_id not in seen:
+                product["orders"] += sign
+                seen.add(product_id)
+            if sign > 0 and item.get("product_name"):
+                product_names[product_id] = item["product_name"]
+
+    now = datetime.utcnow()
+    daily_ops = [
+        UpdateOne(
+            {"_id": day},
+            {"$inc": inc, "$set": {"updatedAt": now}},
+            upsert=True
+        )
+        for day, inc in daily.items()
+    ]
+    product_ops = []
+    for product_id, inc in products.items():
+        fields = {"updatedAt": now}
+        if product_id in product_names:
+            fields["product_name"] = product_names[product_id]
+        product_ops.append(
+            UpdateOne({"_id": product_id}, {"$inc": inc, "$set": fields}, upsert=True)
+        )
+
+    writes = []
+    if daily_ops:
+        writes.append(sales_daily_collection.bulk_write(daily_ops, ordered=False))
+    if product_ops:
+        writes.append(sales_product_collection.bulk_write(product_ops, ordered=False))
+    await asyncio.gather(*writes)
+
+
+async def record_order_changes(changes: Iterable[Tuple[dict, int]]) -> None:
+    """apply_order_changes() for request handlers: the order write already
+    happened, so a rollup failure is logged rather than surfaced. A
+    rebuild_rollups() run repairs any drift."""
+    try:
+        await apply_order_changes(changes)
+    except PyMongoError as e:
+        logger.error("Sales rollup update failed: %s", e)
+
+
+# -------------------------------------------------
+# 🔹 FULL REBUILD (replays every order)
+# -------------------------------------------------
+DAILY_PIPELINE = [
+    {"$group": {
+        "_id": {"$dateToString": {"format": DAY_FORMAT, "date": "$order_date"}},
+        "revenue": {"$sum": "$total_amount"},
+        "units": {"$sum": {"$sum": "$items.quantity"}},
+        "orders": {"$sum": 1}
+    }},
+    {"$set": {"updatedAt": "$$NOW"}},
+    {"$out": "sales_daily"}
+]
+
+PRODUCT_PIPELINE = [
+    {"$unwind": "$items"},
+    # collapse repeated lines first so "orders" counts each order once
+    {"$group": {
+        "_id": {"order": "$_id", "product": "$items.product_id"},
+        "revenue": {"$sum": "$items.total_price"},
+        "units": {"$sum": "$items.quantity"},
+        "product_name": {"$last": "$items.product_name"}
+    }},
+    {"$group": {
+        "_id": "$_id.product",
+        "revenue": {"$sum": "$revenue"},
+        "units": {"$sum": "$units"},
+        "orders": {"$sum": 1},
+        "product_name": {"$last": "$product_name"}
+    }},
+    {"$set": {"updatedAt": "$$NOW"}},
+    {"$out": "sales_by_product"}
+]
+
+
+async def rebuild_rollups() -> None:
+    """Recompute both rollups from the orders collection.
+
+    $out swaps each rollup atomically, but orders written while the
+    pipeline runs may be missed; run it when order traffic is quiet.
+    """
+    await asyncio.gather(
+        order_collection.aggregate(DAILY_PIPELINE, allowDiskUse=True).to_list(None),
+        order_collection.aggregate(PRODUCT_PIPELINE, allowDiskUse=True).to_list(None)
+    )
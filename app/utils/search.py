@@ -0,0 +1,51 @@
+from pymongo import UpdateOne
+
+from app.database import product_collection
+
+AUTOCOMPLETE_LIMIT = 10
+AUTOCOMPLETE_TTL_SECONDS = 30.0
+TEXT_SEARCH_MAX_DEPTH = 1000
+
+# text index weights: a hit in the name outranks one in the tags, which
+# outranks one in the description
+TEXT_WEIGHTS = {"name": 10, "tags": 5, "description": 1}
+
+
+def search_key(name: str) -> str:
+    """Lower-cased name stored as `name_search`. Anchored, case-sensitive
+    regexes on it are plain index range scans, which is what keeps
+    autocomplete fast."""
+    return name.strip().lower()
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+async def backfill_search_keys() -> int:
+    """Fill `name_search` on products written before it existed.
+
+    Done here rather than with $toLower, which only lower-cases ASCII:
+    search_key() must stay the one definition of the key."""
+    modified = 0
+    ops = []
+
+    async def flush():
+        nonlocal modified
+        if ops:
+            result = await product_collection.bulk_write(ops, ordered=False)
+            modified += result.modified_count
+            ops.clear()
+
+    async for product in product_collection.find(
+        {"name_search": {"$exists": False}, "name": {"$type": "string"}},
+        {"name": 1}
+    ):
+        ops.append(UpdateOne(
+            # a product renamed meanwhile keeps the key its writer set
+            {"_id": product["_id"], "name": product["name"], "name_search": {"$exists": False}},
+            {"$set": {"name_search": search_key(product["name"])}}
+        ))
+        if len(ops) >= BACKFILL_BATCH_SIZE:
+            await flush()
+    await flush()
+    return modified
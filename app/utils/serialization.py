@@ -0,0 +1,50 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+def _default(value):
+    # orjson encodes datetimes itself; the stdlib fallback lands here
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    """Encode Mongo documents in one pass: ObjectIds and datetimes are
+    converted by the encoder as it walks the structure."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+# -------------------------------------------------
+# 🔹 FAST RESPONSE
+# Returning this from a route skips FastAPI's response_model
+# re-validation and jsonable_encoder walk; the declared response_model
+# still documents the endpoint in OpenAPI. Only return documents that
+# already have the response_model's shape (i.e. trusted projections).
+# -------------------------------------------------
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
@@ -0,0 +1,267 @@
+import random
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+
+from app.config import settings
+from app.database import variant_collection, variant_stock_shard_collection
+from app.utils.cache import MISSING, get_cache, stock_key
+from app.utils.etag import stamp_update
+
+MAX_STOCK_SHARDS = 64
+
+
+# -------------------------------------------------
+# 🔹 SHARDED VARIANT STOCK
+# A hot variant's stock can be split over N counters so concurrent
+# updates don't all queue on one document. Shard 0 is the variant's own
+# `stock` field; shards 1..N-1 live in `variant_stock_shards`. The
+# variant's `stock_shards` field holds N while sharding is on. Code
+# that only knows about `stock` on the variant keeps working: it just
+# touches shard 0. Reads report the sum of all shards.
+# -------------------------------------------------
+def _shard_filter(variant_id: ObjectId, shard: int, condition: Optional[dict] = None) -> tuple:
+    if shard == 0:
+        return variant_collection, {"_id": variant_id, **(condition or {})}
+    return variant_stock_shard_collection, {"variant_id": variant_id, "shard": shard, **(condition or {})}
+
+
+async def _inc_shard(
+    variant_id: ObjectId, shard: int, amount: int, at_least: Optional[int] = None
+) -> bool:
+    condition = {"stock": {"$gte": at_least}} if at_least is not None else None
+    collection, query = _shard_filter(variant_id, shard, condition)
+    update = {"$inc": {"stock": amount}}
+    if shard == 0:
+        update = stamp_update(update)
+    result = await collection.update_one(query, update)
+    return result.modified_count == 1
+
+
+async def _give(variant_id: ObjectId, shard: int, amount: int) -> None:
+    # a shard removed by a concurrent resize matches nothing; shard 0 always exists
+    if not await _inc_shard(variant_id, shard, amount):
+        await _inc_shard(variant_id, 0, amount)
+
+
+async def _take_across(variant_id: ObjectId, shards: int, quantity: int) -> bool:
+    # no single shard holds enough; take it piecewise, biggest shards first
+    balances = await shard_balances(variant_id, shards)
+    taken = []
+    remaining = quantity
+    for shard, stock in sorted(balances.items(), key=lambda item: -item[1]):
+        take = min(remaining, stock)
+        if take > 0 and await _inc_shard(variant_id, shard, -take, at_least=take):
+            taken.append((shard, take))
+            remaining -= take
+        if remaining == 0:
+            return True
+
+    for shard, take in taken:
+        await _give(variant_id, shard, take)
+    return False
+
+
+async def adjust_stock(variant_id: ObjectId, shards: int, delta: int) -> bool:
+    """Apply a relative change to a sharded variant. Decrements never take
+    a shard below zero; returns False when the shards together don't
+    have `-delta` left (nothing is changed then)."""
+    if delta == 0:
+        return True
+
+    if delta > 0:
+        await _give(variant_id, random.randrange(shards), delta)
+        await get_cache().delete(stock_key(variant_id))
+        return True
+
+    order = list(range(shards))
+    random.shuffle(order)
+
+    # random shard first, then the others, then piecewise
+    applied = False
+    for shard in order:
+        if await _inc_shard(variant_id, shard, delta, at_least=-delta):
+            applied = True
+            break
+    if not applied:
+        applied = await _take_across(variant_id, shards, -delta)
+    if applied:
+        await get_cache().delete(stock_key(variant_id))
+    return applied
+
+
+async def shard_balances(variant_id: ObjectId, shards: int) -> Dict[int, int]:
+    balances = {shard: 0 for shard in range(shards)}
+    variant = await variant_collection.find_one({"_id": variant_id}, {"stock": 1})
+    balances[0] = (variant or {}).get("stock", 0)
+    async for doc in variant_stock_shard_collection.find(
+        {"variant_id": variant_id}, {"shard": 1, "stock": 1}
+    ):
+        balances[doc["shard"]] = doc.get("stock", 0)
+    return balances
+
+
+async def reset_shards(variant_id: ObjectId) -> None:
+    """After the variant's `stock` was set to an absolute value."""
+    await variant_stock_shard_collection.update_many(
+        {"variant_id": variant_id}, {"$set": {"stock": 0}}
+    )
+    await get_cache().delete(stock_key(variant_id))
+
+
+async def delete_shards(variant_ids: List[ObjectId]) -> None:
+    if variant_ids:
+        await variant_stock_shard_collection.delete_many({"variant_id": {"$in": variant_ids}})
+        await get_cache().delete(*(stock_key(vid) for vid in variant_ids))
+
+
+# -------------------------------------------------
+# 🔹 READS
+# -------------------------------------------------
+async def stock_totals(variants: Iterable[dict]) -> Dict[str, int]:
+    """{variant id: shard 0 + every other shard} for sharded variants
+    (docs carrying `stock_shards`), cached for STOCK_TOTAL_CACHE_TTL_SECONDS."""
+    ids = [ObjectId(str(v["_id"])) for v in variants if v.get("stock_shards")]
+    if not ids:
+        return {}
+
+    cache = get_cache()
+    ttl = settings.stock_total_cache_ttl_seconds
+    totals = {}
+    misses = []
+    for vid in ids:
+        cached = await cache.get(stock_key(vid)) if ttl > 0 else MISSING
+        if cached is MISSING:
+            misses.append(vid)
+        else:
+            totals[str(vid)] = cached
+
+    if misses:
+        loaded = {str(vid): 0 for vid in misses}
+        # shard 0 is re-read too: the variant doc passed in may be cached
+        async for v in variant_collection.find({"_id": {"$in": misses}}, {"stock": 1}):
+            loaded[str(v["_id"])] += v.get("stock", 0)
+        async for row in variant_stock_shard_collection.aggregate([
+            {"$match": {"variant_id": {"$in": misses}}},
+            {"$group": {"_id": "$variant_id", "stock": {"$sum": "$stock"}}}
+        ]):
+            loaded[str(row["_id"])] += row["stock"]
+        if ttl > 0:
+            for vid, total in loaded.items():
+                await cache.set(stock_key(vid), total, ttl=ttl)
+        totals.update(loaded)
+
+    return totals
+
+
+def overlay_stock(variants: List[dict], totals: Dict[str, int]) -> List[dict]:
+    """Copies of `variants` with the aggregate stock and without the
+    internal `stock_shards` field."""
+    result = []
+    for v in variants:
+        if "stock_shards" in v:
+            v = dict(v)
+            v.pop("stock_shards")
+            v["stock"] = totals.get(str(v["_id"]), v.get("stock"))
+        result.append(v)
+    return result
+
+
+# -------------------------------------------------
+# 🔹 ENABLE / RESIZE / DISABLE
+# -------------------------------------------------
+async def _fold_shard(variant_id: ObjectId, shard: int) -> None:
+    # empty the shard into shard 0, then drop it; repeat if a late
+    # increment landed in between
+    while True:
+        doc = await variant_stock_shard_collection.find_one_and_update(
+            {"variant_id": variant_id, "shard": shard},
+            {"$set": {"stock": 0}},
+            return_document=ReturnDocument.BEFORE
+        )
+        if doc is None:
+            return
+        if doc.get("stock"):
+            await _give(variant_id, 0, doc["stock"])
+        result = await variant_stock_shard_collection.delete_one(
+            {"variant_id": variant_id, "shard": shard, "stock": 0}
+        )
+        if result.deleted_count:
+            return
+
+
+async def set_shard_count(variant_id: ObjectId, shards: int) -> Optional[dict]:
+    """Split a variant's stock over `shards` counters (1 turns sharding
+    off). The total is never changed; returns the variant or None."""
+    variant = await variant_collection.find_one(
+        {"_id": variant_id}, {"productId": 1, "stock_shards": 1}
+    )
+    if not variant:
+        return None
+    current = variant.get("stock_shards") or 1
+
+    if shards > 1:
+        await variant_stock_shard_collection.bulk_write([
+            UpdateOne(
+                {"variant_id": variant_id, "shard": shard},
+                {"$setOnInsert": {"stock": 0}},
+                upsert=True
+            )
+            for shard in range(1, shards)
+        ], ordered=False)
+        update = {"$set": {"stock_shards": shards}}
+    else:
+        update = {"$unset": {"stock_shards": ""}}
+    await variant_collection.update_one({"_id": variant_id}, stamp_update(update))
+
+    for shard in range(shards, current):
+        await _fold_shard(variant_id, shard)
+
+    if shards > 1:
+        await rebalance(variant_id, shards)
+    await get_cache().delete(stock_key(variant_id))
+    return variant
+
+
+async def rebalance(variant_id: ObjectId, shards: int) -> int:
+    """Even out the shards with pairwise moves (take from one, then give
+    to another), so the total is never over-reported mid-way. Returns
+    the number of units moved."""
+    balances = await shard_balances(variant_id, shards)
+    total = sum(balances.values())
+    base, extra = divmod(total, shards)
+    target = {shard: base + (1 if shard < extra else 0) for shard in range(shards)}
+
+    donors = [[s, balances[s] - target[s]] for s in balances if balances[s] > target[s]]
+    receivers = [[s, target[s] - balances[s]] for s in balances if balances[s] < target[s]]
+
+    moved = 0
+    while donors and receivers:
+        donor, receiver = donors[-1], receivers[-1]
+        amount = min(donor[1], receiver[1])
+        if await _inc_shard(variant_id, donor[0], -amount, at_least=amount):
+            await _give(variant_id, receiver[0], amount)
+            moved += amount
+            receiver[1] -= amount
+            donor[1] -= amount
+        else:
+            # the donor was drained meanwhile; leave it for the next run
+            donor[1] = 0
+        if donor[1] == 0:
+            donors.pop()
+        if receiver[1] == 0:
+            receivers.pop()
+    return moved
+
+
+async def rebalance_all() -> dict:
+    """Job: rebalance every sharded variant."""
+    variants = 0
+    moved = 0
+    async for variant in variant_collection.find(
+        {"stock_shards": {"$gt": 1}}, {"stock_shards": 1}
+    ):
+        variants += 1
+        moved += await rebalance(variant["_id"], variant["stock_shards"])
+    return {"variants": variants, "moved": moved}
@@ -0,0 +1,127 @@
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from app.main import app
+
+
+@dataclass
+class Scenario:
+    name: str
+    router: str
+    # rng, sample data -> (method, url)
+    request: Callable[[random.Random, dict], tuple]
+
+
+def path(route_name: str, **params) -> str:
+    # resolve through the app so paths follow the routers' real prefixes
+    return app.url_path_for(route_name, **params)
+
+
+def _recent_range(days: int):
+    to = datetime.utcnow()
+    return (to - timedelta(days=days)).date().isoformat(), to.date().isoformat()
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("products_list", "products",
+             lambda rng, data: ("GET", path("get_all_products") + "?limit=50")),
+    Scenario("products_filter", "products",
+             lambda rng, data: ("GET", path("filter_products") + f"?category={rng.choice(data['categories'])}&min_price=10&max_price=500&limit=50")),
+    Scenario("products_by_id", "products",
+             lambda rng, data: ("GET", path("get_product_by_id", product_id=rng.choice(data["product_ids"])))),
+    Scenario("products_search", "products",
+             lambda rng, data: ("GET", path("search_products") + f"?category={rng.choice(data['categories'])}&limit=24")),
+    Scenario("products_text_search", "products",
+             lambda rng, data: ("GET", path("text_search_products") + f"?q={rng.choice(data['words'])}&limit=20")),
+    Scenario("products_autocomplete", "products",
+             lambda rng, data: ("GET", path("autocomplete_products") + f"?q={rng.choice(data['words'])[:rng.randint(1, 4)]}")),
+    Scenario("variants_by_product", "variants",
+             lambda rng, data: ("GET", path("get_variants_by_product", product_id=rng.choice(data["product_ids"])))),
+    Scenario("categories_list", "categories",
+             lambda rng, data: ("GET", path("get_all_categories"))),
+    Scenario("orders_list", "orders",
+             lambda rng, data: ("GET", path("get_all_orders") + "?limit=50")),
+    Scenario("orders_by_user", "users",
+             lambda rng, data: ("GET", path("get_user_orders", user_id=f"user-{rng.randrange(1000)}") + "?limit=20")),
+    Scenario("orders_export_csv", "orders",
+             lambda rng, data: ("GET", path("export_orders_csv") + "?from={}&to={}".format(*_recent_range(1)))),
+    Scenario("analytics_daily", "orders",
+             lambda rng, data: ("GET", path("daily_sales") + "?from={}&to={}".format(*_recent_range(30)))),
+]
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    # nearest-rank
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    data: dict,
+    concurrency: int,
+    duration: float,
+    seed: int
+) -> Dict:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    # 429s from admission control: counted, but not served requests
+    rejected = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        nonlocal errors, rejected
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            method, url = scenario.request(rng, data)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url)
+                # streamed bodies count until the last byte
+                await response.aread()
+                status = str(response.status_code)
+            except httpx.HTTPError:
+                status = "error"
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "429":
+                rejected += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status == "error" or status.startswith("5"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "router": scenario.router,
+        "requests": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": _ms(percentile(latencies, 50)),
+            "p95": _ms(percentile(latencies, 95)),
+            "p99": _ms(percentile(latencies, 99)),
+            "mean": _ms(sum(latencies) / len(latencies)) if latencies else None,
+            "max": _ms(latencies[-1]) if latencies else None
+        }
+    }
@@ -0,0 +1,238 @@
+"""Benchmark harness for the API routers.
+
+    pip install -r benchmarks/requirements.txt
+
+    # seed a dataset into MONGO_URL / MONGO_DB_NAME
+    python -m benchmarks.run seed --products 1000000 --variants 5000000 --orders 10000000
+
+    # drive every scenario in-process (or against --base-url) and write JSON
+    python -m benchmarks.run run --concurrency 32 --duration 20 --output bench.json
+
+    # flag regressions against a stored baseline (exit code 1 on regression)
+    python -m benchmarks.run compare bench.json --baseline baseline.json --threshold 0.10
+
+--backend mock swaps MongoDB for mongomock-motor, an in-process
+stand-in. It skips index creation and is only useful for smoke runs
+and the harness itself, not for absolute numbers.
+
+Every request comes from one client, so admission control's per-client
+rate limits would turn most of a scenario into 429s. It is off for
+in-process runs unless ADMISSION_ENABLED is set; start a --base-url
+server with ADMISSION_ENABLED=false too. 429s are reported as
+"rejected" and kept out of the latency and throughput figures.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+from datetime import datetime
+from typing import Optional
+
+# read by app.config on import, so set before the app is imported
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+
+from app import database
+from app.config import settings
+from benchmarks.load import SCENARIOS, run_scenario
+from benchmarks.seed import CATEGORIES, WORDS, seed
+
+
+# -------------------------------------------------
+# BACKEND
+# -------------------------------------------------
+def use_backend(backend: str) -> None:
+    if backend == "mock":
+        from mongomock_motor import AsyncMongoMockClient
+
+        database._client = AsyncMongoMockClient()
+        database._transactions_supported = False
+
+
+def peak_rss_mb(pid: Optional[int] = None) -> float:
+    if pid:
+        # peak RSS of a separately running API server
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def sample_data(db) -> dict:
+    product_ids = [
+        str(doc["_id"])
+        async for doc in db.products.aggregate([{"$sample": {"size": 1000}}, {"$project": {"_id": 1}}])
+    ]
+    if not product_ids:
+        raise SystemExit("No products found, run 'seed' first")
+    return {"product_ids": product_ids, "categories": CATEGORIES, "words": WORDS}
+
+
+# -------------------------------------------------
+# COMMANDS
+# -------------------------------------------------
+async def cmd_seed(args) -> int:
+    use_backend(args.backend)
+    counts = await seed(
+        database.get_database(),
+        products=args.products,
+        variants=args.variants,
+        orders=args.orders,
+        users=args.users,
+        seed_value=args.seed,
+        drop=args.drop
+    )
+    print(json.dumps({"seeded": counts}, indent=2))
+    return 0
+
+
+async def cmd_run(args) -> int:
+    import httpx
+
+    from app.main import app
+
+    use_backend(args.backend)
+    selected = [s for s in SCENARIOS if not args.only or s.name in args.only or s.router in args.only]
+
+    async def drive(client) -> dict:
+        data = await sample_data(database.get_database())
+        results = {}
+        for scenario in selected:
+            # warm caches and connection pools before measuring
+            if args.warmup:
+                await run_scenario(client, scenario, data, args.concurrency, args.warmup, args.seed)
+            results[scenario.name] = await run_scenario(
+                client, scenario, data, args.concurrency, args.duration, args.seed
+            )
+            print(f"{scenario.name:<24} p50={results[scenario.name]['latency_ms']['p50']}ms "
+                  f"p99={results[scenario.name]['latency_ms']['p99']}ms "
+                  f"rps={results[scenario.name]['throughput_rps']} "
+                  f"rejected={results[scenario.name]['rejected']}", file=sys.stderr)
+        return results
+
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=timeout, limits=limits) as client:
+            results = await drive(client)
+    else:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+            if args.backend == "mock":
+                results = await drive(client)
+            else:
+                async with app.router.lifespan_context(app):
+                    results = await drive(client)
+
+    report = {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "backend": args.backend,
+            "target": args.base_url or "in-process",
+            # of the in-process app; a --base-url server reports its own
+            "admission_enabled": None if args.base_url else settings.admission_enabled,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "peak_rss_mb": peak_rss_mb(args.server_pid),
+        "results": results
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+    return 0
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> dict:
+    regressions = []
+    scenarios = {}
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        entry = {}
+        for pct in ("p50", "p95", "p99"):
+            old, new = before["latency_ms"].get(pct), now["latency_ms"].get(pct)
+            if old and new is not None:
+                change = (new - old) / old
+                entry[pct] = round(change, 4)
+                if pct != "p50" and change > threshold:
+                    regressions.append(f"{name}: {pct} {old}ms -> {new}ms (+{change:.0%})")
+        old_rps, new_rps = before.get("throughput_rps"), now.get("throughput_rps")
+        if old_rps:
+            change = (new_rps - old_rps) / old_rps
+            entry["throughput"] = round(change, 4)
+            if change < -threshold:
+                regressions.append(f"{name}: throughput {old_rps} -> {new_rps} rps ({change:.0%})")
+        if now.get("errors", 0) > before.get("errors", 0):
+            regressions.append(f"{name}: errors {before.get('errors', 0)} -> {now['errors']}")
+        if now.get("rejected", 0) > before.get("rejected", 0):
+            regressions.append(f"{name}: rejected {before.get('rejected', 0)} -> {now['rejected']}")
+        scenarios[name] = entry
+
+    old_rss, new_rss = baseline.get("peak_rss_mb"), current.get("peak_rss_mb")
+    if old_rss and new_rss and (new_rss - old_rss) / old_rss > threshold:
+        regressions.append(f"peak RSS {old_rss}MB -> {new_rss}MB")
+
+    return {"threshold": threshold, "changes": scenarios, "regressions": regressions}
+
+
+async def cmd_compare(args) -> int:
+    with open(args.current) as f:
+        current = json.load(f)
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    result = compare(current, baseline, args.threshold)
+    print(json.dumps(result, indent=2))
+    return 1 if result["regressions"] else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = sub.add_parser("seed", help="seed a benchmark dataset")
+    seed_parser.add_argument("--products", type=int, default=100_000)
+    seed_parser.add_argument("--variants", type=int, default=500_000)
+    seed_parser.add_argument("--orders", type=int, default=1_000_000)
+    seed_parser.add_argument("--users", type=int, default=50_000)
+    seed_parser.add_argument("--seed", type=int, default=42)
+    seed_parser.add_argument("--drop", action="store_true", help="drop existing collections first")
+    seed_parser.add_argument("--backend", choices=["mongo", "mock"], default="mongo")
+
+    run_parser = sub.add_parser("run", help="run the load scenarios")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario")
+    run_parser.add_argument("--warmup", type=float, default=2.0, help="unmeasured seconds per scenario")
+    run_parser.add_argument("--timeout", type=float, default=30.0)
+    run_parser.add_argument("--only", nargs="*", help="scenario or router names")
+    run_parser.add_argument("--base-url", help="benchmark a running server instead of in-process")
+    run_parser.add_argument("--server-pid", type=int, help="report peak RSS of this process")
+    run_parser.add_argument("--output", help="write the JSON report here")
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--backend", choices=["mongo", "mock"], default="mongo")
+
+    compare_parser = sub.add_parser("compare", help="compare a report against a baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--baseline", required=True)
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+    command = {"seed": cmd_seed, "run": cmd_run, "compare": cmd_compare}[args.command]
+    try:
+        return asyncio.run(command(args))
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
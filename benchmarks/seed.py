@@ -0,0 +1,137 @@
+import asyncio
+import random
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.utils.search import search_key
+
+CATEGORIES = [
+    "electronics", "books", "fashion", "home", "toys",
+    "sports", "beauty", "grocery", "garden", "automotive"
+]
+WORDS = [
+    "classic", "premium", "compact", "wireless", "organic", "smart", "vintage",
+    "portable", "deluxe", "eco", "ultra", "mini", "pro", "soft", "steel"
+]
+COLORS = ["red", "blue", "green", "black", "white", "grey"]
+SIZES = ["XS", "S", "M", "L", "XL"]
+STATUSES = ["pending", "paid", "shipped", "delivered", "cancelled"]
+PAYMENT_METHODS = ["card", "upi", "cod", "wallet"]
+
+SEED_BATCH_SIZE = 5000
+SEED_CONCURRENCY = 4
+
+
+def product_doc(rng: random.Random, i: int) -> dict:
+    name = f"{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}"
+    return {
+        "_id": ObjectId(),
+        "name": name,
+        "name_search": search_key(name),
+        "description": " ".join(rng.choice(WORDS) for _ in range(12)),
+        "price": round(rng.uniform(1, 2000), 2),
+        "category": rng.choice(CATEGORIES),
+        "tags": rng.sample(WORDS, 3),
+        "stock": rng.randint(0, 500),
+        "is_active": rng.random() > 0.1
+    }
+
+
+def variant_doc(rng: random.Random, product_id: ObjectId) -> dict:
+    return {
+        "productId": product_id,
+        "color": rng.choice(COLORS),
+        "size": rng.choice(SIZES),
+        "sku": f"SKU-{rng.getrandbits(40):010x}",
+        "price": round(rng.uniform(1, 2000), 2),
+        "stock": rng.randint(0, 200),
+        "isAvailable": True,
+        "createdAt": datetime.utcnow()
+    }
+
+
+def order_doc(rng: random.Random, i: int, products: list, users: int, start: datetime) -> dict:
+    items = []
+    for product in rng.sample(products, rng.randint(1, 4)):
+        quantity = rng.randint(1, 3)
+        items.append({
+            "product_id": str(product["_id"]),
+            "product_name": product["name"],
+            "price": product["price"],
+            "quantity": quantity,
+            "total_price": round(product["price"] * quantity, 2)
+        })
+    return {
+        "order_id": f"ORD-{i:09d}",
+        "user_id": f"user-{rng.randrange(users)}",
+        "items": items,
+        "total_amount": round(sum(item["total_price"] for item in items), 2),
+        "payment_method": rng.choice(PAYMENT_METHODS),
+        "status": rng.choice(STATUSES),
+        "order_date": start + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+    }
+
+
+async def _insert_stream(collection, docs, batch_size: int = SEED_BATCH_SIZE) -> int:
+    """Insert a document generator in unordered batches, a few in flight."""
+    semaphore = asyncio.Semaphore(SEED_CONCURRENCY)
+    tasks = []
+
+    async def insert(batch):
+        async with semaphore:
+            await collection.insert_many(batch, ordered=False)
+
+    batch = []
+    inserted = 0
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) == batch_size:
+            tasks.append(asyncio.create_task(insert(batch)))
+            inserted += len(batch)
+            batch = []
+            # bound memory: never hold more than a few batches
+            if len(tasks) >= SEED_CONCURRENCY * 2:
+                await asyncio.gather(*tasks)
+                tasks = []
+    if batch:
+        tasks.append(asyncio.create_task(insert(batch)))
+        inserted += len(batch)
+    await asyncio.gather(*tasks)
+    return inserted
+
+
+async def seed(database, products: int, variants: int, orders: int, users: int, seed_value: int, drop: bool) -> dict:
+    rng = random.Random(seed_value)
+
+    if drop:
+        for name in ("products", "product_variants", "orders", "categories", "sales_daily", "sales_by_product"):
+            await database[name].drop()
+
+    await database.categories.insert_many([{"name": name} for name in CATEGORIES])
+
+    # a bounded sample of products feeds variant and order generation
+    sample = []
+
+    def products_gen():
+        for i in range(products):
+            doc = product_doc(rng, i)
+            if len(sample) < 10000:
+                sample.append(doc)
+            elif rng.random() < 0.01:
+                sample[rng.randrange(len(sample))] = doc
+            yield doc
+
+    counts = {"products": await _insert_stream(database.products, products_gen())}
+
+    counts["product_variants"] = await _insert_stream(
+        database.product_variants,
+        (variant_doc(rng, rng.choice(sample)["_id"]) for _ in range(variants))
+    )
+
+    start = datetime.utcnow() - timedelta(days=365)
+    counts["orders"] = await _insert_stream(
+        database.orders,
+        (order_doc(rng, i, sample, users, start) for i in range(orders))
+    )
+    return counts
@@ -0,0 +1,34 @@
+"""Shared fixtures.
+
+    pip install -r tests/requirements.txt
+    python -m pytest
+
+MongoDB is replaced by mongomock-motor, an in-process stand-in (the
+same one `benchmarks/run.py --backend mock` uses), so the suite needs
+no server. The app's lifespan is not run: no index creation, no
+background workers.
+"""
+import pytest
+from httpx import ASGITransport, AsyncClient
+from mongomock_motor import AsyncMongoMockClient
+
+from app import database
+from app.utils import cache
+
+
+@pytest.fixture
+def db():
+    database._client = AsyncMongoMockClient()
+    database._transactions_supported = False
+    cache.set_cache_backend(cache.LRUCache())
+    yield database.get_database()
+    database._client = None
+    database._transactions_supported = None
+
+
+@pytest.fixture
+async def client(db):
+    from app.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http:
+        yield http
@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.utils import admission as admission_module
+from app.utils.admission import (
+    AdmissionClass,
+    AdmissionControl,
+    ConcurrencyLimiter,
+    Overloaded,
+    TokenBuckets,
+    admit
+)
+
+
+# -------------------------------------------------
+# limiter / buckets
+# -------------------------------------------------
+async def test_limiter_queues_then_hands_over_the_slot():
+    limiter = ConcurrencyLimiter("t", limit=1, max_queue=1)
+    await limiter.acquire(timeout=1)
+
+    waiter = asyncio.ensure_future(limiter.acquire(timeout=1))
+    await asyncio.sleep(0)
+    with pytest.raises(Overloaded, match="queue full"):
+        await limiter.acquire(timeout=1)
+
+    limiter.release()
+    await waiter
+    assert limiter.active == 1
+
+    limiter.release()
+    assert limiter.active == 0
+
+
+async def test_limiter_wait_times_out():
+    limiter = ConcurrencyLimiter("t", limit=1, max_queue=5)
+    await limiter.acquire(timeout=1)
+
+    with pytest.raises(Overloaded, match="timed out"):
+        await limiter.acquire(timeout=0.01)
+
+    # the timed-out waiter must not receive the next slot
+    limiter.release()
+    assert limiter.active == 0
+
+
+async def test_cancelled_waiter_does_not_leak_a_handed_over_slot():
+    limiter = ConcurrencyLimiter("t", limit=1, max_queue=5)
+    await limiter.acquire(timeout=1)
+    waiter = asyncio.ensure_future(limiter.acquire(timeout=1))
+    await asyncio.sleep(0)
+
+    limiter.release()        # hands the slot to the waiter...
+    waiter.cancel()          # ...which is cancelled before it runs
+    try:
+        await waiter
+    except asyncio.CancelledError:
+        pass
+    else:
+        # wait_for before 3.12 returns the result instead; the caller
+        # then owns the slot and releases it as usual
+        limiter.release()
+    assert limiter.active == 0
+
+
+def test_token_bucket_burst_then_wait(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(admission_module.time, "monotonic", lambda: now[0])
+    buckets = TokenBuckets(rate=2, burst=3)
+
+    assert [buckets.take("a") for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("a") == pytest.approx(0.5)
+    # another client has its own bucket
+    assert buckets.take("b") == 0
+
+    now[0] += 0.5
+    assert buckets.take("a") == 0
+
+
+def test_token_buckets_forget_least_recent_clients():
+    buckets = TokenBuckets(rate=1, burst=1, max_clients=2)
+    for client in ("a", "b", "c"):
+        buckets.take(client)
+    # "a" was evicted and starts with a full bucket again
+    assert buckets.take("a") == 0
+
+
+# -------------------------------------------------
+# routes
+# -------------------------------------------------
+def test_every_class_names_a_real_route():
+    AdmissionControl().check_routes(app.routes)
+
+
+def test_unknown_route_name_fails_startup():
+    control = AdmissionControl([AdmissionClass("x", ["no_such_route"], "1,1,0,0")])
+    with pytest.raises(RuntimeError, match="no_such_route"):
+        control.check_routes(app.routes)
+
+
+@pytest.fixture
+def control(monkeypatch):
+    def install(*classes):
+        control = AdmissionControl(list(classes))
+        monkeypatch.setattr(admission_module, "admission", control)
+        return control
+    return install
+
+
+async def test_rate_limited_client_gets_429(client, control):
+    control(AdmissionClass("catalog", ["get_all_categories"], "8,8,1,2"))
+    path = app.url_path_for("get_all_categories")
+
+    statuses = [(await client.get(path)).status_code for _ in range(2)]
+    response = await client.get(path)
+
+    assert statuses == [200, 200]
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) >= 1
+
+
+async def test_full_class_gets_503(client, control):
+    limits = control(AdmissionClass("catalog", ["get_all_categories"], "1,0,0,0"))
+    limiter = limits.classes[0].limiter
+    await limiter.acquire(timeout=1)
+
+    response = await client.get(app.url_path_for("get_all_categories"))
+    limiter.release()
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert (await client.get(app.url_path_for("get_all_categories"))).status_code == 200
+
+
+async def test_unclassified_routes_are_not_limited(client, control):
+    control(AdmissionClass("catalog", ["get_all_categories"], "0,0,0,0"))
+
+    assert (await client.get("/")).status_code == 200
+
+
+async def test_slot_is_held_while_the_response_streams(control):
+    limits = control(AdmissionClass("export", ["export"], "1,0,0,0"))
+    limiter = limits.classes[0].limiter
+    active_while_streaming = []
+
+    streaming_app = FastAPI(dependencies=[Depends(admit)])
+
+    @streaming_app.get("/export")
+    async def export():
+        async def rows():
+            for n in range(3):
+                active_while_streaming.append(limiter.active)
+                yield f"{n}\n"
+        return StreamingResponse(rows(), media_type="text/csv")
+
+    transport = ASGITransport(app=streaming_app)
+    async with AsyncClient(transport=transport, base_url="http://test") as http:
+        response = await http.get("/export")
+
+    assert response.text == "0\n1\n2\n"
+    assert active_while_streaming == [1, 1, 1]
+    assert limiter.active == 0
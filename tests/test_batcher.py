@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from app.utils.batcher import BatcherBusy, InsertBatcher
+
+
+class CountingCollection:
+    """Passes insert_many through and records each batch's size."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.batches = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.batches.append(len(docs))
+        return await self.collection.insert_many(docs, ordered=ordered)
+
+
+async def test_concurrent_inserts_share_batches(db):
+    collection = CountingCollection(db.orders)
+    committed = []
+
+    async def on_commit(docs):
+        committed.extend(docs)
+
+    batcher = InsertBatcher(collection, "test", max_batch=10, linger=0.05, on_commit=on_commit)
+    ids = await asyncio.gather(*(batcher.insert({"n": n}) for n in range(25)))
+    await batcher.stop()
+
+    assert len(set(ids)) == 25
+    assert collection.batches == [10, 10, 5]
+    assert await db.orders.count_documents({}) == 25
+    assert sorted(doc["n"] for doc in committed) == list(range(25))
+
+
+async def test_errors_are_per_document(db):
+    await db.orders.insert_one({"_id": "taken"})
+    batcher = InsertBatcher(db.orders, "test", linger=0.01)
+
+    results = await asyncio.gather(
+        batcher.insert({"_id": "a"}),
+        batcher.insert({"_id": "taken"}),
+        batcher.insert({"_id": "b"}),
+        return_exceptions=True
+    )
+    await batcher.stop()
+
+    assert results[0] == "a" and results[2] == "b"
+    assert isinstance(results[1], DuplicateKeyError)
+
+
+async def test_full_queue_raises_busy(db):
+    batcher = InsertBatcher(db.orders, "test", max_batch=100, linger=0.05, max_queue=2)
+
+    waiting = [asyncio.ensure_future(batcher.insert({"n": n})) for n in range(2)]
+    await asyncio.sleep(0)
+    with pytest.raises(BatcherBusy):
+        await batcher.insert({"n": 2})
+
+    await asyncio.gather(*waiting)
+    await batcher.stop()
+
+
+async def test_stop_writes_everything_queued(db):
+    batcher = InsertBatcher(db.orders, "test", max_batch=100, linger=0.2)
+
+    pending = [asyncio.ensure_future(batcher.insert({"n": n})) for n in range(3)]
+    await asyncio.sleep(0)
+    await batcher.stop()
+
+    assert all(task.done() for task in pending)
+    assert await db.orders.count_documents({}) == 3
@@ -0,0 +1,67 @@
+import httpx
+import pytest
+
+from benchmarks.load import Scenario, percentile, run_scenario
+from benchmarks.seed import seed
+
+
+@pytest.fixture
+def compare(monkeypatch):
+    # importing the runner defaults ADMISSION_ENABLED in os.environ;
+    # keep that out of the other tests
+    monkeypatch.setenv("ADMISSION_ENABLED", "false")
+    from benchmarks.run import compare
+
+    return compare
+
+
+def report(p95: float, rps: float, errors: int = 0, rejected: int = 0) -> dict:
+    return {"results": {"products_list": {
+        "latency_ms": {"p50": 1.0, "p95": p95, "p99": p95},
+        "throughput_rps": rps,
+        "errors": errors,
+        "rejected": rejected,
+    }}}
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 95) is None
+
+
+def test_compare_flags_regressions_beyond_the_threshold(compare):
+    baseline = report(p95=10.0, rps=100.0)
+
+    assert compare(report(p95=10.5, rps=95.0), baseline, 0.10)["regressions"] == []
+    regressions = compare(report(p95=12.0, rps=80.0, errors=1, rejected=3), baseline, 0.10)["regressions"]
+    assert [line.split(":")[1].split()[0] for line in regressions] == ["p95", "p99", "throughput", "errors", "rejected"]
+
+
+async def test_seed_is_deterministic(db):
+    counts = await seed(db, products=20, variants=30, orders=40, users=5, seed_value=7, drop=True)
+    first = await db.orders.find({}, {"_id": 0}).to_list(None)
+    await seed(db, products=20, variants=30, orders=40, users=5, seed_value=7, drop=True)
+    second = await db.orders.find({}, {"_id": 0}).to_list(None)
+
+    assert counts == {"products": 20, "product_variants": 30, "orders": 40}
+    assert [order["order_id"] for order in first] == [order["order_id"] for order in second]
+
+
+async def test_rejections_are_kept_out_of_latency_and_throughput():
+    served = []
+
+    def handler(request):
+        served.append(request)
+        return httpx.Response(429 if len(served) % 2 else 200)
+
+    scenario = Scenario("probe", "products", lambda rng, data: ("GET", "/probe"))
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://test") as client:
+        result = await run_scenario(client, scenario, {}, concurrency=2, duration=0.05, seed=1)
+
+    assert result["rejected"] == result["statuses"]["429"]
+    assert result["requests"] == result["statuses"]["200"]
+    assert result["errors"] == 0
@@ -0,0 +1,155 @@
+from bson import ObjectId
+
+from app.database import variant_collection, variant_stock_shard_collection
+from app.utils import cache_sync
+from app.utils.cache import MISSING, get_cache, product_key, stock_key, variants_key
+from app.utils.cache_sync import CacheSubscriber, Invalidation, apply_invalidation
+
+
+def event(collection, operation, doc_id, full_document=None, updated=None):
+    return {
+        "operationType": operation,
+        "ns": {"coll": collection},
+        "documentKey": {"_id": doc_id},
+        "fullDocument": full_document,
+        "updateDescription": {"updatedFields": updated or {}, "removedFields": []},
+    }
+
+
+def test_product_update_only_touches_autocomplete_for_its_fields():
+    pid = ObjectId()
+    price_change = Invalidation()
+    price_change.add_event(event("products", "update", pid, updated={"price": 10}))
+    rename = Invalidation()
+    rename.add_event(event("products", "update", pid, updated={"name": "x"}))
+
+    assert price_change.products == {pid} and not price_change.autocomplete
+    assert rename.autocomplete
+
+
+def test_variant_events_map_to_their_product():
+    pid, inserted, updated, deleted = ObjectId(), ObjectId(), ObjectId(), ObjectId()
+    invalidation = Invalidation()
+    invalidation.add_event(event("product_variants", "insert", inserted, {"productId": pid}))
+    invalidation.add_event(event("product_variants", "update", updated, updated={"stock": 1}))
+
+    assert invalidation.variant_products == {pid}
+    assert invalidation.unresolved == {updated}
+    assert not invalidation.all_variants
+
+    invalidation.add_event(event("product_variants", "delete", deleted))
+    assert invalidation.all_variants
+
+
+def test_stock_shard_events_map_to_their_variant():
+    variant_id, shard_id = ObjectId(), ObjectId()
+    invalidation = Invalidation()
+    invalidation.add_event(event("variant_stock_shards", "insert", ObjectId(), {"variant_id": variant_id}))
+    invalidation.add_event(event("variant_stock_shards", "update", shard_id, updated={"stock": 3}))
+
+    assert invalidation.variants == {variant_id}
+    assert invalidation.unresolved_shards == {shard_id}
+    assert not invalidation.all_stock
+
+    invalidation.add_event(event("variant_stock_shards", "delete", ObjectId()))
+    assert invalidation.all_stock
+
+
+def test_drop_flushes_only_that_collection():
+    invalidation = Invalidation()
+    invalidation.add_event(event("variant_stock_shards", "drop", None))
+
+    assert invalidation.all_stock
+    assert not invalidation.all_variants and not invalidation.all_products
+
+
+async def test_apply_resolves_updates_through_the_database(db):
+    pid, variant_id, other_id = ObjectId(), ObjectId(), ObjectId()
+    await variant_collection.insert_one({"_id": variant_id, "productId": pid})
+    shard = await variant_stock_shard_collection.insert_one({"variant_id": variant_id, "shard": 1, "stock": 2})
+    cache = get_cache()
+    for key in (variants_key(pid), stock_key(variant_id), stock_key(other_id), product_key(pid)):
+        await cache.set(key, 1, ttl=60)
+
+    invalidation = Invalidation()
+    invalidation.add_event(event("product_variants", "update", variant_id, updated={"stock": 1}))
+    invalidation.add_event(event("variant_stock_shards", "update", shard.inserted_id, updated={"stock": 1}))
+    await apply_invalidation(invalidation)
+
+    assert await cache.get(variants_key(pid)) is MISSING
+    assert await cache.get(stock_key(variant_id)) is MISSING
+    assert await cache.get(stock_key(other_id)) == 1
+    assert await cache.get(product_key(pid)) == 1
+
+
+async def test_apply_drops_every_stock_total_for_an_unknown_shard(db):
+    cache = get_cache()
+    keys = [stock_key(ObjectId()) for _ in range(3)]
+    for key in keys:
+        await cache.set(key, 1, ttl=60)
+
+    invalidation = Invalidation()
+    invalidation.add_event(event("variant_stock_shards", "update", ObjectId(), updated={"stock": 1}))
+    await apply_invalidation(invalidation)
+
+    for key in keys:
+        assert await cache.get(key) is MISSING
+
+
+class FakeStream:
+    alive = False
+    resume_token = None
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def __aenter__(self):
+        self.calls.append("open")
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeDatabase:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def watch(self, *args, **kwargs):
+        return FakeStream(self.calls)
+
+
+async def test_follow_flushes_after_the_stream_is_open(monkeypatch):
+    calls = []
+    subscriber = CacheSubscriber()
+
+    async def load_token():
+        return None
+
+    async def flush_all():
+        calls.append("flush")
+
+    monkeypatch.setattr(cache_sync, "get_database", lambda: FakeDatabase(calls))
+    monkeypatch.setattr(subscriber, "_load_token", load_token)
+    monkeypatch.setattr(subscriber, "_flush_all", flush_all)
+    await subscriber._follow()
+
+    assert calls == ["open", "flush"]
+
+
+async def test_follow_does_not_flush_when_resuming(monkeypatch):
+    calls = []
+    subscriber = CacheSubscriber()
+
+    async def load_token():
+        return {"_data": "token"}
+
+    async def flush_all():
+        calls.append("flush")
+
+    monkeypatch.setattr(cache_sync, "get_database", lambda: FakeDatabase(calls))
+    monkeypatch.setattr(subscriber, "_load_token", load_token)
+    monkeypatch.setattr(subscriber, "_flush_all", flush_all)
+    await subscriber._follow()
+
+    assert calls == ["open"]
@@ -0,0 +1,22 @@
+from app.main import app
+
+CATEGORIES = app.url_path_for("get_all_categories")
+
+
+async def test_categories_revalidate_until_a_write(client, db):
+    assert (await client.post(app.url_path_for("create_category"), json={"name": "Kitchen"})).status_code == 200
+
+    first = await client.get(CATEGORIES)
+    etag = first.headers["ETag"]
+    assert [set(category) for category in first.json()] == [{"_id", "name"}]
+    assert (await client.get(CATEGORIES, headers={"If-None-Match": etag})).status_code == 304
+
+    category_id = first.json()[0]["_id"]
+    update = await client.put(
+        app.url_path_for("update_category", category_id=category_id), json={"name": "Home"}
+    )
+    assert update.status_code == 200
+
+    changed = await client.get(CATEGORIES, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()[0]["name"] == "Home"
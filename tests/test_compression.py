@@ -0,0 +1,141 @@
+import gzip
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.utils import compression
+from app.utils.compression import CompressionMiddleware, is_compressible, negotiate
+
+BIG = "x" * 4096
+
+
+@pytest.fixture
+def gzip_only(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+
+@pytest.fixture
+def with_brotli(monkeypatch):
+    # negotiate() only asks whether brotli is importable
+    monkeypatch.setattr(compression, "brotli", object())
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate", "gzip"),
+    ("br;q=0.5, gzip;q=0.8", "gzip"),
+    ("br, gzip", "br"),
+    ("gzip;q=0, br;q=0", None),
+    ("*", "br"),
+    ("*;q=0.1, gzip;q=0", "br"),
+    ("identity", None),
+    ("gzip;q=bogus, br", "br"),
+    ("", None),
+])
+def test_negotiate_with_brotli(with_brotli, header, expected):
+    assert negotiate(header) == expected
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("br", None),
+    ("br, gzip;q=0.1", "gzip"),
+    ("*", "gzip"),
+])
+def test_negotiate_gzip_only(gzip_only, header, expected):
+    assert negotiate(header) == expected
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    ("application/json", True),
+    ("text/csv; charset=utf-8", True),
+    ("application/x-ndjson", True),
+    ("image/png", False),
+    ("", False),
+])
+def test_is_compressible(content_type, expected):
+    assert is_compressible(Headers({"content-type": content_type})) is expected
+
+
+async def big(request):
+    return PlainTextResponse(BIG, headers={"ETag": '"abc"'})
+
+
+async def small(request):
+    return PlainTextResponse("tiny")
+
+
+async def streamed(request):
+    async def rows():
+        for n in range(3):
+            yield f"row {n}\n" * 10
+    return StreamingResponse(rows(), media_type="text/csv")
+
+
+async def not_modified(request):
+    return Response(status_code=304, headers={"ETag": '"abc"'})
+
+
+async def png(request):
+    return Response(b"\x89PNG" + b"0" * 4096, media_type="image/png")
+
+
+@pytest.fixture
+async def http(gzip_only):
+    app = Starlette(routes=[
+        Route("/big", big),
+        Route("/small", small),
+        Route("/streamed", streamed),
+        Route("/not-modified", not_modified),
+        Route("/png", png),
+    ])
+    transport = ASGITransport(app=CompressionMiddleware(app, minimum_size=1024))
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+async def test_large_body_is_gzipped(http):
+    response = await http.get("/big", headers=GZIP)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # compressed bytes are a different representation: weak ETag
+    assert response.headers["etag"] == 'W/"abc"'
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.text == BIG
+
+
+async def test_small_body_passes_through(http):
+    response = await http.get("/small", headers=GZIP)
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == "tiny"
+
+
+async def test_streamed_body_is_compressed_chunk_by_chunk(http):
+    async with http.stream("GET", "/streamed", headers=GZIP) as response:
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(raw).decode() == "".join(f"row {n}\n" * 10 for n in range(3))
+
+
+@pytest.mark.parametrize("path", ["/not-modified", "/png"])
+async def test_untouched_responses(http, path):
+    response = await http.get(path, headers=GZIP)
+
+    assert "content-encoding" not in response.headers
+
+
+async def test_no_accept_encoding_is_identity(http):
+    response = await http.get("/big", headers={"Accept-Encoding": "identity"})
+
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"abc"'
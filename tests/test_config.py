@@ -0,0 +1,68 @@
+from dataclasses import replace
+
+import pytest
+from pymongo.read_preferences import Primary, Secondary
+
+from app import database
+from app.config import Settings
+
+
+def test_settings_read_typed_values_from_the_environment(monkeypatch):
+    monkeypatch.setenv("MONGO_MAX_POOL_SIZE", "7")
+    monkeypatch.setenv("CACHE_TTL_SECONDS", "2.5")
+    monkeypatch.setenv("ADMISSION_ENABLED", "off")
+    monkeypatch.setenv("MONGO_SOCKET_TIMEOUT_MS", "1500")
+    monkeypatch.setenv("CATALOG_READ_PREFERENCE", "secondaryPreferred")
+    # empty means unset
+    monkeypatch.setenv("MONGO_DB_NAME", "")
+
+    settings = Settings.from_env()
+
+    assert settings.mongo_max_pool_size == 7
+    assert settings.cache_ttl_seconds == 2.5
+    assert settings.admission_enabled is False
+    assert settings.mongo_socket_timeout_ms == 1500
+    assert settings.catalog_read_preference == "secondaryPreferred"
+    assert settings.mongo_db_name == Settings.mongo_db_name
+
+
+def test_optional_client_options_are_only_sent_when_set(monkeypatch):
+    monkeypatch.setattr(database, "settings", replace(database.settings, mongo_socket_timeout_ms=None))
+    assert "socketTimeoutMS" not in database.client_options()
+
+    monkeypatch.setattr(database, "settings", replace(
+        database.settings, mongo_socket_timeout_ms=1500, mongo_compressors="zstd,zlib"
+    ))
+    options = database.client_options()
+    assert options["socketTimeoutMS"] == 1500
+    assert options["compressors"] == "zstd,zlib"
+
+
+def test_read_preferences():
+    assert isinstance(database.read_preference("primary"), Primary)
+    assert isinstance(database.read_preference("secondary"), Secondary)
+    with pytest.raises(ValueError):
+        database.read_preference("fastest")
+
+
+def test_unknown_read_preference_fails_at_connect(monkeypatch):
+    monkeypatch.setattr(database, "_client", None)
+    monkeypatch.setattr(database, "settings", replace(database.settings, export_read_preference="fastest"))
+
+    with pytest.raises(ValueError):
+        database.connect()
+
+
+async def test_collections_follow_the_current_client(monkeypatch):
+    monkeypatch.setattr(database, "_client", None)
+    reader = database.CollectionProxy("products", "secondaryPreferred")
+    writer = database.CollectionProxy("products")
+
+    first = reader.collection
+    assert first.read_preference.mode == database.read_preference("secondaryPreferred").mode
+    assert writer.collection.read_preference == Primary()
+
+    # a new client (e.g. after a restart of the lifespan) is picked up
+    database.close()
+    assert reader.collection is not first
+    database.close()
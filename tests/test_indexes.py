@@ -0,0 +1,64 @@
+from app.indexes import CANONICAL_QUERIES, check_index_coverage, ensure_indexes, needs_index
+from app.routes.order_routes import EXPORT_SORT
+
+INDEXED = {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}
+
+
+class FakeCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def sort(self, sort):
+        return self
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+
+class FakeCollection:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def find(self, query):
+        return FakeCursor(self.plan)
+
+
+class FakeDatabase:
+    """Every collection explains to the plan given for its name."""
+
+    def __init__(self, plans):
+        self.plans = plans
+
+    def __getitem__(self, name):
+        return FakeCollection(self.plans.get(name, INDEXED))
+
+
+def test_export_entry_matches_the_route_query():
+    (sort,) = [sort for name, _, _, sort in CANONICAL_QUERIES if name.startswith("export_orders_csv")]
+
+    assert sort == EXPORT_SORT
+
+
+async def test_blocking_sorts_are_flagged():
+    report = await check_index_coverage(FakeDatabase({
+        "orders": {"stage": "SORT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}},
+        "users": {"stage": "COLLSCAN"},
+    }))
+    by_collection = {}
+    for entry in report:
+        by_collection.setdefault(entry["collection"], []).append(entry)
+
+    assert all(entry["blocking_sort"] and needs_index(entry) for entry in by_collection["orders"])
+    assert all(entry["collscan"] and needs_index(entry) for entry in by_collection["users"])
+    assert not any(needs_index(entry) for entry in by_collection["products"])
+
+
+async def test_retired_order_indexes_are_dropped(db):
+    await db.orders.create_index([("user_id", 1), ("order_date", -1)], name="user_order_date")
+    await db.orders.create_index([("order_date", -1)], name="order_date")
+
+    await ensure_indexes(db)
+
+    names = set(await db.orders.index_information())
+    assert {"user_order_date_id", "order_date_id"} <= names
+    assert not names & {"user_order_date", "order_date"}
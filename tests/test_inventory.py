@@ -0,0 +1,113 @@
+import pytest
+from bson import ObjectId
+
+from app.database import product_collection
+from app.utils import inventory
+from app.utils.inventory import (
+    InsufficientStock,
+    ProductGone,
+    _reserve_with_compensation
+)
+
+
+async def insert_product(db, stock: int) -> str:
+    result = await db.products.insert_one({"name": "p", "price": 1.0, "stock": stock})
+    return str(result.inserted_id)
+
+
+def order_doc() -> dict:
+    return {"_id": ObjectId(), "order_id": "o-1", "items": []}
+
+
+async def stock_of(db, product_id: str) -> int:
+    return (await db.products.find_one({"_id": ObjectId(product_id)}))["stock"]
+
+
+async def test_reservation_decrements_and_inserts(db):
+    a = await insert_product(db, 5)
+    b = await insert_product(db, 2)
+
+    await _reserve_with_compensation(order_doc(), {a: 3, b: 2})
+
+    assert await stock_of(db, a) == 2
+    assert await stock_of(db, b) == 0
+    assert await db.orders.count_documents({}) == 1
+
+
+async def test_insufficient_stock_releases_earlier_decrements(db):
+    a, b = sorted([await insert_product(db, 5), await insert_product(db, 1)])
+    # the later product (in reservation order) is the short one
+    await db.products.update_one({"_id": ObjectId(a)}, {"$set": {"stock": 5}})
+    await db.products.update_one({"_id": ObjectId(b)}, {"$set": {"stock": 1}})
+
+    with pytest.raises(InsufficientStock) as exc:
+        await _reserve_with_compensation(order_doc(), {a: 3, b: 2})
+
+    assert exc.value.product_id == b
+    assert await stock_of(db, a) == 5
+    assert await stock_of(db, b) == 1
+    assert await db.orders.count_documents({}) == 0
+
+
+async def test_deleted_product_never_gets_a_document(db):
+    a = await insert_product(db, 5)
+    gone = str(ObjectId())
+
+    with pytest.raises(ProductGone) as exc:
+        await _reserve_with_compensation(order_doc(), {a: 1, gone: 1})
+
+    assert exc.value.product_id == gone
+    assert await db.products.count_documents({}) == 1
+    assert await stock_of(db, a) == 5
+    assert await db.orders.count_documents({}) == 0
+
+
+class BulkOnlyCollection:
+    """Allows nothing but bulk_write, and records each one's size."""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.bulk_writes = []
+
+    async def bulk_write(self, ops, **kwargs):
+        self.bulk_writes.append(len(ops))
+        return await self.collection.bulk_write(ops, **kwargs)
+
+
+async def test_reservation_is_one_bulk_write(db, monkeypatch):
+    products = [await insert_product(db, 5) for _ in range(3)]
+    collection = BulkOnlyCollection(product_collection)
+    monkeypatch.setattr(inventory, "product_collection", collection)
+
+    await _reserve_with_compensation(order_doc(), {pid: 1 for pid in products})
+
+    assert collection.bulk_writes == [3]
+
+
+async def test_partial_reservation_releases_only_its_own_lines(db):
+    a, b, c = sorted([await insert_product(db, 5) for _ in range(3)])
+    await db.products.update_one({"_id": ObjectId(b)}, {"$set": {"stock": 0}})
+    # another order's marker on the short product must not be released
+    other = ObjectId()
+    await db.products.update_one({"_id": ObjectId(b)}, {"$push": {"reservations": other}})
+    order = order_doc()
+
+    with pytest.raises(InsufficientStock) as exc:
+        await _reserve_with_compensation(order, {a: 2, b: 1, c: 3})
+
+    assert exc.value.product_id == b
+    assert [await stock_of(db, pid) for pid in (a, b, c)] == [5, 0, 5]
+    for pid in (a, c):
+        product = await db.products.find_one({"_id": ObjectId(pid)})
+        assert order["_id"] not in product["reservations"]
+    assert (await db.products.find_one({"_id": ObjectId(b)}))["reservations"] == [other]
+
+
+async def test_reservation_markers_are_bounded(db):
+    a = await insert_product(db, 1000)
+
+    for _ in range(inventory.RESERVATION_MARKERS + 5):
+        await _reserve_with_compensation(order_doc(), {a: 1})
+
+    product = await db.products.find_one({"_id": ObjectId(a)})
+    assert len(product["reservations"]) == inventory.RESERVATION_MARKERS
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.utils.loader import BatchLoader
+
+
+class Recorder:
+    def __init__(self, fail: bool = False, delay: float = 0):
+        self.calls = []
+        self.fail = fail
+        self.delay = delay
+
+    async def __call__(self, keys):
+        self.calls.append(list(keys))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return {key: key * 10 for key in keys if key != 0}
+
+
+async def test_concurrent_loads_share_one_batch():
+    fetch = Recorder()
+    loader = BatchLoader(fetch, window=0.01)
+
+    results = await asyncio.gather(*(loader.load(key) for key in [1, 2, 2, 3]))
+
+    assert results == [10, 20, 20, 30]
+    assert fetch.calls == [[1, 2, 3]]
+
+
+async def test_missing_keys_resolve_to_none():
+    loader = BatchLoader(Recorder(), window=0.001)
+    assert await loader.load(0) is None
+
+
+async def test_max_batch_dispatches_without_waiting():
+    fetch = Recorder()
+    loader = BatchLoader(fetch, window=10, max_batch=2)
+
+    results = await asyncio.wait_for(
+        asyncio.gather(loader.load(1), loader.load(2)), timeout=1
+    )
+
+    assert results == [10, 20]
+    assert fetch.calls == [[1, 2]]
+
+
+async def test_key_in_flight_is_not_fetched_again():
+    fetch = Recorder(delay=0.05)
+    loader = BatchLoader(fetch, window=0.001)
+
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0.01)          # batch dispatched, still running
+    second = asyncio.ensure_future(loader.load(1))
+
+    assert await asyncio.gather(first, second) == [10, 10]
+    assert fetch.calls == [[1]]
+
+
+async def test_failure_reaches_every_waiter_and_is_not_kept():
+    fetch = Recorder(fail=True)
+    loader = BatchLoader(fetch, window=0.001)
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    fetch.fail = False
+    assert await loader.load(1) == 10
+
+
+async def test_cancelled_caller_does_not_cancel_the_others():
+    loader = BatchLoader(Recorder(delay=0.02), window=0.001)
+
+    cancelled = asyncio.ensure_future(loader.load(1))
+    other = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0.005)
+    cancelled.cancel()
+
+    assert await other == 10
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+
+async def test_in_flight_fetch_is_not_shared_after_an_invalidation():
+    fetch = Recorder(delay=0.05)
+    generation = [0]
+    loader = BatchLoader(fetch, window=0.001, generation=lambda: generation[0])
+
+    first = asyncio.ensure_future(loader.load(1))
+    await asyncio.sleep(0.01)
+    # dispatched; a write invalidates while it is still being fetched
+    generation[0] += 1
+    second = asyncio.ensure_future(loader.load(1))
+
+    assert await asyncio.gather(first, second) == [10, 10]
+    assert fetch.calls == [[1], [1]]
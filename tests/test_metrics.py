@@ -0,0 +1,39 @@
+from fastapi import APIRouter, FastAPI
+
+from app.main import app
+from app.utils.metrics import iter_routes
+
+METRICS = app.url_path_for("metrics")
+
+
+def requests_line(method: str, route: str) -> str:
+    return f'http_requests_total{{method="{method}",route="{route}",status="200"}}'
+
+
+async def test_routes_are_labelled_with_their_full_template(client, db):
+    await client.get("/")
+    await client.get(app.url_path_for("get_all_products"))
+    await client.get(app.url_path_for("get_user_orders", user_id="u-1"))
+
+    body = (await client.get(METRICS)).text
+
+    assert requests_line("GET", "/") in body
+    assert requests_line("GET", "/products/") in body
+    assert requests_line("GET", "/users/{user_id}/orders") in body
+
+
+def test_nested_routers_add_up_their_prefixes():
+    inner = APIRouter(prefix="/inner")
+
+    @inner.get("/{item_id}")
+    async def item(item_id: str):
+        return item_id
+
+    outer = APIRouter()
+    outer.include_router(inner, prefix="/mid")
+    nested = FastAPI()
+    nested.include_router(outer, prefix="/outer")
+
+    templates = {route.name: path for path, route in iter_routes(nested.routes)}
+
+    assert templates["item"] == "/outer/mid/inner/{item_id}"
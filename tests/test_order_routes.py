@@ -0,0 +1,132 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.main import app
+
+PLACE_ORDER = app.url_path_for("place_order")
+EXPORT_CSV = app.url_path_for("export_orders_csv")
+
+
+def order_payload(items: list) -> dict:
+    return {
+        "order_id": "o-1",
+        "user_id": "u-1",
+        "items": items,
+        "total_amount": 0,
+        "payment_method": "card",
+        "status": "placed"
+    }
+
+
+def item(product_id, quantity: int) -> dict:
+    # name / price / totals are recomputed server-side
+    return {
+        "product_id": str(product_id),
+        "product_name": "ignored",
+        "price": 0,
+        "quantity": quantity,
+        "total_price": 0
+    }
+
+
+async def test_empty_order_is_rejected(client, db):
+    response = await client.post(PLACE_ORDER, json=order_payload([]))
+
+    assert response.status_code == 400
+    assert await db.orders.count_documents({}) == 0
+    assert await db.sales_daily.count_documents({}) == 0
+
+
+async def test_order_is_priced_from_the_catalog(client, db):
+    product_id = (await db.products.insert_one(
+        {"name": "Mug", "price": 4.5, "stock": 10}
+    )).inserted_id
+
+    response = await client.post(PLACE_ORDER, json=order_payload([item(product_id, 2)]))
+
+    assert response.status_code == 200
+    assert response.json()["total_amount"] == 9.0
+    assert (await db.products.find_one({"_id": product_id}))["stock"] == 8
+
+
+async def test_out_of_stock_is_a_conflict(client, db):
+    product_id = (await db.products.insert_one(
+        {"name": "Mug", "price": 4.5, "stock": 1}
+    )).inserted_id
+
+    response = await client.post(PLACE_ORDER, json=order_payload([item(product_id, 2)]))
+
+    assert response.status_code == 409
+    assert (await db.products.find_one({"_id": product_id}))["stock"] == 1
+
+
+async def test_unknown_product_is_not_found(client, db):
+    response = await client.post(PLACE_ORDER, json=order_payload([item(ObjectId(), 1)]))
+
+    assert response.status_code == 404
+
+
+async def test_export_streams_the_date_range_oldest_first(client, db):
+    # inserted out of date order, so _id order would differ
+    for order_id, day in [("o-3", 3), ("o-1", 1), ("o-9", 9), ("o-2", 2)]:
+        await db.orders.insert_one({
+            "order_id": order_id,
+            "order_date": datetime(2026, 1, day),
+            "items": [{"product_id": "p", "quantity": 1}]
+        })
+
+    response = await client.get(EXPORT_CSV, params={"from": "2026-01-01", "to": "2026-01-05"})
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("order_id,user_id,order_date")
+    assert [line.split(",")[0] for line in lines[1:]] == ["o-1", "o-2", "o-3"]
+
+
+async def insert_orders(db, *orders):
+    for order_id, user_id, day, status in orders:
+        await db.orders.insert_one({
+            "order_id": order_id,
+            "user_id": user_id,
+            "order_date": datetime(2026, 1, day),
+            "items": [],
+            "total_amount": 0,
+            "payment_method": "card",
+            "status": status
+        })
+
+
+async def walk(client, path, **params):
+    pages, cursor = [], None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        body = (await client.get(path, params=query)).json()
+        pages.append([order["order_id"] for order in body["items"]])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return pages
+
+
+async def test_user_history_is_theirs_newest_first_and_paged(client, db):
+    await insert_orders(
+        db,
+        ("a1", "u-1", 1, "placed"), ("b1", "u-2", 2, "placed"), ("a2", "u-1", 3, "shipped"),
+        ("a3", "u-1", 3, "placed"), ("a4", "u-1", 5, "placed"),
+    )
+    history = app.url_path_for("get_user_orders", user_id="u-1")
+
+    pages = await walk(client, history, limit=2)
+
+    # a2 and a3 share a day; the _id tiebreak keeps them on one walk
+    assert pages == [["a4", "a3"], ["a2", "a1"]]
+    assert await walk(client, history, status="placed", **{"from": "2026-01-02"}) == [["a4", "a3"]]
+
+
+async def test_order_list_is_paged_and_bounded(client, db):
+    await insert_orders(db, *[(f"o{day}", f"u-{day}", day, "placed") for day in range(1, 6)])
+    orders = app.url_path_for("get_all_orders")
+
+    assert await walk(client, orders, limit=2) == [["o5", "o4"], ["o3", "o2"], ["o1"]]
+    assert (await client.get(orders, params={"limit": 10_000})).status_code == 422
+    assert (await client.get(orders, params={"cursor": "not-a-cursor"})).status_code == 400
@@ -0,0 +1,72 @@
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+from app.utils.pagination import (
+    decode_cursor,
+    decode_offset_cursor,
+    encode_cursor,
+    encode_offset_cursor,
+    keyset_page
+)
+
+
+def test_cursor_round_trip():
+    last_id = ObjectId()
+    cursor = encode_cursor("price", ASCENDING, 19.5, last_id)
+
+    assert "=" not in cursor
+    data = decode_cursor(cursor, "price", ASCENDING)
+    assert data["v"] == 19.5
+    assert data["id"] == last_id
+
+
+@pytest.mark.parametrize("sort_field, direction", [
+    ("name", ASCENDING),      # issued for another sort field
+    ("price", DESCENDING),    # issued for another direction
+])
+def test_cursor_is_bound_to_its_sort(sort_field, direction):
+    cursor = encode_cursor("price", ASCENDING, 1, ObjectId())
+
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, sort_field, direction)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "e30", encode_offset_cursor(3)])
+def test_malformed_cursor_is_rejected(cursor):
+    # "e30" is {} -- valid JSON without the fields
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, "_id", ASCENDING)
+    assert exc.value.status_code == 400
+
+
+def test_offset_cursor():
+    assert decode_offset_cursor(encode_offset_cursor(40)) == 40
+
+    with pytest.raises(HTTPException):
+        decode_offset_cursor(encode_offset_cursor(-1))
+    with pytest.raises(HTTPException):
+        decode_offset_cursor(encode_cursor("_id", ASCENDING, None, ObjectId()))
+
+
+async def test_keyset_page_walks_ties_without_gaps(db):
+    # several documents share a price; _id breaks the ties
+    await db.products.insert_many([
+        {"_id": ObjectId(), "price": price} for price in [5, 5, 5, 7, 7, 9, 9, 9, 9, 11]
+    ])
+
+    seen = []
+    cursor = None
+    while True:
+        docs, cursor = await keyset_page(
+            db.products, {}, sort_field="price", direction=DESCENDING, limit=3, cursor=cursor
+        )
+        seen.extend(docs)
+        if cursor is None:
+            break
+
+    assert len(seen) == 10
+    assert len({doc["_id"] for doc in seen}) == 10
+    assert [doc["price"] for doc in seen] == sorted((doc["price"] for doc in seen), reverse=True)
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.main import app
+from app.routes import product_routes
+from app.routes.product_routes import MAX_DETAIL_BATCH, VARIANT_PROJECTION
+
+DETAILS = app.url_path_for("get_product_details_batch")
+
+
+class LookupReader:
+    """Stands in for product_reader: records the pipeline and returns the
+    matched products with their variants already joined (mongomock has
+    no $lookup with both localField and pipeline)."""
+
+    def __init__(self, products: list):
+        self.products = products
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        self.wanted = set(pipeline[0]["$match"]["_id"]["$in"])
+        return self
+
+    async def to_list(self, length=None):
+        return [p for p in self.products if p["_id"] in self.wanted]
+
+
+def product(*variants) -> dict:
+    product_id = ObjectId()
+    return {
+        "_id": product_id, "name": "Mug", "price": 4.5, "stock": 3, "version": 2,
+        "variants": [
+            {"_id": ObjectId(), "productId": product_id, "color": color, "price": 5.0, "stock": 1,
+             "createdAt": datetime(2026, 1, 1)}
+            for color in variants
+        ]
+    }
+
+
+async def test_detail_embeds_variants_in_one_aggregation(client, db, monkeypatch):
+    mug = product("red", "blue")
+    reader = LookupReader([mug])
+    monkeypatch.setattr(product_routes, "product_reader", reader)
+
+    response = await client.get(app.url_path_for("get_product_detail", product_id=str(mug["_id"])))
+
+    assert response.status_code == 200
+    (pipeline,) = reader.pipelines
+    lookup = pipeline[-1]["$lookup"]
+    assert lookup["from"] == "product_variants"
+    assert (lookup["localField"], lookup["foreignField"]) == ("_id", "productId")
+    assert lookup["pipeline"] == [{"$project": VARIANT_PROJECTION}]
+
+    body = response.json()
+    assert body["id"] == str(mug["_id"]) and "version" not in body
+    assert [v["color"] for v in body["variants"]] == ["red", "blue"]
+    assert body["variants"][0]["productId"] == str(mug["_id"])
+    assert body["variants"][0]["isAvailable"] is True
+
+
+async def test_unknown_product_detail_is_not_found(client, db, monkeypatch):
+    monkeypatch.setattr(product_routes, "product_reader", LookupReader([]))
+
+    response = await client.get(app.url_path_for("get_product_detail", product_id=str(ObjectId())))
+
+    assert response.status_code == 404
+
+
+async def test_batch_keeps_the_callers_order_and_lists_missing_ids(client, db, monkeypatch):
+    first, second = product("red"), product()
+    missing = str(ObjectId())
+    monkeypatch.setattr(product_routes, "product_reader", LookupReader([first, second]))
+
+    response = await client.get(DETAILS, params=[
+        ("ids", str(second["_id"])), ("ids", missing), ("ids", str(first["_id"]).upper()), ("ids", str(second["_id"]))
+    ])
+
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [str(second["_id"]), str(first["_id"])]
+    assert body["items"][0]["variants"] == []
+    assert body["missing"] == [missing]
+
+
+async def test_batch_rejects_bad_or_too_many_ids(client, db):
+    invalid = await client.get(DETAILS, params={"ids": "nope"})
+    too_many = await client.get(DETAILS, params=[("ids", str(ObjectId())) for _ in range(MAX_DETAIL_BATCH + 1)])
+
+    assert invalid.status_code == 400
+    assert too_many.status_code == 400
+
+
+async def test_sharded_variants_report_their_summed_stock(client, db, monkeypatch):
+    mug = product("red")
+    variant = mug["variants"][0]
+    variant["stock_shards"] = 2
+    await db.product_variants.insert_one({**variant})
+    await db.variant_stock_shards.insert_one({"variant_id": variant["_id"], "shard": 1, "stock": 4})
+    monkeypatch.setattr(product_routes, "product_reader", LookupReader([mug]))
+
+    response = await client.get(app.url_path_for("get_product_detail", product_id=str(mug["_id"])))
+
+    (served,) = response.json()["variants"]
+    assert served["stock"] == 5
+    assert "stock_shards" not in served
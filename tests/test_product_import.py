@@ -0,0 +1,116 @@
+from dataclasses import replace
+
+import pytest
+
+from app.config import settings
+from app.utils import product_import
+from app.utils.product_import import (
+    ImportAborted,
+    Watermark,
+    csv_rows,
+    ndjson_rows,
+    read_lines
+)
+
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+
+async def chunks_of_lines(*lines: str):
+    for line in lines:
+        yield line
+
+
+async def collect(rows) -> list:
+    return [row async for row in rows]
+
+
+async def lines_of(text: str) -> list:
+    return await collect(read_lines(chunks(text.encode())))
+
+
+async def test_read_lines_across_chunk_boundaries():
+    # BOM, CRLF, and a two-byte character split between chunks
+    body = "\ufeffname\r\nÉcharpe\nlast".encode()
+    split = body.index("É".encode()) + 1
+
+    lines = await collect(read_lines(chunks(body[:split], body[split:])))
+
+    assert lines == ["name", "Écharpe", "last"]
+
+
+async def test_read_lines_rejects_bad_utf8():
+    with pytest.raises(ImportAborted):
+        await collect(read_lines(chunks(b"ok\n\xff\xfe\n")))
+
+
+async def test_read_lines_bounds_line_length(monkeypatch):
+    monkeypatch.setattr(
+        product_import, "settings", replace(settings, import_max_line_length=10)
+    )
+    with pytest.raises(ImportAborted):
+        await collect(read_lines(chunks(b"x" * 6, b"x" * 6)))
+
+
+async def test_ndjson_rows():
+    rows = await collect(ndjson_rows(chunks_of_lines('{"name": "a"}', "", "[1]", "{oops")))
+
+    assert [(line, row, error is None) for line, _, row, error in rows] == [
+        (1, {"name": "a"}, True),
+        (3, None, False),
+        (4, None, False),
+    ]
+
+
+HEADER = "name,description,price,category,tags,stock"
+
+
+async def test_csv_multiline_quoted_cell_keeps_its_first_line_number():
+    text = "\n".join([
+        HEADER,
+        'Mug,"two\nlines, with ""quotes""",4.5,kitchen,a|b| ,3',
+        "Plate,,2,kitchen,,1",
+    ])
+
+    rows = await collect(csv_rows(chunks_of_lines(*await lines_of(text))))
+
+    assert [(line, error) for line, _, _, error in rows] == [(2, None), (4, None)]
+    assert rows[0][2] == {
+        "name": "Mug",
+        "description": 'two\nlines, with "quotes"',
+        "price": "4.5",
+        "category": "kitchen",
+        "tags": ["a", "b"],
+        "stock": "3",
+    }
+    # empty cells are missing values, an empty list cell is []
+    assert rows[1][2] == {"name": "Plate", "price": "2", "category": "kitchen", "tags": [], "stock": "1"}
+
+
+async def test_csv_wrong_column_count_and_unterminated_cell():
+    text = "\n".join([HEADER, "Mug,1", 'Cup,"never closed,1,k,,1'])
+
+    rows = await collect(csv_rows(chunks_of_lines(*await lines_of(text))))
+
+    assert [(line, row, error) for line, _, row, error in rows] == [
+        (2, None, "Expected 6 columns, got 2"),
+        (3, None, "Unterminated quoted cell"),
+    ]
+
+
+async def test_csv_header_missing_required_columns():
+    with pytest.raises(ImportAborted, match="price"):
+        await collect(csv_rows(chunks_of_lines("name,category,tags,stock", "a,b,c,1")))
+
+
+def test_watermark_advances_only_over_contiguous_batches():
+    mark = Watermark(start=100)
+
+    # batches 1 and 2 finish before batch 0
+    assert mark.complete(1, 300) == 100
+    assert mark.complete(2, 400) == 100
+    assert mark.complete(0, 200) == 400
+    assert mark.complete(4, 600) == 400
+    assert mark.complete(3, 500) == 600
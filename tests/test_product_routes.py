@@ -0,0 +1,61 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.main import app
+from app.routes import product_routes
+from app.utils.cache import MISSING, get_cache, product_key
+
+
+def product_path(name: str, product_id) -> str:
+    return app.url_path_for(name, product_id=str(product_id))
+
+
+async def test_write_during_an_in_flight_read_leaves_no_stale_entry(client, db, monkeypatch):
+    product_id = (await db.products.insert_one(
+        {"name": "Old", "price": 1.0, "stock": 1, "version": 1}
+    )).inserted_id
+    read, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load(product_ids):
+        products = await product_routes.load_products(product_ids)
+        read.set()
+        await release.wait()
+        return products
+
+    monkeypatch.setattr(product_routes.product_loader, "batch_fn", slow_load)
+
+    pending = asyncio.ensure_future(client.get(product_path("get_product_by_id", product_id)))
+    await read.wait()
+    update = await client.put(product_path("update_product", product_id), json={"name": "New"})
+    assert update.status_code == 200
+    release.set()
+    stale = await pending
+
+    # the read began before the write, so it may answer with the old
+    # document, but must not cache it
+    assert stale.json()["name"] == "Old"
+    assert await get_cache().get(product_key(product_id)) is MISSING
+
+    fresh = await client.get(product_path("get_product_by_id", product_id))
+    assert fresh.json()["name"] == "New"
+    assert fresh.headers["ETag"] != stale.headers["ETag"]
+
+
+async def test_unchanged_product_is_cached_and_revalidated(client, db):
+    product_id = (await db.products.insert_one(
+        {"name": "Mug", "price": 1.0, "stock": 1, "version": 1}
+    )).inserted_id
+    path = product_path("get_product_by_id", product_id)
+
+    first = await client.get(path)
+    assert await get_cache().get(product_key(product_id)) is not MISSING
+
+    cached = await client.get(path, headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+async def test_unknown_product_is_not_found(client, db):
+    response = await client.get(product_path("get_product_by_id", ObjectId()))
+
+    assert response.status_code == 404
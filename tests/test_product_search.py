@@ -0,0 +1,96 @@
+from bson import ObjectId
+
+from app.main import app
+from app.routes import product_routes
+from app.routes.product_routes import format_price_buckets, price_facet
+from app.utils.pagination import decode_cursor
+
+SEARCH = app.url_path_for("search_products")
+
+
+class FacetReader:
+    """Stands in for product_reader: records the pipeline and returns one
+    canned $facet document (mongomock lacks $sortByCount / $bucketAuto)."""
+
+    def __init__(self, facets: dict):
+        self.facets = facets
+        self.pipelines = []
+
+    def aggregate(self, pipeline):
+        self.pipelines.append(pipeline)
+        return self
+
+    async def to_list(self, length=None):
+        return [self.facets]
+
+
+def product(price: float) -> dict:
+    return {"_id": ObjectId(), "name": "p", "price": price, "category": "k", "stock": 1, "version": 1}
+
+
+def test_explicit_boundaries_use_bucket():
+    facet = price_facet([0, 10, 20], 5)
+
+    assert facet["$bucket"]["boundaries"] == [0, 10, 20]
+    assert price_facet(None, 4) == {"$bucketAuto": {"groupBy": "$price", "buckets": 4}}
+
+
+def test_price_buckets_are_reported_with_their_bounds():
+    explicit = format_price_buckets(
+        [{"_id": 0, "count": 2}, {"_id": 10, "count": 1}, {"_id": "other", "count": 3}],
+        [0, 10, 20]
+    )
+    automatic = format_price_buckets([{"_id": {"min": 1, "max": 9}, "count": 4}], None)
+
+    assert explicit == [
+        {"min": 0, "max": 10, "count": 2},
+        {"min": 10, "max": 20, "count": 1},
+        {"min": None, "max": None, "count": 3},
+    ]
+    assert automatic == [{"min": 1, "max": 9, "count": 4}]
+
+
+async def test_unsorted_boundaries_are_rejected(client, db):
+    response = await client.get(SEARCH, params=[("price_buckets", 10), ("price_buckets", 5)])
+
+    assert response.status_code == 400
+
+
+async def test_one_aggregation_returns_the_page_and_its_facets(client, db, monkeypatch):
+    docs = [product(5.0), product(7.0), product(9.0)]
+    reader = FacetReader({
+        "results": docs,
+        "total": [{"count": 12}],
+        "categories": [{"_id": "k", "count": 12}],
+        "is_active": [{"_id": True, "count": 11}, {"_id": False, "count": 1}],
+        "price": [{"_id": {"min": 5.0, "max": 9.0}, "count": 12}],
+    })
+    monkeypatch.setattr(product_routes, "product_reader", reader)
+
+    response = await client.get(SEARCH, params={"category": "k", "limit": 2, "sort_by": "price"})
+
+    assert response.status_code == 200
+    (pipeline,) = reader.pipelines
+    assert pipeline[0] == {"$match": {"category": "k"}}
+    assert set(pipeline[1]["$facet"]) == {"results", "total", "categories", "is_active", "price"}
+    assert {"$limit": 3} in pipeline[1]["$facet"]["results"]
+
+    body = response.json()
+    assert [item["id"] for item in body["items"]] == [str(doc["_id"]) for doc in docs[:2]]
+    assert body["total"] == 12
+    assert body["facets"]["is_active"] == [{"value": True, "count": 11}, {"value": False, "count": 1}]
+    assert body["facets"]["price"] == [{"min": 5.0, "max": 9.0, "count": 12}]
+    position = decode_cursor(body["next_cursor"], "price", 1)
+    assert position["v"] == 7.0 and position["id"] == docs[1]["_id"]
+
+
+async def test_last_page_has_no_cursor(client, db, monkeypatch):
+    reader = FacetReader({
+        "results": [product(5.0)], "total": [], "categories": [], "is_active": [], "price": []
+    })
+    monkeypatch.setattr(product_routes, "product_reader", reader)
+
+    body = (await client.get(SEARCH, params={"limit": 2})).json()
+
+    assert body["next_cursor"] is None
+    assert body["total"] == 0
@@ -0,0 +1,17 @@
+from datetime import datetime, timedelta, timezone
+
+from app.utils.sales_rollups import day_key
+
+
+def test_day_key_naive_is_utc():
+    assert day_key(datetime(2026, 3, 1, 23, 59)) == "2026-03-01"
+
+
+def test_day_key_converts_aware_dates_to_utc():
+    # 23:30 in UTC-5 is 04:30 the next day in UTC, which is where the
+    # $dateToString rebuild puts it
+    eastern = timezone(timedelta(hours=-5))
+    assert day_key(datetime(2026, 3, 1, 23, 30, tzinfo=eastern)) == "2026-03-02"
+
+    ist = timezone(timedelta(hours=5, minutes=30))
+    assert day_key(datetime(2026, 3, 2, 1, 0, tzinfo=ist)) == "2026-03-01"
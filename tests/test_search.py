@@ -0,0 +1,20 @@
+from app.utils.search import backfill_search_keys, search_key
+
+
+def test_search_key_lowercases_unicode():
+    assert search_key("  Écharpe Ωmega ") == "écharpe ωmega"
+
+
+async def test_backfill_uses_search_key(db):
+    await db.products.insert_many([
+        {"name": "Écharpe"},
+        {"name": " Mug "},
+        {"name": "Kept", "name_search": "kept"},
+        {"name": None},
+    ])
+
+    assert await backfill_search_keys() == 2
+
+    keys = {p["name"]: p.get("name_search") async for p in db.products.find()}
+    assert keys == {"Écharpe": "écharpe", " Mug ": "mug", "Kept": "kept", None: None}
+    assert await backfill_search_keys() == 0
@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from bson import Decimal128, ObjectId
+
+from app.main import app
+from app.utils import serialization
+from app.utils.serialization import FastJSONResponse, dumps
+
+DOC = {
+    "_id": ObjectId("64b000000000000000000001"),
+    "at": datetime(2026, 1, 2, 3, 4, 5),
+    "price": Decimal128("9.50"),
+    "total": Decimal("1.25"),
+    "name": "Écharpe",
+}
+EXPECTED = {
+    "_id": "64b000000000000000000001",
+    "at": "2026-01-02T03:04:05",
+    "price": 9.5,
+    "total": 1.25,
+    "name": "Écharpe",
+}
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_mongo_types_are_encoded_in_one_pass(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+
+    assert json.loads(dumps(DOC)) == EXPECTED
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_unknown_types_are_an_error(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(serialization, "orjson", None)
+
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_fast_response_renders_documents():
+    response = FastJSONResponse([DOC])
+
+    assert response.headers["content-type"] == "application/json"
+    assert json.loads(response.body) == [EXPECTED]
+
+
+async def test_order_list_returns_exactly_the_order_fields(client, db):
+    await db.orders.insert_one({
+        "order_id": "o-1",
+        "user_id": "u-1",
+        "items": [],
+        "total_amount": 0,
+        "payment_method": "card",
+        "status": "placed",
+        "order_date": datetime(2026, 1, 1),
+        "reservations": ["internal"],
+    })
+
+    response = await client.get(app.url_path_for("get_all_orders"))
+
+    assert response.status_code == 200
+    (order,) = response.json()["items"]
+    assert "_id" not in order and "reservations" not in order
+    assert order["order_date"] == "2026-01-01T00:00:00"
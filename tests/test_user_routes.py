@@ -0,0 +1,83 @@
+import bcrypt
+import pytest
+
+from app.main import app
+from app.utils.auth import PasswordHasher, password_hasher
+
+SIGNUP = app.url_path_for("signup")
+LOGIN = app.url_path_for("login")
+
+
+@pytest.fixture(autouse=True)
+def cheap_hashes(monkeypatch):
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    monkeypatch.setattr(password_hasher, "_dummy_hash", None)
+
+
+async def signup(client, email="ada@example.com", password="correct horse"):
+    return await client.post(SIGNUP, json={"name": "Ada", "email": email, "password": password})
+
+
+async def test_signup_then_login(client, db):
+    assert (await signup(client)).status_code == 200
+
+    response = await client.post(LOGIN, json={"email": "ada@example.com", "password": "correct horse"})
+
+    assert response.status_code == 200
+    assert response.json()["user"]["email"] == "ada@example.com"
+    stored = await db.users.find_one({"email": "ada@example.com"})
+    assert stored["password"].startswith("$2b$04$")
+
+
+async def test_duplicate_signup_is_rejected(client, db):
+    await signup(client)
+
+    response = await signup(client)
+
+    assert response.status_code == 400
+
+
+async def test_wrong_password_is_rejected(client, db):
+    await signup(client)
+
+    response = await client.post(LOGIN, json={"email": "ada@example.com", "password": "wrong"})
+
+    assert response.status_code == 401
+
+
+async def test_unknown_email_still_pays_for_a_verify(client, db, monkeypatch):
+    checked = []
+
+    def verify_and_update(self, password, hashed):
+        checked.append(hashed)
+        return False, None
+
+    monkeypatch.setattr(PasswordHasher, "_verify_and_update", verify_and_update)
+
+    for _ in range(2):
+        response = await client.post(LOGIN, json={"email": "nobody@example.com", "password": "x"})
+        assert response.status_code == 401
+
+    # the first call hashes the dummy, later ones verify against it
+    assert len(checked) == 1
+
+
+async def test_long_passwords_are_cut_at_72_bytes(client, db):
+    password = "p" * 100
+    assert (await signup(client, password=password)).status_code == 200
+
+    response = await client.post(LOGIN, json={"email": "ada@example.com", "password": "p" * 72})
+
+    assert response.status_code == 200
+
+
+async def test_cheaper_hashes_are_upgraded_on_login(client, db):
+    old = bcrypt.hashpw(b"correct horse", bcrypt.gensalt(rounds=4)).decode()
+    await db.users.insert_one({"name": "Ada", "email": "ada@example.com", "password": old})
+    password_hasher.rounds = 5
+
+    response = await client.post(LOGIN, json={"email": "ada@example.com", "password": "correct horse"})
+
+    assert response.status_code == 200
+    stored = await db.users.find_one({"email": "ada@example.com"})
+    assert stored["password"].startswith("$2b$05$")
@@ -0,0 +1,110 @@
+from bson import ObjectId
+
+from app.main import app
+
+BULK_UPDATE = app.url_path_for("bulk_update_variants")
+
+
+async def insert_variant(db, **fields) -> ObjectId:
+    doc = {"productId": ObjectId(), "color": "red", "price": 10.0, "stock": 5, **fields}
+    result = await db.product_variants.insert_one(doc)
+    return result.inserted_id
+
+
+async def test_bulk_update_accepts_upper_case_ids(client, db):
+    variant_id = await insert_variant(db)
+    missing = ObjectId()
+
+    # the unknown id makes the route look up which updates matched nothing
+    response = await client.put(BULK_UPDATE, json={"updates": [
+        {"variant_id": str(variant_id).upper(), "data": {"price": 12.5}},
+        {"variant_id": str(missing), "data": {"price": 1.0}},
+    ]})
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["matched_count"] == 1
+    assert body["errors"] == [
+        {"index": 1, "variant_id": str(missing), "error": "Variant not found"}
+    ]
+    assert (await db.product_variants.find_one({"_id": variant_id}))["price"] == 12.5
+
+
+async def test_bulk_update_reports_missing_variants(client, db):
+    variant_id = await insert_variant(db)
+    missing = ObjectId()
+
+    response = await client.put(BULK_UPDATE, json={"updates": [
+        {"variant_id": str(variant_id), "stock_delta": -2},
+        {"variant_id": str(missing), "stock_delta": -2},
+    ]})
+
+    body = response.json()
+    assert body["matched_count"] == 1
+    assert body["errors"] == [
+        {"index": 1, "variant_id": str(missing), "error": "Variant not found"}
+    ]
+    assert (await db.product_variants.find_one({"_id": variant_id}))["stock"] == 3
+
+
+async def test_sharded_adjustment_does_not_hide_missing_variants(client, db):
+    variant_id = await insert_variant(db, stock=5, stock_shards=2)
+    await db.variant_stock_shards.insert_one({"variant_id": variant_id, "shard": 1, "stock": 5})
+    missing = ObjectId()
+
+    response = await client.put(BULK_UPDATE, json={"updates": [
+        {"variant_id": str(variant_id), "stock_delta": -3},
+        {"variant_id": str(missing), "stock_delta": -1},
+    ]})
+
+    body = response.json()
+    assert body["matched_count"] == 1
+    assert body["errors"] == [
+        {"index": 1, "variant_id": str(missing), "error": "Variant not found"}
+    ]
+    shard_stock = [doc["stock"] async for doc in db.variant_stock_shards.find()]
+    variant = await db.product_variants.find_one({"_id": variant_id})
+    assert variant["stock"] + sum(shard_stock) == 7
+
+
+def variants_path(product_id) -> str:
+    return app.url_path_for("get_variants_by_product", product_id=str(product_id))
+
+
+async def test_created_variant_leaves_out_the_version_stamps(client, db):
+    product_id = (await db.products.insert_one({"name": "Mug", "price": 1.0})).inserted_id
+
+    response = await client.post(app.url_path_for("create_variant"), json={
+        "productId": str(product_id), "color": "red", "price": 10.0, "stock": 5
+    })
+
+    assert response.status_code == 200
+    body = response.json()
+    assert "version" not in body and "updatedAt" not in body
+    stored = await db.product_variants.find_one({"productId": product_id})
+    assert stored["version"] == 1
+
+    (listed,) = (await client.get(variants_path(product_id))).json()
+    assert "version" not in listed and "updatedAt" not in listed
+
+
+async def test_variant_list_revalidates_until_a_write(client, db):
+    product_id = ObjectId()
+    variant_id = await insert_variant(db, productId=product_id, version=1)
+
+    first = await client.get(variants_path(product_id))
+    etag = first.headers["ETag"]
+    unchanged = await client.get(variants_path(product_id), headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["ETag"] == etag
+
+    update = await client.put(
+        app.url_path_for("update_variant", variant_id=str(variant_id)), json={"price": 11.0}
+    )
+    assert update.status_code == 200
+    assert (await db.product_variants.find_one({"_id": variant_id}))["version"] == 2
+
+    changed = await client.get(variants_path(product_id), headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()[0]["price"] == 11.0